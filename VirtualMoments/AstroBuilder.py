@@ -4,7 +4,24 @@ files with pages / albums.
 """
 import yaml
 import os
+import hashlib
+import json
+import logging
+import re
+import tempfile
+import time
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, is_dataclass
 from datetime import datetime
+from .BuildManifest import BuildManifest
+from .ContentStore import ContentStore, loadContent
+from .Metrics import metrics
+
+# number of records a sharded build holds in memory before appending them to the album partitions
+PARTITION_BUFFER_SIZE = 10000
 
 class AstroBuilder:
     """
@@ -14,58 +31,730 @@ class AstroBuilder:
     ----------
         web_dir (str): Path to the web/ directory containing templates and output pages.
         manifest (str): List or path to manifest.yaml defining albums and games.
-        content (str): Path to the content file (YAML or JSON) with screenshot data.
+        content (str | list): Path to the content store (JSON Lines, or legacy YAML), list of paths
+                              of several stores (e.g. one per profile) or list of screenshot records.
     """
-    def __init__(self, web_dir: str, manifest: str | list, content: str | list):
+    logger = logging.getLogger("AstroBuilder")
+    # album of the newest screenshots, built with the search index
+    recent_album_name = "Recent"
+
+    def __init__(self, web_dir: str, manifest: str | list, content: str | list[str] | list):
         self.web_dir = web_dir
         self.pages_dir = os.path.join(web_dir, "src", "pages")
         self.covers_dir = os.path.join(web_dir, "public", "cover")
+        self.build_manifest_path = os.path.join(web_dir, "build_manifest.json")
         self.manifest = manifest
-        self.content = content
+        if isinstance(content, str):
+            content = [content]
+        self.content_paths: list[str] = content if content and all(isinstance(c, str) for c in content) else []
 
         if isinstance(self.manifest, str):
             with open(self.manifest, "r") as f:
                 self.manifest = yaml.safe_load(f)
 
-        if isinstance(self.content, str):
-            with open(self.content, "r") as f:
-                self.content = yaml.safe_load(f)
+        # stores are loaded on first access of `content`, a sharded build streams them instead
+        self._content: list[dict] | None = None
+        # store every record came from, so updated records are written back to their own store
+        self._sources: list[str] = []
+        # outcome of the last build, see _finishBuild
+        self.changed = False
+        self.change_feed: dict[str, dict[str, list[str]]] = {}
+        if not self.content_paths:
+            self._content = [asdict(s) if is_dataclass(s) else s for s in content]
 
         with open(os.path.join(self.pages_dir, "album_template.astro"), "r") as f:
-            self.album_template = f.read()
+            self.album_template = PageTemplate(f.read())
 
         with open(os.path.join(self.pages_dir, "index_template.astro"), "r") as f:
-            self.index_template = f.read()
+            self.index_template = PageTemplate(f.read())
+
+    @property
+    def content(self) -> list[dict]:
+        """
+        Screenshot records of all content stores, loaded on first access.
+        """
+        if self._content is None:
+            self._content = []
+            for path in self.content_paths:
+                records = loadContent(path)
+                self._content.extend(records)
+                self._sources.extend([path] * len(records))
+        return self._content
 
-    def build(self):
+    def build(self, workers: int = 1):
         """
         Builds all album pages and the index page, writing .astro files to the pages directory.
+        Pages whose content did not change are not rewritten, so their modification times
+        stay the same and Astro does not need to process them again.
+
+        If the manifest has an `images` section, screenshot images are cached locally
+        and album pages use thumbnails with explicit dimensions (see cacheImages).
+
+        If the manifest has a `search` section, a sharded JSON search index is written
+        to web/public/search and a "Recent" page lists the newest screenshots (see buildSearch).
+
+        Screenshot ids and hashes of all albums are saved to web/build_manifest.json. Albums
+        whose hash matches the previous build are not rendered again, and after the build
+        `change_feed` lists screenshots added and removed per album and `changed` tells
+        whether anything needs to be deployed.
+
+        Arguments:
+        ----------
+            workers (int): Number of processes rendering album pages. Default is 1 (render in this process).
+        """
+        images = self.manifest.get("images")
+        if images is not None:
+            from .ImageCache import ImageCache
+
+            image_workers = images.get("workers", 4)
+            image_cache = ImageCache(
+                images.get("cache_dir", ".image_cache"),
+                os.path.join(self.web_dir, "public", "thumbs"),
+                widths = images.get("widths", [480, 960]),
+                workers = image_workers
+            )
+            with metrics.span("build.images"):
+                self.cacheImages(image_cache, workers = image_workers)
+
+        search = self.manifest.get("search")
+        recent = Album(self.recent_album_name, []) if search is not None else None
+        albums, page_sizes, router = self._prepareAlbums(extra = [recent] if recent is not None else [])
+        pagination = self.manifest.get("pagination") or {}
+
+        with metrics.span("build.routing"):
+            for screenshot in self.content:
+                for album in router.route(screenshot["game"]) or [albums[-1]]:
+                    album.addScreenshot(screenshot)
+
+        previous = BuildManifest.load(self.build_manifest_path)
+        previous_hashes = [previous.albumHash(album.name) for album in albums]
+
+        with metrics.span("build.albums"):
+            if workers > 1:
+                # imported here, multiprocessing is only needed for parallel builds
+                from concurrent.futures import ProcessPoolExecutor
+
+                with ProcessPoolExecutor(max_workers = workers) as executor:
+                    results = list(executor.map(
+                        _writeAlbumPage,
+                        [self.album_template] * len(albums), albums, [self.pages_dir] * len(albums), page_sizes, previous_hashes
+                    ))
+            else:
+                results = [
+                    _writeAlbumPage(self.album_template, album, self.pages_dir, page_size, previous_hash)
+                    for album, page_size, previous_hash in zip(albums, page_sizes, previous_hashes)
+                ]
+
+        pages = list(albums)
+        if search is not None:
+            with metrics.span("build.search"):
+                results.append(self.buildSearch(
+                    albums, recent, search.get("recent", 100), pagination.get("page_size"), previous.albumHash(recent.name)
+                ))
+            pages.append(recent)
+
+        self._finishBuild(previous, albums, pages, results)
+
+        return albums
+
+    def buildSharded(self, workers: int = 1, partition_dir: str = None):
+        """
+        Builds the album pages and the index page like build, for content too large to hold
+        in memory at once. Records are streamed from the content stores and partitioned by
+        album into temporary JSON Lines files, then every album is loaded and rendered on its
+        own, in a process pool if workers > 1. Peak memory is bounded by the largest album
+        instead of the whole content.
+
+        Image caching and the search index need all screenshots at once, so the `images`
+        and `search` sections of the manifest are ignored (run build for them). Thumbnails
+        already stored in the records are still used.
+
+        Arguments:
+        ----------
+            workers (int): Number of processes rendering album pages. Default is 1 (render in this process).
+            partition_dir (str, optional): Directory of the temporary partitions. Defaults to the system temporary directory.
+        """
+        if not self.content_paths:
+            raise ValueError("A sharded build streams content stores, it cannot build a list of records.")
+        for section in ("images", "search"):
+            if self.manifest.get(section) is not None:
+                self.logger.warning(f"The {section} section of the manifest is ignored by sharded builds")
+
+        # the recent page of a previous build still claims its page name
+        search = self.manifest.get("search")
+        albums, page_sizes, router = self._prepareAlbums(extra = [Album(self.recent_album_name, [])] if search is not None else [])
+        previous = BuildManifest.load(self.build_manifest_path)
+
+        with tempfile.TemporaryDirectory(dir = partition_dir) as tmp_dir:
+            with metrics.span("build.partition"):
+                partitions, stale = self._partitionContent(albums, router, tmp_dir)
+
+            with metrics.span("build.albums"):
+                args = (
+                    [self.album_template] * len(albums), albums, partitions, stale,
+                    [self.pages_dir] * len(albums), page_sizes, [previous.albumHash(album.name) for album in albums]
+                )
+                if workers > 1:
+                    from concurrent.futures import ProcessPoolExecutor
+
+                    with ProcessPoolExecutor(max_workers = workers) as executor:
+                        results = list(executor.map(_writePartitionPages, *args))
+                else:
+                    results = list(map(_writePartitionPages, *args))
+
+        # the recent page is not rendered by sharded builds, it stays as the previous build left it
+        self._finishBuild(previous, albums, albums, results, kept = [self.recent_album_name] if search is not None else [])
+
+        return albums
+
+    def _finishBuild(
+            self, previous: BuildManifest, albums: list["Album"], pages: list["Album"], results: list["AlbumBuild"],
+            kept: list[str] = None
+        ):
+        """
+        Records metrics of the rendered pages, writes the index page and saves the build manifest
+        with the change feed of the build. The footer date of the index page only changes
+        when albums changed, so a build of unchanged content leaves every file as it was.
+
+        Arguments:
+        ----------
+            previous (BuildManifest): Manifest of the previous build.
+            albums (list[Album]): Albums listed on the index page.
+            pages (list[Album]): All rendered albums, including pages not on the index (e.g. recent screenshots).
+            results (list[AlbumBuild]): Outcome of rendering every page, in the order of `pages`.
+            kept (list[str], optional): Albums not rendered by this build, whose entries of the previous build are kept.
+        """
+        # albums are timed where they are rendered, possibly in a worker process
+        written = [result.written for result in results]
+        for result in results:
+            metrics.record("build.album", result.seconds)
+        metrics.count("build.albums_written", sum(written))
+        metrics.count("build.albums_unchanged", len(written) - sum(written))
+
+        manifest = BuildManifest(self.build_manifest_path)
+        manifest.albums = {album.name: {"ids": result.ids, "hash": result.hash} for album, result in zip(pages, results)}
+        for name in kept or []:
+            if name in previous.albums:
+                manifest.albums[name] = previous.albums[name]
+        manifest.changes = previous.changeFeed({name: album["ids"] for name, album in manifest.albums.items()})
+        changed = bool(manifest.changes) or manifest.albums != previous.albums
+        manifest.updated = previous.updated if previous.updated is not None and not changed else datetime.now().strftime("%d %B %Y")
+
+        with metrics.span("build.index"):
+            index_html = IndexPage(
+                self.index_template, albums, date = manifest.updated, search = self.manifest.get("search") is not None
+            ).buildIndexPage()
+            manifest.index = hashlib.sha256(index_html.encode("utf-8")).hexdigest()
+            writeIfChanged(os.path.join(self.pages_dir, "index.astro"), index_html)
+
+        manifest.save()
+        self.changed = changed or manifest.index != previous.index
+        self.change_feed = manifest.changes
+
+        self.logger.info(f"Album pages written: {sum(written)}, unchanged: {len(written) - sum(written)}")
+        if self.changed:
+            added = sum(len(change["added"]) for change in self.change_feed.values())
+            removed = sum(len(change["removed"]) for change in self.change_feed.values())
+            self.logger.info(f"Changed since the previous build: {added} screenshots added, {removed} removed in {len(self.change_feed)} albums")
+        else:
+            self.logger.info("Nothing changed since the previous build")
+
+    def _prepareAlbums(self, extra: list["Album"] = None) -> tuple[list["Album"], list[int | None], "GameRouter"]:
+        """
+        Creates the albums of the manifest and the "Other" album, with their page sizes and router.
+        Extra albums (e.g. the recent screenshots page) are only registered for slug collisions.
         """
         albums = [Album(a["name"], a["games"]) for a in self.manifest["albums"]]
         albums.append(Album("Other", []))
 
-        for album in albums:
+        pagination = self.manifest.get("pagination") or {}
+        page_sizes = [a.get("page_size", pagination.get("page_size")) for a in self.manifest["albums"]]
+        page_sizes.append(pagination.get("page_size"))
+
+        # covers directory is listed once instead of checking every album's cover separately
+        covers = set()
+        if os.path.isdir(self.covers_dir):
+            covers = {f.removesuffix(".svg") for f in os.listdir(self.covers_dir) if f.endswith(".svg")}
+
+        # fail before writing anything if two albums would be saved to the same page
+        slug_registry = SlugRegistry()
+        for album in albums + (extra or []):
             album.default_covers_path = self.covers_dir
+            album.covers = covers
+            album.slug_registry = slug_registry
+            slug_registry.register(album)
 
-        for screenshot in self.content:
-            matched = any(
-                screenshot["game"] in album.games and (album.addScreenshot(screenshot) or True)
-                for album in albums
-            )
-            if not matched:
-                albums[-1].addScreenshot(screenshot)
+        routing = self.manifest.get("routing") or {}
+        router = GameRouter(albums[:-1], multi_album = routing.get("multi_album", False))
+        return albums, page_sizes, router
+
+    def _partitionContent(self, albums: list["Album"], router: "GameRouter", dir: str) -> tuple[list[str], list[set[str]]]:
+        """
+        Streams records of the content stores into one JSON Lines partition per album.
+
+        A page link written more than once goes to the albums of its latest record.
+        Every line carries the position where its page link was first seen, so a loaded
+        partition keeps the order of build() even for screenshots that moved between albums.
+        Superseded versions are resolved when a partition is loaded (see loadPartition),
+        and versions left in albums the screenshot moved out of are listed as stale.
+
+        Returns:
+        ----------
+            tuple[list[str], list[set[str]]]: Partition path and stale page links of every album.
+        """
+        partitions = [os.path.join(dir, f"{i}.jsonl") for i in range(len(albums))]
+        stale: list[set[str]] = [set() for _ in albums]
+        positions = {id(album): i for i, album in enumerate(albums)}
+        # position where every page link was first seen and albums of its latest record
+        latest: dict[str, tuple[int, tuple[int, ...]]] = {}
+        buffers: list[list[str]] = [[] for _ in albums]
+        n_buffered = 0
+
+        def flush():
+            for partition, lines in zip(partitions, buffers):
+                if lines:
+                    with open(partition, "a", encoding = "utf-8") as f:
+                        f.writelines(lines)
+                    lines.clear()
+
+        for path in self.content_paths:
+            records = loadContent(path) if path.endswith((".yaml", ".yml")) else ContentStore(path).iterRecords()
+            for record in records:
+                targets = tuple(positions[id(album)] for album in router.route(record["game"])) or (len(albums) - 1,)
+
+                position, previous = latest.get(record["page_link"], (len(latest), ()))
+                if previous != targets:
+                    for i in previous:
+                        stale[i].add(record["page_link"])
+                    for i in targets:
+                        stale[i].discard(record["page_link"])
+                    latest[record["page_link"]] = (position, targets)
+
+                line = json.dumps([position, record], ensure_ascii = False, separators = (",", ":")) + "\n"
+                for i in targets:
+                    buffers[i].append(line)
+                n_buffered += 1
+                if n_buffered >= PARTITION_BUFFER_SIZE:
+                    flush()
+                    n_buffered = 0
+        flush()
+
+        return partitions, stale
+
+    def buildSearch(self, albums: list["Album"], recent: "Album", n_recent: int = 100, page_size: int = None, previous_hash: str = None) -> "AlbumBuild":
+        """
+        Writes the search index of all screenshots to web/public/search and the page
+        of the newest screenshots, both from one sort of the content by date.
+
+        Arguments:
+        ----------
+            albums (list[Album]): Routed albums of the build, a screenshot links to the first album it is in.
+            recent (Album): Empty album of the recent screenshots page.
+            n_recent (int): Number of screenshots on the recent page. Default is 100.
+            page_size (int): Maximum number of screenshots per recent page. Default is None (single page).
+            previous_hash (str, optional): Hash of the recent page in the previous build, see albumHash.
+
+        Returns:
+        ----------
+            AlbumBuild: Outcome of rendering the recent page.
+        """
+        # imported here, the search index is only built if the manifest asks for it
+        from .SearchIndex import SearchIndex, sortByDate
+
+        screenshots = sortByDate(self.content)
 
+        album_of: dict[int, tuple[str, str]] = {}
         for album in albums:
-            page = AlbumPage(self.album_template, album)
-            page.buildAlbumPage(save = True, dir = self.pages_dir)
+            for screenshot in album.screenshots:
+                album_of.setdefault(id(screenshot), (album.name, album.buildPagePath()))
 
-        index = IndexPage(self.index_template, albums)
-        index.buildIndexPage(save = True, dir = self.pages_dir)
+        SearchIndex(screenshots, album_of).write(os.path.join(self.web_dir, "public", "search"))
 
-        return albums
+        recent.screenshots = screenshots[:n_recent]
+        return _writeAlbumPage(self.album_template, recent, self.pages_dir, page_size, previous_hash)
+
+    def cacheImages(self, image_cache, workers: int = 4) -> int:
+        """
+        Caches images of all screenshots and adds their dimensions and thumbnails
+        (width, height, thumbnail, srcset) to the screenshot records. Updated records
+        are appended to the content stores they were loaded from, if any.
+
+        Arguments:
+        ----------
+            image_cache (ImageCache): Cache to store the images in.
+            workers (int): Number of concurrent downloads. Default is 4.
+
+        Returns:
+        ----------
+            int: Number of updated screenshot records.
+        """
+        def process(screenshot: dict) -> dict | None:
+            try:
+                return image_cache.process(screenshot["link"])
+            except Exception:
+                self.logger.error(f"Failed caching image {screenshot['link']}", exc_info = True)
+                return None
+
+        updated: dict[str | None, list[dict]] = {}
+        content = self.content
+        sources = self._sources or [None] * len(content)
+        with ThreadPoolExecutor(max_workers = workers) as executor:
+            for screenshot, source, image in zip(content, sources, executor.map(process, content)):
+                if image is None or all(screenshot.get(k) == v for k, v in image.items()):
+                    continue
+                screenshot.update(image)
+                updated.setdefault(source, []).append(screenshot)
+
+        image_cache.save()
+        for path, records in updated.items():
+            if path is not None and not path.endswith((".yaml", ".yml")):
+                ContentStore(path).append(records)
+
+        n_updated = sum(len(records) for records in updated.values())
+        self.logger.info(f"Images cached, {n_updated} screenshot records updated")
+        return n_updated
+
+class SlugRegistry:
+    """
+    Memoized registry of album page names (slugs), shared by the albums of a build.
+    Raises an error if two albums map to the same page name, even albums with the same name,
+    instead of letting one album page silently overwrite the other.
+    """
+    def __init__(self):
+        self._slugs: dict[str, str] = {}
+        self._names: dict[str, str] = {}
+
+    def register(self, album: "Album") -> str:
+        """
+        Claims the page name of an album of the build.
+
+        Arguments:
+        ----------
+            album (Album): Album of the build.
+
+        Returns:
+        ----------
+            str: The page name of the album (see makeSlug).
+
+        Raises:
+        ----------
+            ValueError: If another album already claimed the same page name.
+        """
+        slug = makeSlug(album.name)
+        other = self._names.get(slug)
+        if other is not None:
+            raise ValueError(f'Albums "{other}" and "{album.name}" would both be saved as page "{slug}".')
+        self._names[slug] = album.name
+        self._slugs[album.name] = slug
+        return slug
+
+    def slug(self, name: str) -> str:
+        """
+        Arguments:
+        ----------
+            name (str): Name of the album.
+
+        Returns:
+        ----------
+            str: The page name of the album (see makeSlug).
+
+        Raises:
+        ----------
+            ValueError: If another album name already maps to the same page name.
+        """
+        slug = self._slugs.get(name)
+        if slug is None:
+            slug = makeSlug(name)
+            other = self._names.setdefault(slug, name)
+            if other != name:
+                raise ValueError(f'Albums "{other}" and "{name}" would both be saved as page "{slug}".')
+            self._slugs[name] = slug
+        return slug
+
+@lru_cache(maxsize = None)
+def makeSlug(name: str) -> str:
+    """
+    Generates a formatted, html-friendly page name by replacing spaces with underscores,
+    removing colons and apostrophes, and converting the string to lowercase.
+
+    Arguments:
+    ----------
+        name (str): Name of the album.
+
+    Returns:
+    ----------
+        str: The formatted page name.
+    """
+    return name.replace(' ', '_').replace(":", "").replace("'", "").lower()
+
+class GameRouter:
+    """
+    Routes screenshots to albums by game name. Exact game names are looked up in an index
+    built once from the manifest, game patterns are matched only for games not seen before,
+    and the result is memoized per game, so routing a screenshot is a dictionary lookup.
+
+    Game entries of an album can be:
+        - exact game names, e.g. "Forza Horizon 5" or "[PROTOTYPE]",
+        - glob patterns prefixed with "glob:", e.g. "glob:F1 *",
+        - regular expressions prefixed with "re:", e.g. "re:^Assetto Corsa".
+
+    Arguments:
+    ----------
+        albums (list[Album]): Albums in manifest order.
+        multi_album (bool): If True, a screenshot goes to every matching album. Otherwise
+                            only to the first matching album in manifest order. Default is False.
+    """
+    def __init__(self, albums: list["Album"], multi_album: bool = False):
+        self.albums = albums
+        self.multi_album = multi_album
+        self._exact: dict[str, list[int]] = {}
+        self._patterns: list[tuple[int, "re.Pattern | str"]] = []
+        self._routes: dict[str, list[Album]] = {}
+
+        for i, album in enumerate(albums):
+            for game in album.games:
+                if game.startswith("re:"):
+                    self._patterns.append((i, re.compile(game[3:])))
+                elif game.startswith("glob:"):
+                    self._patterns.append((i, game[5:]))
+                else:
+                    self._exact.setdefault(game, []).append(i)
+
+    def route(self, game: str) -> list["Album"]:
+        """
+        Finds albums the screenshots of the game belong to.
+
+        Arguments:
+        ----------
+            game (str): Name of the game.
+
+        Returns:
+        ----------
+            list[Album]: Matching albums in manifest order, empty if the game matches no album.
+        """
+        routes = self._routes.get(game)
+        if routes is None:
+            routes = self._routes[game] = self._match(game)
+        return routes
+
+    def _match(self, game: str) -> list["Album"]:
+        matches = set(self._exact.get(game, []))
+        for i, pattern in self._patterns:
+            if isinstance(pattern, str):
+                matched = fnmatchcase(game, pattern)
+            else:
+                matched = pattern.search(game) is not None
+            if matched:
+                matches.add(i)
+
+        matches = sorted(matches)
+        if not self.multi_album:
+            matches = matches[:1]
+        return [self.albums[i] for i in matches]
+
+class PageTemplate:
+    """
+    Page template split once at its placeholders (e.g. `<!-- SCREENSHOTS -->`), so pages
+    can be rendered as a stream of chunks without scanning or copying the template text again.
+
+    Arguments:
+    ----------
+        text (str): Text of the template.
+    """
+    placeholder_pattern = re.compile(r"<!-- ([A-Z_]+) -->")
+
+    def __init__(self, text: str):
+        self.text = text
+        # literal parts at even indices, placeholder names at odd indices
+        self.parts = self.placeholder_pattern.split(text)
+        self._nested = None
+
+    def render(self, **values: str | Iterable[str]) -> Iterator[str]:
+        """
+        Renders the template, substituting placeholders with the given values.
+        Placeholders without a value are left in place.
+
+        Arguments:
+        ----------
+            **values (str | Iterable[str]): Value for every placeholder name. Iterables are streamed
+                                            chunk by chunk and should be used for a single placeholder only.
+
+        Returns:
+        ----------
+            Iterator[str]: Chunks of the rendered page.
+        """
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                if part:
+                    yield part
+                continue
+
+            value = values.get(part)
+            if value is None:
+                yield f"<!-- {part} -->"
+            elif isinstance(value, str):
+                yield value
+            else:
+                yield from value
+
+    def nested(self) -> "PageTemplate":
+        """
+        Returns the template with relative imports adjusted for a page saved one directory deeper.
+        """
+        if self._nested is None:
+            self._nested = PageTemplate(re.sub(r"""(['"])\.\./""", r"\1../../", self.text))
+        return self._nested
+
+@dataclass
+class AlbumBuild:
+    """
+    Outcome of rendering the pages of an album, returned by render workers.
+
+    Attributes:
+    ----------
+        written (bool): Whether any page file was written or removed.
+        seconds (float): Time spent on the album.
+        ids (list[str]): Page links of the screenshots of the album.
+        hash (str): Hash of everything the pages are rendered from, see albumHash.
+    """
+    written: bool
+    seconds: float
+    ids: list[str]
+    hash: str
+
+# fields of a screenshot record shown on album pages, see Album.iterAlbumContent
+RENDERED_FIELDS = ("link", "title", "date", "width", "height", "thumbnail", "srcset")
+# created once, json.dumps with arguments creates a new encoder on every call
+_fields_encoder = json.JSONEncoder(ensure_ascii = False, separators = (",", ":"))
+
+def albumHash(template: "PageTemplate", album: "Album", page_size: int = None) -> str:
+    """
+    Hashes the template, name, pagination and the rendered fields of the screenshots of an album.
+    The album pages are rendered only from these, so equal hashes mean equal pages. Fields that
+    change without changing pages, such as the revalidation time `checked`, are left out.
+
+    Returns:
+    ----------
+        str: Hex digest of the SHA-256 hash.
+    """
+    digest = hashlib.sha256(json.dumps([template.text, album.name, page_size]).encode("utf-8"))
+    for screenshot in album.screenshots:
+        digest.update(_fields_encoder.encode([screenshot.get(f) for f in RENDERED_FIELDS]).encode("utf-8"))
+    return digest.hexdigest()
+
+def _writePartitionPages(
+        template: "PageTemplate", album: "Album", partition: str, stale: set[str], dir: str,
+        page_size: int = None, previous_hash: str = None
+    ) -> "AlbumBuild":
+    """
+    Loads the screenshots of an album from its partition and renders its pages,
+    the worker function of sharded builds (see AstroBuilder.buildSharded).
+    """
+    start = time.perf_counter()
+    album.screenshots = [r for r in loadPartition(partition) if r["page_link"] not in stale]
+    result = _writeAlbumPage(template, album, dir, page_size, previous_hash)
+    # the album is sent back to the parent only as a cover, its screenshots are not needed anymore
+    album.screenshots = []
+    result.seconds = time.perf_counter() - start
+    return result
+
+def loadPartition(path: str) -> list[dict]:
+    """
+    Loads the records of an album partition written by AstroBuilder._partitionContent.
+    The latest record of every page link wins, ordered by where the page link was first seen.
+
+    Returns:
+    ----------
+        list[dict]: Screenshot records, empty if the album has no partition.
+    """
+    records: dict[str, tuple[int, dict]] = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding = "utf-8") as f:
+        for line in f:
+            position, record = json.loads(line)
+            records[record["page_link"]] = (position, record)
+    return [record for _, record in sorted(records.values(), key = lambda item: item[0])]
+
+def _writeAlbumPage(template: "PageTemplate", album: "Album", dir: str, page_size: int = None, previous_hash: str = None) -> "AlbumBuild":
+    """
+    Renders and saves all pages of a single album. Module level, so it can be run in a process pool.
+    Rendering is skipped if the album hash equals the hash of the previous build and all its pages exist.
+    """
+    start = time.perf_counter()
+    album_page = AlbumPage(template, album, page_size)
+    album_hash = albumHash(album_page.template, album, page_size)
+
+    if album_hash == previous_hash and all(os.path.exists(path) for path in album_page.pageFiles(dir)):
+        written = False
+    else:
+        written = album_page.buildAlbumPages(dir = dir)
+    return AlbumBuild(written, time.perf_counter() - start, [s["page_link"] for s in album.screenshots], album_hash)
+
+def writeIfChanged(path: str, text: str | Iterable[str]) -> bool:
+    """
+    Writes the text to a file, unless the file already has exactly the same content.
+    The text can be given as a stream of chunks, which is written to a temporary file
+    while hashing, so the whole page is never held in memory. The contents are compared
+    by their SHA-256 hash and the temporary file replaces the original only if they differ.
+
+    Arguments:
+    ----------
+        path (str): Path to the file.
+        text (str | Iterable[str]): Text to write, or chunks of it.
+
+    Returns:
+    ----------
+        bool: True if the file was written, False if it was left untouched.
+    """
+    if isinstance(text, str):
+        text = [text]
+
+    new_hash = hashlib.sha256()
+    size = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        for chunk in text:
+            data = chunk.encode("utf-8")
+            new_hash.update(data)
+            size += len(data)
+            f.write(data)
+
+    if os.path.exists(path) and os.path.getsize(path) == size:
+        old_hash = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                old_hash.update(block)
+        if old_hash.digest() == new_hash.digest():
+            os.remove(tmp_path)
+            return False
+
+    os.replace(tmp_path, path)
+    return True
+
+def escapeAttribute(name: str, value) -> str:
+    """
+    Formats an Astro component attribute. Values containing double quotes
+    are passed as a JavaScript string expression instead of a quoted string.
+
+    Arguments:
+    ----------
+        name (str): Name of the attribute.
+        value: Value of the attribute.
+
+    Returns:
+    ----------
+        str: The attribute, e.g. `alt="Title"` or `alt={"Say \\"hi\\""}`.
+    """
+    value = str(value)
+    if '"' in value:
+        return f"{name}={{{json.dumps(value, ensure_ascii = False)}}}"
+    return f'{name}="{value}"'
 
 class Album:
     default_covers_path = "web/public/cover"
+    covers: set[str] | None = None
+    slug_registry: SlugRegistry | None = None
     """
     A class to represent an album containing games and screenshots.
 
@@ -74,6 +763,8 @@ class Album:
     name (str): The name of the album.
     games (list[str]): A list of games included in the album.
     screenshots (list[str], optional): A list of screenshots associated with the album (default is an empty list).
+    covers (set[str], optional): Names of available cover files, set by AstroBuilder. If None, the covers directory is checked.
+    slug_registry (SlugRegistry, optional): Registry of page names shared by albums of a build, set by AstroBuilder.
 
     Methods:
     -------
@@ -85,6 +776,8 @@ class Album:
         Builds and returns the HTML content for the album's cover.
     buildPageName():
         Generates and returns a URL-friendly page name based on the album's name.
+    buildPagePath(page=1):
+        Generates and returns the URL path of an album page.
     """
     def __init__(self, name: str, games: list[str], screenshots: list[dict] = None):
         """
@@ -108,22 +801,58 @@ class Album:
         """
         self.screenshots.append(screenshot)
 
-    def buildAlbumContent(self) -> str:
+    def buildAlbumContent(self, start: int = 0, end: int = None) -> str:
         """
         Generates HTML content for an album of screenshots.
         This method iterates over the `self.screenshots` list, which contains dictionaries
         with keys "link", "title", and "date". For each screenshot, it creates an HTML
         string representing an Astro <Screenshot /> component with the corresponding attributes.
 
+        Arguments:
+        ----------
+            start (int): Index of the first screenshot to include. Defaults to 0.
+            end (int, optional): Index after the last screenshot to include. Defaults to the end of the album.
+
         Returns:
         ----------
             str: An HTML string for Astro <AlbumCover />.
         """
-        screenshots_html = [
-            f'<Screenshot src="{screenshot["link"]}" alt="{screenshot["title"]}" date="{screenshot["date"]}" />'
-            for screenshot in self.screenshots
-        ]
-        return "".join(screenshots_html)
+        return "".join(self.iterAlbumContent(start, end))
+
+    def iterAlbumContent(self, start: int = 0, end: int = None) -> Iterator[str]:
+        """
+        Generates the Astro <Screenshot /> components of the album one by one, see buildAlbumContent.
+
+        Arguments:
+        ----------
+            start (int): Index of the first screenshot to include. Defaults to 0.
+            end (int, optional): Index after the last screenshot to include. Defaults to the end of the album.
+
+        Returns:
+        ----------
+            Iterator[str]: HTML strings for Astro <Screenshot />.
+        """
+        if end is None:
+            end = len(self.screenshots)
+
+        for i in range(start, min(end, len(self.screenshots))):
+            screenshot = self.screenshots[i]
+            yield (
+                f'<Screenshot {escapeAttribute("src", screenshot["link"])} {escapeAttribute("alt", screenshot["title"])}'
+                f' {escapeAttribute("date", screenshot["date"])}{self._buildImageAttributes(screenshot)} />'
+            )
+
+    @staticmethod
+    def _buildImageAttributes(screenshot: dict) -> str:
+        """
+        Builds attributes with the dimensions and thumbnails of a cached image, empty if the image is not cached.
+        """
+        if "thumbnail" not in screenshot:
+            return ""
+        return (
+            f' width={{{screenshot["width"]}}} height={{{screenshot["height"]}}}'
+            f' {escapeAttribute("thumbnail", screenshot["thumbnail"])} {escapeAttribute("srcset", screenshot["srcset"])}'
+        )
     
     def buildAlbumCover(self) -> str:
         """
@@ -135,11 +864,14 @@ class Album:
             str: An HTML string for Astro <AlbumCover />.
         """
         page_name = self.buildPageName()
-        cover_exists = os.path.exists(f"{self.default_covers_path}/{page_name}.svg")
+        if self.covers is not None:
+            cover_exists = page_name in self.covers
+        else:
+            cover_exists = os.path.exists(f"{self.default_covers_path}/{page_name}.svg")
         return f'''
             <AlbumCover
                 name="{self.name}"
-                path="/VirtualMoments/{page_name}/" 
+                path="{self.buildPagePath()}" 
                 { f'cover="{page_name}"' if cover_exists else "" }
             />
         '''
@@ -148,13 +880,31 @@ class Album:
         """
         Generates a formatted, html-friendly page name by replacing spaces with underscores,
         removing colons and apostrophes, and converting the string to lowercase.
+        The page name is checked for collisions with other albums if the album has a slug registry.
 
         Returns:
         ----------
             str: The formatted page name.
         """
+        if self.slug_registry is not None:
+            return self.slug_registry.slug(self.name)
+        return makeSlug(self.name)
 
-        return self.name.replace(' ', '_').replace(":", "").replace("'", "").lower()
+    def buildPagePath(self, page: int = 1) -> str:
+        """
+        Generates the URL path of an album page.
+
+        Arguments:
+        ----------
+            page (int): Number of the page. Defaults to 1.
+
+        Returns:
+        ----------
+            str: The URL path, e.g. "/VirtualMoments/album/" or "/VirtualMoments/album/2/".
+        """
+        if page == 1:
+            return f"/VirtualMoments/{self.buildPageName()}/"
+        return f"/VirtualMoments/{self.buildPageName()}/{page}/"
     
 class IndexPage:
     """
@@ -165,6 +915,7 @@ class IndexPage:
     default_page_dir (str): The default directory where the index page will be saved.
     template (str): The HTML template for the index page.
     albums (list[Album]): A list of Album objects to be included in the index page.
+    search (bool): Whether the search box and the link to recent screenshots are shown.
 
     Methods:
     ----------
@@ -175,23 +926,27 @@ class IndexPage:
     """
     default_page_dir = "web/src/pages"
 
-    def __init__(self, template: str, albums: list[Album]):
+    def __init__(self, template: str | PageTemplate, albums: list[Album], date: str = None, search: bool = False):
         """
         Initializes the instance with a template and a list of albums.
         Arguments:
         ----------
-            template (str): The template string to be used.
+            template (str | PageTemplate): The template string to be used.
             albums (list[Album]): A list of Album objects.
+            date (str, optional): Date of the last update shown in the footer. Defaults to today.
+            search (bool): Whether to show the search box, only if the search index is built. Default is False.
         """
-        self.template = template
+        self.template = template if isinstance(template, PageTemplate) else PageTemplate(template)
         self.albums = albums
+        self.date = date
+        self.search = search
 
     def buildIndexPage(self, save: bool = False, dir: str = None) -> str:
         """
         Builds the index page for the album collection.
         This method generates the HTML content for the index page by replacing
-        placeholders in the template with the album covers and the current date
-        in the footer. The generated HTML can either be saved to a file or returned
+        placeholders in the template with the album covers, the search box if enabled
+        and the current date in the footer. The generated HTML can either be saved to a file or returned
         as a string.
 
         Arguments:
@@ -205,76 +960,165 @@ class IndexPage:
         Returns:
         ----------
             str: The generated HTML content of the index page if `save` is False.
+            bool: Whether the file was written if `save` is True (False if it was already up to date).
         """
-        index_html = self.template.replace(
-            "<!-- ALBUMS -->",
-            "".join([album.buildAlbumCover() for album in self.albums])
-        )
-
-        index_html = index_html.replace(
-            "<!-- FOOTER -->",
-            f'<Footer date="{datetime.now().strftime("%d %B %Y")}" />'
+        index_html = self.template.render(
+            ALBUMS = (album.buildAlbumCover() for album in self.albums),
+            SEARCH = "<Search />" if self.search else "",
+            FOOTER = f'<Footer date="{self.date or datetime.now().strftime("%d %B %Y")}" />'
         )
 
         if save:
             if dir is None: dir = self.default_page_dir
 
-            with open(f"{dir}/index.astro", "w", encoding="utf-8") as f:
-                f.write(index_html)
+            return writeIfChanged(f"{dir}/index.astro", index_html)
         else:
-            return index_html
+            return "".join(index_html)
 
 class AlbumPage:
     """
     A class used to represent an Album Page.
+    Large albums can be split into pages of `page_size` screenshots. The first page is saved
+    as `<album>.astro`, the following ones as `<album>/<n>.astro`, with prev/next navigation
+    substituted for the `<!-- PAGINATION -->` placeholder of the template.
 
     Attributes:
     ----------
     default_page_dir (str): The default directory where the album page will be saved.
     template (str): The HTML template for the album page.
     album (Album): An instance of the Album class containing album data.
+    page_size (int | None): Maximum number of screenshots per page, None for a single page.
 
     Methods:
     ----------
-    buildAlbumPage(save=False, dir=None):
+    buildAlbumPage(save=False, dir=None, page=1):
         Builds the album page HTML. If save is True, saves the HTML to a file in the specified directory.
+    buildAlbumPages(dir=None):
+        Builds and saves all pages of the album, removing pages left over from a larger album.
     """
     default_page_dir = "web/src/pages"
 
-    def __init__(self, template: str, album: Album):
+    def __init__(self, template: str | PageTemplate, album: Album, page_size: int = None):
         """
         Initializes the BuildAstro class with the given template and album.
         Arguments:
         ----------
-            template (str): The template string to be used.
+            template (str | PageTemplate): The template string to be used.
             album (Album): An instance of the Album class.
+            page_size (int, optional): Maximum number of screenshots per page. Defaults to a single page.
         """
-        self.template = template
+        if page_size is not None and page_size < 1:
+            raise ValueError("Page size should be at least 1.")
+
+        self.template = template if isinstance(template, PageTemplate) else PageTemplate(template)
         self.album = album
+        self.page_size = page_size
+
+    @property
+    def n_pages(self) -> int:
+        if self.page_size is None:
+            return 1
+        return max(1, -(-len(self.album.screenshots) // self.page_size))
 
-    def buildAlbumPage(self, save: bool = False, dir: str = None):
+    def buildAlbumPage(self, save: bool = False, dir: str = None, page: int = 1):
         """
         Builds the HTML content for an album page.
         This method generates the HTML content for the album page by replacing
         placeholders in the template with the album content HTML. The generated
         HTML text can either be saved to a file or returned as a string.
+        When saving, the screenshots are streamed to the file one by one.
 
         Arguments:
         ----------
             save (bool): If True, the generated HTML content will be saved to a file. Defaults to False.
             dir (str, optional): The directory where the file should be saved.
                                  If None, the default directory will be used. Defaults to None.
+            page (int): Number of the page to build, starting from 1. Defaults to 1.
 
         Returns:
         ----------
             str: The generated HTML content if `save` is False.
+            bool: Whether the file was written if `save` is True (False if it was already up to date).
         """
-        album_html = self.template.replace("<!-- SCREENSHOTS -->", self.album.buildAlbumContent())
+        if not 1 <= page <= self.n_pages:
+            raise ValueError(f"Page {page} out of range, album has {self.n_pages} pages.")
+
+        if self.page_size is None:
+            content_html = self.album.iterAlbumContent()
+        else:
+            start = (page - 1) * self.page_size
+            content_html = self.album.iterAlbumContent(start, start + self.page_size)
+
+        template = self.template if page == 1 else self.template.nested()
+        album_html = template.render(SCREENSHOTS = content_html, PAGINATION = self.buildPagination(page))
 
         if save:
             if dir is None: dir = self.default_page_dir
 
-            with open(f"{dir}/{self.album.buildPageName()}.astro", "w", encoding="utf-8") as f:
-                f.write(album_html)
+            page_name = self.album.buildPageName()
+            if page == 1:
+                return writeIfChanged(f"{dir}/{page_name}.astro", album_html)
+
+            os.makedirs(f"{dir}/{page_name}", exist_ok = True)
+            return writeIfChanged(f"{dir}/{page_name}/{page}.astro", album_html)
         else:
-            return album_html
+            return "".join(album_html)
+
+    def pageFiles(self, dir: str = None) -> list[str]:
+        """
+        Returns:
+        ----------
+            list[str]: Paths of the page files of the album, first page first.
+        """
+        if dir is None: dir = self.default_page_dir
+
+        page_name = self.album.buildPageName()
+        return [f"{dir}/{page_name}.astro"] + [f"{dir}/{page_name}/{page}.astro" for page in range(2, self.n_pages + 1)]
+
+    def buildAlbumPages(self, dir: str = None) -> bool:
+        """
+        Builds and saves all pages of the album. Pages beyond the current number of pages,
+        left over from previous builds, are removed.
+
+        Arguments:
+        ----------
+            dir (str, optional): The directory where the files should be saved.
+                                 If None, the default directory will be used. Defaults to None.
+
+        Returns:
+        ----------
+            bool: Whether any page file was written or removed.
+        """
+        if dir is None: dir = self.default_page_dir
+
+        written = [self.buildAlbumPage(save = True, dir = dir, page = page) for page in range(1, self.n_pages + 1)]
+
+        pages_dir = f"{dir}/{self.album.buildPageName()}"
+        if os.path.isdir(pages_dir):
+            for file_name in os.listdir(pages_dir):
+                page_number = file_name.removesuffix(".astro")
+                if page_number.isdigit() and int(page_number) > self.n_pages:
+                    os.remove(f"{pages_dir}/{file_name}")
+                    written.append(True)
+
+        return any(written)
+
+    def buildPagination(self, page: int) -> str:
+        """
+        Generates an HTML string for the Astro <Pagination /> component with links
+        to the previous and next pages. Empty if the album has a single page.
+
+        Arguments:
+        ----------
+            page (int): Number of the current page.
+
+        Returns:
+        ----------
+            str: An HTML string for Astro <Pagination />.
+        """
+        if self.n_pages == 1:
+            return ""
+
+        prev_attr = f'prev="{self.album.buildPagePath(page - 1)}"' if page > 1 else ""
+        next_attr = f'next="{self.album.buildPagePath(page + 1)}"' if page < self.n_pages else ""
+        return f'<Pagination page={{{page}}} pages={{{self.n_pages}}} {prev_attr} {next_attr} />'
@@ -0,0 +1,90 @@
+"""
+Record of the previous build, saved next to the Astro project as build_manifest.json.
+It keeps the screenshot ids (page links) and a hash of every album, so a build can list
+what was added and removed since the previous one, skip rendering albums that did not
+change and tell whether there is anything to deploy at all.
+"""
+import json
+import logging
+import os
+from .ContentStore import atomicWrite
+
+class BuildManifest:
+    """
+    Albums of a build, their screenshot ids and hashes, and the change feed of the build.
+
+    Arguments:
+    ----------
+        path (str): Path to the build manifest file.
+    """
+    logger = logging.getLogger("BuildManifest")
+
+    def __init__(self, path: str):
+        self.path = path
+        # date shown in the footer, the date of the last build that changed anything
+        self.updated: str | None = None
+        self.index: str | None = None
+        self.albums: dict[str, dict] = {}
+        self.changes: dict[str, dict[str, list[str]]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "BuildManifest":
+        """
+        Loads the manifest of the previous build. A missing or unreadable manifest
+        loads empty, as if nothing was built before.
+
+        Returns:
+        ----------
+            BuildManifest: The loaded manifest.
+        """
+        manifest = cls(path)
+        try:
+            with open(path, "r", encoding = "utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return manifest
+        except (OSError, ValueError):
+            cls.logger.warning(f"Ignoring unreadable build manifest {path}", exc_info = True)
+            return manifest
+
+        manifest.updated = data.get("updated")
+        manifest.index = data.get("index")
+        manifest.albums = data.get("albums", {})
+        manifest.changes = data.get("changes", {})
+        return manifest
+
+    def save(self):
+        data = {"updated": self.updated, "index": self.index, "albums": self.albums, "changes": self.changes}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok = True)
+        atomicWrite(self.path, [json.dumps(data, ensure_ascii = False, indent = 1)])
+
+    def albumHash(self, name: str) -> str | None:
+        album = self.albums.get(name)
+        return album["hash"] if album is not None else None
+
+    def changeFeed(self, albums: dict[str, list[str]]) -> dict[str, dict[str, list[str]]]:
+        """
+        Compares screenshot ids of albums of a new build with this manifest.
+
+        Arguments:
+        ----------
+            albums (dict[str, list[str]]): Screenshot ids of every album of the new build, keyed by album name.
+
+        Returns:
+        ----------
+            dict[str, dict[str, list[str]]]: Added and removed ids of every changed album, in album order.
+                                             New albums list all their ids as added, removed albums as removed.
+        """
+        feed = {}
+        for name, ids in albums.items():
+            previous = self.albums.get(name, {}).get("ids", [])
+            previous_set, ids_set = set(previous), set(ids)
+            added = [i for i in ids if i not in previous_set]
+            removed = [i for i in previous if i not in ids_set]
+            if added or removed:
+                feed[name] = {"added": added, "removed": removed}
+
+        for name, album in self.albums.items():
+            if name not in albums and album["ids"]:
+                feed[name] = {"added": [], "removed": album["ids"]}
+        return feed
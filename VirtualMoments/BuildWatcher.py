@@ -0,0 +1,109 @@
+"""
+Watch mode of the build. Polls the manifest, the content store, the page templates and
+album covers, and rebuilds the Astro pages when any of them changes. Pages are written
+only if their content changed (see writeIfChanged), so the Astro dev server reloads
+just the affected pages.
+"""
+import logging
+import os
+import time
+from .AstroBuilder import AstroBuilder
+
+class BuildWatcher:
+    """
+    Rebuilds the Astro project whenever its inputs change.
+
+    Arguments:
+    ----------
+        web_dir (str): Path to the web/ directory containing templates and output pages.
+        manifest (str): Path to manifest.yaml.
+        content (str | list[str]): Path to the content store, or paths of several stores.
+        workers (int): Number of processes rendering album pages.
+        interval (float): Interval of polling the inputs in seconds.
+    """
+    logger = logging.getLogger("BuildWatcher")
+    templates = ("album_template.astro", "index_template.astro")
+
+    def __init__(self, web_dir: str, manifest: str, content: str | list[str], workers: int = 1, interval: float = 0.5):
+        self.web_dir = web_dir
+        self.manifest = manifest
+        self.content = content
+        self.workers = workers
+        self.interval = interval
+        self.watched = [
+            manifest,
+            *([content] if isinstance(content, str) else content),
+            *(os.path.join(web_dir, "src", "pages", template) for template in self.templates),
+            os.path.join(web_dir, "public", "cover"),
+        ]
+        self._snapshot = None
+
+    def snapshot(self) -> dict[str, tuple]:
+        """
+        Returns:
+        ----------
+            dict[str, tuple]: Modification time and size of every watched file, and of files
+                              in watched directories. Missing paths are left out.
+        """
+        snapshot = {}
+        for path in self.watched:
+            if os.path.isdir(path):
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            elif os.path.exists(path):
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def build(self) -> bool:
+        """
+        Builds the project once. Errors, e.g. an invalid manifest saved mid-edit, are logged
+        and the watcher keeps running.
+
+        Returns:
+        ----------
+            bool: True if the build succeeded.
+        """
+        start = time.perf_counter()
+        try:
+            AstroBuilder(self.web_dir, self.manifest, self.content).build(workers = self.workers)
+        except Exception:
+            self.logger.exception("Build failed, waiting for the next change")
+            return False
+        self.logger.info(f"Built in {time.perf_counter() - start:.2f}s")
+        return True
+
+    def poll(self) -> bool:
+        """
+        Checks the inputs once and rebuilds if any of them changed since the last check.
+        The first poll always builds.
+
+        Returns:
+        ----------
+            bool: True if a build was run.
+        """
+        snapshot = self.snapshot()
+        if snapshot == self._snapshot:
+            return False
+
+        if self._snapshot is not None:
+            changed = {path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path)}
+            self.logger.info(f"Changed: {', '.join(sorted(changed))}")
+        self.build()
+        # the build itself may update the content store with cached image data
+        self._snapshot = self.snapshot()
+        return True
+
+    def run(self):
+        """
+        Builds the project and rebuilds it on every change, until interrupted.
+        """
+        self.logger.info(f"Watching {', '.join(self.watched)}")
+        try:
+            while True:
+                self.poll()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            self.logger.info("Stopped watching")
@@ -0,0 +1,305 @@
+"""
+On-disk store of scraped screenshot metadata. Records are kept as JSON Lines,
+one screenshot per line keyed by its page link, so that new screenshots can be
+appended as they are fetched and the file is loaded without a YAML parser.
+"""
+import json
+import logging
+import os
+from dataclasses import asdict, is_dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+class ContentStore:
+    """
+    Append-only JSON Lines store of screenshot records.
+    If the same page link is written more than once, the latest record wins,
+    keeping the position of the first one.
+
+    Arguments:
+    ----------
+        path (str): Path to the .jsonl content file. It is created on the first append.
+    """
+    logger = logging.getLogger("ContentStore")
+
+    def __init__(self, path: str):
+        if path.endswith((".yaml", ".yml")):
+            raise ValueError(
+                f"{path} is a legacy YAML content file, convert it with `python -m VirtualMoments migrate -o {path}` first."
+            )
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def iterRecords(self) -> Iterator[dict]:
+        """
+        Streams raw records from the file in the order they were written, including
+        superseded duplicates. Torn lines, left by an interrupted write, are skipped.
+
+        Returns:
+        ----------
+            Iterator[dict]: Screenshot records.
+        """
+        if not self.exists():
+            return
+
+        with open(self.path, "r", encoding = "utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    self.logger.warning(f"Skipping torn record in {self.path}: {line[:80]!r}")
+
+    def load(self) -> list[dict]:
+        """
+        Loads all records, de-duplicated by page link.
+
+        Returns:
+        ----------
+            list[dict]: Screenshot records in the order they were first written.
+        """
+        return list(self.index().values())
+
+    def index(self) -> dict[str, dict]:
+        """
+        Loads all records into a dictionary keyed by page link.
+
+        Returns:
+        ----------
+            dict[str, dict]: Latest record of every page link, in the order they were first written.
+        """
+        records = {}
+        for record in self.iterRecords():
+            records[record["page_link"]] = record
+        return records
+
+    def append(self, records: Iterable, sync: bool = False) -> int:
+        """
+        Appends records at the end of the file. Accepts dictionaries or dataclass instances
+        (e.g. Screenshot).
+
+        Arguments:
+        ----------
+            records (Iterable[dict | Screenshot]): Records to append.
+            sync (bool): If True, the records are flushed to disk before returning,
+                         so they survive the process being killed. Defaults to False.
+
+        Returns:
+        ----------
+            int: Number of appended records.
+        """
+        n = 0
+        with open(self.path, "a+b") as f:
+            # a torn record left without a newline would swallow the first appended one
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            for record in records:
+                f.write(self._dumpRecord(record).encode("utf-8"))
+                n += 1
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        return n
+
+    def write(self, records: Iterable):
+        """
+        Replaces the content of the store with the given records. The file is written
+        to a temporary file first and swapped in, so a crash never leaves a partial store.
+
+        Arguments:
+        ----------
+            records (Iterable[dict | Screenshot]): Records to write.
+        """
+        atomicWrite(self.path, (self._dumpRecord(record) for record in records))
+
+    def compact(self):
+        """
+        Rewrites the store without superseded duplicate records.
+        """
+        self.write(self.load())
+
+    def compactIfNeeded(self, max_superseded: float = 0.25) -> bool:
+        """
+        Compacts the store if it holds more superseded records than the given fraction
+        of its current ones. Every revalidated or re-cached screenshot is appended again,
+        so without compaction the store grows with every run.
+
+        Arguments:
+        ----------
+            max_superseded (float): Allowed ratio of superseded to current records. Default is 0.25.
+
+        Returns:
+        ----------
+            bool: Whether the store was compacted.
+        """
+        records = {}
+        n_lines = 0
+        for record in self.iterRecords():
+            records[record["page_link"]] = record
+            n_lines += 1
+
+        n_superseded = n_lines - len(records)
+        if n_superseded <= max_superseded * len(records):
+            return False
+
+        self.write(records.values())
+        self.logger.info(f"Compacted {self.path}, removed {n_superseded} superseded records")
+        return True
+
+    def migrateDates(self) -> int:
+        """
+        Adds ISO timestamps to records written before dates were normalized
+        (see SteamDates.migrateRecords). The store is rewritten, compacted,
+        only if any record was migrated.
+
+        Returns:
+        ----------
+            int: Number of migrated records.
+        """
+        from .SteamDates import migrateRecords
+
+        records, n = migrateRecords(self.load())
+        if n:
+            self.write(records)
+        self.logger.info(f"Migrated dates of {n} of {len(records)} records in {self.path}")
+        return n
+
+    @classmethod
+    def fromLegacyYaml(cls, yaml_path: str, path: str) -> "ContentStore":
+        """
+        Converts a legacy YAML content file into a JSON Lines store.
+
+        Arguments:
+        ----------
+            yaml_path (str): Path to the legacy content.yaml file.
+            path (str): Path to the .jsonl store to create.
+
+        Returns:
+        ----------
+            ContentStore: The created store.
+        """
+        store = cls(path)
+        store.write(loadLegacyYaml(yaml_path))
+        return store
+
+    @staticmethod
+    def _dumpRecord(record) -> str:
+        if is_dataclass(record):
+            record = asdict(record)
+        return json.dumps(record, ensure_ascii = False, separators = (",", ":")) + "\n"
+
+class ScrapeState:
+    """
+    Checkpoint of a scrape run, kept next to the content store as `<store>.state.json`.
+    Records the listed profile links and the links that failed, so an interrupted or
+    partially failed run can be resumed without listing the profile again.
+
+    Arguments:
+    ----------
+        path (str): Path to the state file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.profile_links: list[str] = []
+        self.failed_links: list[str] = []
+        self.complete: bool = False
+
+    @classmethod
+    def forStore(cls, store: ContentStore) -> "ScrapeState":
+        return cls(f"{store.path}.state.json")
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> "ScrapeState":
+        with open(self.path, "r", encoding = "utf-8") as f:
+            state = json.load(f)
+        self.profile_links = state.get("profile_links", [])
+        self.failed_links = state.get("failed_links", [])
+        self.complete = state.get("complete", False)
+        return self
+
+    def save(self):
+        """
+        Atomically replaces the state file with the current state.
+        """
+        atomicWrite(self.path, [json.dumps({
+            "profile_links": self.profile_links,
+            "failed_links": self.failed_links,
+            "complete": self.complete,
+        }, ensure_ascii = False)])
+
+def atomicWrite(path: str, chunks: Iterable[str]):
+    """
+    Writes text to a temporary file, syncs it and swaps it in place of `path`,
+    so readers and crashes never observe a partially written file.
+
+    Arguments:
+    ----------
+        path (str): Destination file path.
+        chunks (Iterable[str]): Text chunks to write.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding = "utf-8") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+@lru_cache
+def _legacyContentLoader() -> type:
+    """
+    Returns a safe YAML loader that also reads Screenshot objects dumped with Python object tags
+    by older versions of the scrapper, as plain dictionaries. Created on first use, so yaml
+    is only imported when a legacy file is read.
+    """
+    import yaml
+
+    class LegacyContentLoader(yaml.SafeLoader):
+        pass
+
+    def constructLegacyScreenshot(loader: yaml.SafeLoader, suffix: str, node: yaml.Node) -> dict:
+        return loader.construct_mapping(node)
+
+    LegacyContentLoader.add_multi_constructor("tag:yaml.org,2002:python/object:", constructLegacyScreenshot)
+    return LegacyContentLoader
+
+def loadLegacyYaml(path: str) -> list[dict]:
+    """
+    Loads screenshot records from a legacy YAML content file.
+
+    Arguments:
+    ----------
+        path (str): Path to the content.yaml file.
+
+    Returns:
+    ----------
+        list[dict]: Screenshot records.
+    """
+    import yaml
+
+    with open(path, "r", encoding = "utf-8") as f:
+        return yaml.load(f, Loader = _legacyContentLoader()) or []
+
+def loadContent(path: str) -> list[dict]:
+    """
+    Loads screenshot records from a content file, either a JSON Lines store
+    or a legacy YAML file.
+
+    Arguments:
+    ----------
+        path (str): Path to the content file.
+
+    Returns:
+    ----------
+        list[dict]: Screenshot records.
+    """
+    if path.endswith((".yaml", ".yml")):
+        return loadLegacyYaml(path)
+    return ContentStore(path).load()
@@ -0,0 +1,165 @@
+"""
+Pool of headless Chrome drivers for Selenium profile listing. Starting Chrome takes
+seconds, so listings of several profiles, retries and fallbacks borrow a running browser
+from the pool instead of starting and quitting one every time.
+Selenium is imported only when the first browser is started.
+"""
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterable, Iterator
+import logging
+import threading
+from .Metrics import metrics
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+class DriverPool:
+    """
+    Pool of up to `size` headless Chrome drivers. A borrowed driver is checked to still
+    respond before it is handed out, and replaced if it does not. Drivers are quit and
+    replaced after `max_uses` listings, so a long run does not keep a browser whose memory
+    grows with every visited profile. Use the pool as a context manager to quit all its
+    drivers at the end.
+
+    Only anchor hrefs matter for listing, so images, fonts and stylesheets can be blocked,
+    images through Chrome preferences and all of them through CDP URL blocking.
+
+    Arguments:
+    ----------
+        size (int): Maximum number of drivers open at once. Borrowing waits while all are in use.
+        max_uses (int, optional): Number of uses after which a driver is replaced. Defaults to never.
+        block (Iterable[str]): Resource types not loaded by the browser: "images", "fonts" and "css".
+    """
+    logger = logging.getLogger("DriverPool")
+
+    blocked_urls = {
+        "images": ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico"],
+        "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+        "css": ["*.css"],
+    }
+
+    def __init__(self, size: int = 1, max_uses: int = None, block: Iterable[str] = ()):
+        if size < 1:
+            raise ValueError("Pool size should be at least 1.")
+        if max_uses is not None and max_uses < 1:
+            raise ValueError("Number of uses of a driver should be at least 1.")
+        self.block = list(block)
+        unknown = set(self.block) - set(self.blocked_urls)
+        if unknown:
+            raise ValueError(f"Unknown resource types to block: {sorted(unknown)}")
+
+        self.size = size
+        self.max_uses = max_uses
+        # idle drivers with their number of uses
+        self._idle: list[tuple["webdriver.Chrome", int]] = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self) -> "DriverPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @contextmanager
+    def driver(self) -> Iterator["webdriver.Chrome"]:
+        """
+        Borrows a driver for the duration of the `with` block. A driver whose use raised
+        an exception is quit instead of returned, as its browser may be in any state.
+
+        Returns:
+        ----------
+            Iterator[webdriver.Chrome]: Context manager of a healthy driver.
+        """
+        with self._slots:
+            driver, uses = self._borrow()
+            healthy = False
+            try:
+                yield driver
+                healthy = True
+            finally:
+                self._release(driver, uses + 1, healthy)
+
+    def close(self):
+        """
+        Quits all idle drivers. Drivers borrowed at the time are quit when they are returned.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver, _ in idle:
+            self._quit(driver)
+
+    def _borrow(self) -> tuple["webdriver.Chrome", int]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                driver, uses = self._idle.pop()
+            if self._isHealthy(driver):
+                metrics.count("browser.reused")
+                return driver, uses
+            self.logger.debug("\tReplacing unresponsive browser")
+            metrics.count("browser.unhealthy")
+            self._quit(driver)
+
+        with metrics.span("listing.browser_start"):
+            driver = self._createDriver()
+        metrics.count("browser.started")
+        return driver, 0
+
+    def _release(self, driver: "webdriver.Chrome", uses: int, healthy: bool):
+        if not healthy or (self.max_uses is not None and uses >= self.max_uses):
+            if healthy:
+                metrics.count("browser.recycled")
+            self._quit(driver)
+            return
+        with self._lock:
+            if not self._closed:
+                self._idle.append((driver, uses))
+                return
+        self._quit(driver)
+
+    @staticmethod
+    def _isHealthy(driver: "webdriver.Chrome") -> bool:
+        try:
+            return driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def _quit(self, driver: "webdriver.Chrome"):
+        try:
+            driver.quit()
+        except Exception:
+            self.logger.debug("\tFailed quitting browser", exc_info = True)
+
+    def chromeOptions(self) -> "Options":
+        """
+        Returns:
+        ----------
+            Options: Options of headless Chrome, with images disabled if they are blocked.
+        """
+        from selenium.webdriver.chrome.options import Options
+
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")  # Run in headless mode
+        chrome_options.add_argument("--disable-gpu")  # Disable GPU (recommended for headless)
+        chrome_options.add_argument("--no-sandbox")  # Required for some Linux environments
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        if "images" in self.block:
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        return chrome_options
+
+    def _createDriver(self) -> "webdriver.Chrome":
+        from selenium import webdriver
+
+        self.logger.debug("\tSetting up selenium")
+        driver = webdriver.Chrome(options = self.chromeOptions())
+
+        urls = [url for resource in self.block for url in self.blocked_urls[resource]]
+        if urls:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+        return driver
@@ -0,0 +1,107 @@
+"""
+Parsing of Steam profile and screenshot pages. BeautifulSoup builds only the nodes
+that are needed (SoupStrainer) and uses lxml when it is installed. Screenshot links
+can also be extracted with a regular expression, without building a tree at all.
+"""
+from bs4 import BeautifulSoup, SoupStrainer
+import html
+import re
+
+try:
+    import lxml  # noqa: F401
+    parser_features = "lxml"
+except ImportError:
+    parser_features = "html.parser"
+
+link_backend = "soup"
+
+_link_strainer = SoupStrainer("a", href = re.compile("sharedfiles/filedetails"))
+_metadata_strainer = SoupStrainer(
+    attrs = {"class": re.compile(r"(^|\s)(screenshotAppName|screenshotDescription|detailsStatRight)(\s|$)")}
+)
+_link_pattern = re.compile(
+    r"""<a\s[^>]*?\bhref\s*=\s*["']([^"']*sharedfiles/filedetails[^"']*)["']""",
+    re.IGNORECASE
+)
+_media_pattern = re.compile(r"""<img\s[^>]*\bid\s*=\s*["']ActualMedia["'][^>]*>""", re.IGNORECASE)
+_src_pattern = re.compile(r"""\bsrc\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+
+def setParserBackend(backend: str):
+    """
+    Selects the parser backend.
+
+    Arguments:
+    ----------
+        backend (str): "lxml" or "html.parser" selects the BeautifulSoup tree builder,
+                       "regex" extracts screenshot links with a regular expression
+                       (metadata is still parsed with the best available tree builder).
+    """
+    global parser_features, link_backend
+
+    if backend == "regex":
+        link_backend = "regex"
+    elif backend in ("lxml", "html.parser"):
+        if backend == "lxml":
+            import lxml  # noqa: F401
+        parser_features = backend
+        link_backend = "soup"
+    else:
+        raise ValueError(f"Unknown parser backend: {backend}")
+
+def findScreenshotLinks(html_text: str) -> list[str]:
+    """
+    Finds all links to screenshot pages ("sharedfiles/filedetails") in the HTML content.
+
+    Arguments:
+    ----------
+        html_text (str): HTML content of a profile page.
+
+    Returns:
+    ----------
+        list[str]: Screenshot page links, in the order they appear on the page.
+    """
+    if link_backend == "regex":
+        return [html.unescape(href) for href in _link_pattern.findall(html_text)]
+
+    soup = BeautifulSoup(html_text, parser_features, parse_only = _link_strainer)
+    return [a.get("href") for a in soup.find_all("a")]
+
+def parseScreenshotPage(html_text: str) -> dict[str, str]:
+    """
+    Extracts raw metadata from a screenshot page. Only the #ActualMedia image and the
+    .screenshotAppName, .screenshotDescription and .detailsStatRight nodes are parsed.
+
+    Arguments:
+    ----------
+        html_text (str): HTML content of a screenshot page.
+
+    Returns:
+    ----------
+        dict: A dictionary with the raw metadata:
+            - game (str): The name of the game.
+            - title (str | None): The description of the screenshot, None if missing.
+            - link (str): The URL of the screenshot image, without query.
+            - date (str): The date as displayed by Steam.
+
+    Raises:
+    ----------
+        ValueError: If the page is missing the screenshot image or details.
+    """
+    media = _media_pattern.search(html_text)
+    src = _src_pattern.search(media.group(0)) if media else None
+    if src is None:
+        raise ValueError("Screenshot image not found on the page.")
+
+    soup = BeautifulSoup(html_text, parser_features, parse_only = _metadata_strainer)
+    game = soup.select_one("div.screenshotAppName a")
+    title = soup.select_one("div.screenshotDescription")
+    details = soup.select("div.detailsStatRight")
+    if game is None or len(details) < 2:
+        raise ValueError("Screenshot details not found on the page.")
+
+    return {
+        "game": game.text,
+        "title": title.text if title else None,
+        "link": html.unescape(src.group(1)).split("?")[0],
+        "date": details[1].text,
+    }
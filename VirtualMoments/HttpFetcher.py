@@ -0,0 +1,204 @@
+"""
+Shared HTTP fetch layer for steamcommunity.com pages. Keeps connections alive
+in a pooled session, applies timeouts and retries transient failures with backoff.
+"""
+import requests as rq
+from requests.adapters import HTTPAdapter
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import logging
+import random
+import threading
+import time
+from .RateLimiter import TokenBucket
+from .Metrics import metrics
+
+class FetchStats:
+    """
+    Thread-safe counters of requests made by the HttpFetcher.
+
+    Attributes:
+    ----------
+        requests (int): Number of requests sent, including retries.
+        retries (int): Number of retried requests.
+        failures (int): Number of URLs that could not be fetched after all retries.
+        statuses (Counter): Number of responses per HTTP status code, "error" for connection errors.
+        latencies (list[float]): Duration of every request in seconds.
+    """
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.statuses = Counter()
+        self.latencies: list[float] = []
+        self._lock = threading.Lock()
+
+    def record(self, status: int | str, latency: float):
+        with self._lock:
+            self.requests += 1
+            self.statuses[status] += 1
+            self.latencies.append(latency)
+
+    def recordRetry(self):
+        with self._lock:
+            self.retries += 1
+
+    def recordFailure(self):
+        with self._lock:
+            self.failures += 1
+
+    def summary(self) -> dict:
+        """
+        Returns:
+        ----------
+            dict: Counters and latency statistics of all requests made so far.
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "statuses": dict(self.statuses),
+                "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+                "latency_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+            }
+
+class HttpFetcher:
+    """
+    Fetches pages through a shared requests.Session with a bounded connection pool,
+    so consecutive requests to steamcommunity.com reuse the same TCP/TLS connections.
+    Transient failures (connection errors, timeouts, 429 and 5xx responses) are retried
+    with exponential backoff and jitter, honoring the Retry-After header if present.
+
+    Arguments:
+    ----------
+        pool_size (int): Maximum number of kept-alive connections. Should match the number of workers.
+        timeout (tuple[float, float]): Connect and read timeouts in seconds.
+        max_retries (int): Number of retries of a single URL before giving up.
+        backoff (float): Base of the exponential backoff in seconds.
+        max_backoff (float): Upper limit of a single backoff wait in seconds.
+        rate_limiter (TokenBucket, optional): Limiter every request attempt, including retries, waits for.
+    """
+    logger = logging.getLogger("HttpFetcher")
+    retry_statuses = {429, 500, 502, 503, 504}
+
+    def __init__(
+            self,
+            pool_size: int = 1,
+            timeout: tuple[float, float] = (5, 30),
+            max_retries: int = 4,
+            backoff: float = 2,
+            max_backoff: float = 120,
+            rate_limiter: TokenBucket = None
+        ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter
+        self.stats = FetchStats()
+
+        self.session = rq.Session()
+        self.resizePool(pool_size)
+
+    def resizePool(self, pool_size: int):
+        """
+        Mounts a new connection pool adapter of the given size on the session.
+
+        Arguments:
+        ----------
+            pool_size (int): Maximum number of kept-alive connections per host.
+        """
+        adapter = HTTPAdapter(pool_connections = 1, pool_maxsize = pool_size, pool_block = True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, headers: dict = None) -> rq.Response:
+        """
+        Fetches the URL, retrying transient failures.
+
+        Arguments:
+        ----------
+            url (str): URL to fetch.
+            headers (dict, optional): Additional request headers.
+
+        Returns:
+        ----------
+            requests.Response: Successful response.
+
+        Raises:
+        ----------
+            requests.RequestException: If the request fails with a non-retryable status
+                                       or all retries are exhausted.
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            last_attempt = attempt == self.max_retries
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, headers = headers, timeout = self.timeout)
+            except (rq.ConnectionError, rq.Timeout) as e:
+                self.stats.record("error", time.monotonic() - start)
+                metrics.count("http.requests")
+                metrics.count("http.errors")
+                if last_attempt:
+                    self.stats.recordFailure()
+                    raise
+                wait = self._backoffTime(attempt)
+                self.logger.warning(f"\t{type(e).__name__} for {url}, retrying in {wait:.1f}s")
+            else:
+                self.stats.record(response.status_code, time.monotonic() - start)
+                metrics.record("http.request", time.monotonic() - start)
+                metrics.count("http.requests")
+                metrics.count("http.bytes", len(response.content))
+                if response.status_code not in self.retry_statuses:
+                    if not response.ok:
+                        self.stats.recordFailure()
+                    response.raise_for_status()
+                    return response
+                if last_attempt:
+                    self.stats.recordFailure()
+                    response.raise_for_status()
+                wait = self._retryAfter(response)
+                if wait is None:
+                    wait = self._backoffTime(attempt)
+                self.logger.warning(f"\tStatus {response.status_code} for {url}, retrying in {wait:.1f}s")
+
+            self.stats.recordRetry()
+            metrics.count("http.retries")
+            time.sleep(wait)
+
+    def _backoffTime(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter: a random wait between 0 and backoff * 2^attempt.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _retryAfter(self, response: rq.Response) -> float | None:
+        """
+        Parses the Retry-After header, given either in seconds or as an HTTP date.
+
+        Returns:
+        ----------
+            float | None: Number of seconds to wait, None if the header is missing or invalid.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is None:
+            return None
+
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+
+        try:
+            retry_date = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        if retry_date.tzinfo is None:
+            retry_date = retry_date.replace(tzinfo = timezone.utc)
+        return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,147 @@
+"""
+Local cache of screenshot images. Every image is downloaded from the Steam CDN once,
+stored under its SHA-256 hash, measured and downscaled into thumbnails served by the
+site, so neither Astro nor the browser needs the full-resolution originals for the grid.
+"""
+import hashlib
+import json
+import logging
+import os
+from .HttpFetcher import HttpFetcher
+from .ContentStore import atomicWrite
+
+from PIL import Image
+
+class ImageCache:
+    """
+    Content-addressed cache of screenshot images with thumbnails.
+
+    Layout:
+        <cache_dir>/index.json          - image URL -> hash, dimensions and thumbnails
+        <cache_dir>/objects/ab/abcd...  - downloaded originals, named by their SHA-256 hash
+        <thumbs_dir>/abcd..._480.jpg    - thumbnails, served at <thumbs_url>/abcd..._480.jpg
+
+    Arguments:
+    ----------
+        cache_dir (str): Directory of the cache, kept between builds.
+        thumbs_dir (str): Public directory thumbnails are written to, e.g. web/public/thumbs.
+        thumbs_url (str): URL path the thumbnails directory is served at.
+        widths (list[int]): Widths of generated thumbnails. Widths not smaller than the original are skipped.
+        fetcher (HttpFetcher, optional): Fetcher used for downloads. Defaults to a new one with `workers` connections.
+        workers (int): Number of concurrent downloads the default fetcher is sized for. Default is 4.
+    """
+    logger = logging.getLogger("ImageCache")
+    thumbnail_quality = 85
+
+    def __init__(
+            self,
+            cache_dir: str,
+            thumbs_dir: str,
+            thumbs_url: str = "/VirtualMoments/thumbs",
+            widths: list[int] = (480, 960),
+            fetcher: HttpFetcher = None,
+            workers: int = 4
+        ):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.thumbs_dir = thumbs_dir
+        self.thumbs_url = thumbs_url
+        self.widths = sorted(widths)
+        # one connection per download thread, a smaller blocking pool would serialize the downloads
+        self.fetcher = fetcher if fetcher is not None else HttpFetcher(pool_size = workers)
+
+        os.makedirs(self.objects_dir, exist_ok = True)
+        os.makedirs(self.thumbs_dir, exist_ok = True)
+
+        self.index: dict[str, dict] = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding = "utf-8") as f:
+                self.index = json.load(f)
+
+    def save(self):
+        """
+        Saves the index of cached images.
+        """
+        atomicWrite(self.index_path, [json.dumps(self.index, separators = (",", ":"))])
+
+    def process(self, url: str) -> dict:
+        """
+        Makes sure the image is cached and its thumbnails exist. The image is downloaded
+        only if it is not in the cache yet.
+
+        Arguments:
+        ----------
+            url (str): URL of the full-resolution image.
+
+        Returns:
+        ----------
+            dict: Image data to be stored with the screenshot record:
+                - width (int), height (int): Dimensions of the original image.
+                - thumbnail (str): URL of the smallest thumbnail (the original URL if no thumbnail applies).
+                - srcset (str): srcset attribute value with all thumbnails.
+        """
+        entry = self.index.get(url)
+        if entry is None or not self._thumbnailsExist(entry):
+            entry = self._cacheImage(url, entry)
+            self.index[url] = entry
+
+        thumbnails = sorted((int(w), path) for w, path in entry["thumbnails"].items())
+        srcset = [f"{self.thumbs_url}/{path} {w}w" for w, path in thumbnails]
+        srcset.append(f"{url} {entry['width']}w")
+
+        return {
+            "width": entry["width"],
+            "height": entry["height"],
+            "thumbnail": f"{self.thumbs_url}/{thumbnails[0][1]}" if thumbnails else url,
+            "srcset": ", ".join(srcset),
+        }
+
+    def _cacheImage(self, url: str, entry: dict | None) -> dict:
+        digest = entry["sha256"] if entry is not None else None
+        if digest is None or not os.path.exists(self._objectPath(digest)):
+            self.logger.debug(f"\tDownloading {url}")
+            digest = self._download(url)
+
+        with Image.open(self._objectPath(digest)) as image:
+            width, height = image.size
+            thumbnails = {}
+            for thumb_width in self.widths:
+                if thumb_width >= width:
+                    continue
+                file_name = f"{digest[:32]}_{thumb_width}.jpg"
+                thumb_height = round(height * thumb_width / width)
+                thumbnail = image.convert("RGB").resize((thumb_width, thumb_height), Image.LANCZOS)
+                thumbnail.save(os.path.join(self.thumbs_dir, file_name), "JPEG", quality = self.thumbnail_quality)
+                thumbnails[str(thumb_width)] = file_name
+
+        return {"sha256": digest, "width": width, "height": height, "thumbnails": thumbnails}
+
+    def _download(self, url: str) -> str:
+        """
+        Downloads the image into the object store.
+
+        Returns:
+        ----------
+            str: SHA-256 hash of the image content.
+        """
+        data = self.fetcher.get(url).content
+        digest = hashlib.sha256(data).hexdigest()
+
+        path = self._objectPath(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def _objectPath(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _thumbnailsExist(self, entry: dict) -> bool:
+        expected = {str(w) for w in self.widths if w < entry["width"]}
+        return expected == set(entry["thumbnails"]) and all(
+            os.path.exists(os.path.join(self.thumbs_dir, path)) for path in entry["thumbnails"].values()
+        )
@@ -0,0 +1,143 @@
+"""
+Timing and counting instrumentation of the scrape-and-build pipeline. Spans measure
+wall time of pipeline phases, counters track requests, retries, cache hits and bytes.
+The shared `metrics` instance is reported as JSON at the end of a run.
+"""
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import TextIO
+
+class Metrics:
+    """
+    Thread-safe collection of wall-time spans and counters.
+
+    Methods:
+    ----------
+    span(name):
+        Context manager measuring the wall time of the enclosed block.
+    record(name, seconds):
+        Records a span measured elsewhere, e.g. in a worker process.
+    count(name, n=1):
+        Increments a counter.
+    report():
+        Returns a dictionary with span statistics and counters.
+    """
+    def __init__(self):
+        self.spans: dict[str, list[float]] = {}
+        self.counters = Counter()
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.spans.setdefault(name, []).append(seconds)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+            self.started = time.perf_counter()
+
+    def report(self) -> dict:
+        """
+        Returns:
+        ----------
+            dict: Total wall time, statistics of every span (count, total, mean, max in seconds) and counters.
+        """
+        with self._lock:
+            return {
+                "wall_time": time.perf_counter() - self.started,
+                "spans": {
+                    name: {
+                        "count": len(durations),
+                        "total": sum(durations),
+                        "mean": sum(durations) / len(durations),
+                        "max": max(durations),
+                    }
+                    for name, durations in sorted(self.spans.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def writeReport(self, path: str):
+        """
+        Saves the report as a JSON file.
+
+        Arguments:
+        ----------
+            path (str): Path of the report file.
+        """
+        with open(path, "w", encoding = "utf-8") as f:
+            json.dump(self.report(), f, indent = 2)
+
+class ProgressLine:
+    """
+    Live progress line with ETA based on the observed throughput, rewritten in place.
+
+    Arguments:
+    ----------
+        total (int): Number of items to process.
+        label (str): Label of the line.
+        stream (TextIO): Stream to write to. Defaults to stderr.
+        interval (float): Minimal interval between redraws in seconds.
+    """
+    def __init__(self, total: int, label: str = "Progress", stream: TextIO = None, interval: float = 0.5):
+        self.total = total
+        self.label = label
+        self.stream = stream if stream is not None else sys.stderr
+        self.interval = interval
+        self.done = 0
+        self.started = time.perf_counter()
+        self._last_draw = 0.0
+        self._lock = threading.Lock()
+
+    def eta(self) -> timedelta | None:
+        """
+        Returns:
+        ----------
+            timedelta | None: Estimated remaining time, None before the first item is done.
+        """
+        if self.done == 0:
+            return None
+        rate = self.done / (time.perf_counter() - self.started)
+        return timedelta(seconds = round((self.total - self.done) / rate))
+
+    def update(self, n: int = 1):
+        with self._lock:
+            self.done += n
+            now = time.perf_counter()
+            if now - self._last_draw >= self.interval or self.done >= self.total:
+                self._last_draw = now
+                self.stream.write(f"\r{self.format()}")
+                self.stream.flush()
+
+    def close(self):
+        self.stream.write("\n")
+        self.stream.flush()
+
+    def format(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = self.eta()
+        finish = (datetime.now() + eta).strftime("%H:%M:%S") if eta is not None else "--:--:--"
+        percent = 100 * self.done / self.total if self.total else 100.0
+        return f"{self.label}: {self.done}/{self.total} ({percent:.1f}%), {rate:.2f}/s, ETA {eta or '?'}, finish at {finish}"
+
+metrics = Metrics()
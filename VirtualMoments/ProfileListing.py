@@ -0,0 +1,183 @@
+"""
+Engines listing screenshot page links of a Steam profile. The HTTP engine reads
+the paginated screenshot grid directly, the Selenium engine scrolls the profile
+in a headless browser borrowed from a DriverPool and is kept as a fallback.
+Selenium is imported only when a browser is started, as it is slow to import.
+"""
+from abc import ABC, abstractmethod
+from itertools import count
+from typing import TYPE_CHECKING
+import logging
+import time
+from .DriverPool import DriverPool
+from .HttpFetcher import HttpFetcher
+from .HtmlParsing import findScreenshotLinks
+from .Metrics import metrics
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+class ProfileLister(ABC):
+    """
+    Common interface of profile listing engines.
+
+    Methods:
+    ----------
+    listLinks(profile_url):
+        Returns links to all screenshot pages of the profile, newest first.
+    """
+    logger = logging.getLogger("ProfileLister")
+
+    @abstractmethod
+    def listLinks(self, profile_url: str) -> list[str]:
+        ...
+
+class HttpProfileLister(ProfileLister):
+    """
+    Lists screenshots by requesting the paginated grid view of the profile (`?p=N`) over HTTP,
+    until a page brings no new screenshot links. Does not need a browser.
+
+    Arguments:
+    ----------
+        fetcher (HttpFetcher): Fetcher used for the requests, sharing the scrapper's rate limit.
+        max_pages (int, optional): Upper limit of fetched pages. Defaults to no limit.
+    """
+    page_query = "?p={page}&view=grid&sort=newestfirst&browsefilter=myfiles"
+
+    def __init__(self, fetcher: HttpFetcher, max_pages: int = None):
+        self.fetcher = fetcher
+        self.max_pages = max_pages
+
+    def listLinks(self, profile_url: str) -> list[str]:
+        links: dict[str, None] = {}
+
+        for page in count(1):
+            if self.max_pages is not None and page > self.max_pages:
+                break
+
+            self.logger.debug(f"\tFetching profile page {page}")
+            with metrics.span("listing.page"):
+                html_text = self.fetcher.get(profile_url + self.page_query.format(page = page)).text
+            with metrics.span("listing.parse_links"):
+                page_links = findScreenshotLinks(html_text)
+
+            n_before = len(links)
+            links.update(dict.fromkeys(page_links))
+            if len(links) == n_before:
+                break
+
+        return list(links)
+
+class SeleniumProfileLister(ProfileLister):
+    """
+    Lists screenshots by opening the profile in headless Chrome and scrolling
+    to the bottom until all dynamically loaded content is present.
+    After every scroll the page is polled every `poll_interval` seconds for new screenshot
+    anchors. Scrolling ends when no new anchors appear and the network has been idle
+    (no new resource requests) for `idle_time` seconds, or after `max_wait` seconds.
+
+    Arguments:
+    ----------
+        poll_interval (float): Interval of polling the page in seconds.
+        idle_time (float): Time without new anchors and requests after which the page is considered complete.
+        max_wait (float): Ceiling of waiting for new content after a single scroll.
+        pool (DriverPool, optional): Pool to borrow the browser from, e.g. one shared by the listings
+                                     of several profiles. Defaults to a browser started and quit for every listing.
+    """
+    # returns screenshot anchors and the number of resources loaded by the page since the last poll;
+    # the resource timing buffer is cleared after every read, as it stops recording once full (250 entries)
+    poll_script = """
+        const anchors = document.querySelectorAll('a[href*="sharedfiles/filedetails"]');
+        const hrefs = Array.from(anchors).slice(arguments[0]).map(a => a.href);
+        const n_resources = performance.getEntriesByType('resource').length;
+        performance.clearResourceTimings();
+        return [hrefs, n_resources];
+    """
+
+    def __init__(self, poll_interval: float = 0.2, idle_time: float = 1.5, max_wait: float = 10, pool: DriverPool = None):
+        self.poll_interval = poll_interval
+        self.idle_time = idle_time
+        self.max_wait = max_wait
+        self.pool = pool if pool is not None else DriverPool(size = 1, max_uses = 1)
+
+    def listLinks(self, profile_url: str) -> list[str]:
+        with self.pool.driver() as driver:
+            driver.get(profile_url)
+            return self._scrollToEnd(driver)
+
+    def fetchPage(self, profile_url: str) -> str:
+        """
+        Fetches the full HTML content of a webpage by scrolling to the bottom.
+        This function uses Selenium to open a webpage in headless mode, scrolls to the bottom
+        to ensure all dynamic content is loaded, and then returns the full HTML source of the page.
+
+        Arguments:
+        ----------
+            profile_url (str): URL of the screenshot profile.
+
+        Returns:
+        ----------
+            str: The full HTML content of the webpage.
+        """
+        with self.pool.driver() as driver:
+            driver.get(profile_url)
+            self._scrollToEnd(driver)
+
+            self.logger.debug("\tFetching source")
+            return driver.page_source
+
+    def _scrollToEnd(self, driver: "webdriver.Chrome") -> list[str]:
+        """
+        Scrolls the page until no more screenshots load, collecting anchor hrefs as they appear.
+
+        Returns:
+        ----------
+            list[str]: Screenshot page links, in the order they appeared on the page.
+        """
+        links: dict[str, None] = {}
+        n_anchors = 0
+
+        self.logger.debug("\tScrolling")
+        while True:
+            with metrics.span("listing.scroll_round"):
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                n_new = self._waitForContent(driver, n_anchors, links)
+            if n_new == 0:
+                break
+            n_anchors += n_new
+            self.logger.debug(f"\t{n_anchors} screenshots loaded")
+
+        return list(links)
+
+    def _waitForContent(self, driver: "webdriver.Chrome", n_anchors: int, links: dict[str, None]) -> int:
+        """
+        Polls the page until new screenshot anchors appear, the network is idle or `max_wait` passes.
+
+        Arguments:
+        ----------
+            driver (webdriver.Chrome): Driver with the profile page open.
+            n_anchors (int): Number of anchors already collected.
+            links (dict[str, None]): Collected links, updated in place with the new ones.
+
+        Returns:
+        ----------
+            int: Number of new anchors, 0 if the page did not load any more content.
+        """
+        start = time.monotonic()
+        last_activity = start
+
+        while time.monotonic() - start < self.max_wait:
+            hrefs, n_resources = driver.execute_script(self.poll_script, n_anchors)
+            if hrefs:
+                links.update(dict.fromkeys(hrefs))
+                return len(hrefs)
+
+            now = time.monotonic()
+            if n_resources > 0:
+                last_activity = now
+            elif now - last_activity >= self.idle_time:
+                return 0
+
+            time.sleep(self.poll_interval)
+
+        return 0
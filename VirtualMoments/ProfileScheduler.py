@@ -0,0 +1,147 @@
+"""
+Scraping of several Steam profiles in one run. Metadata requests of all profiles are
+interleaved round-robin and sent through one fetcher, so the run is bound by a single
+global rate limit instead of the sum of per-profile runs, and no profile waits for
+another one to finish.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain, zip_longest
+from .HttpFetcher import HttpFetcher
+from .Metrics import ProgressLine
+from .RateLimiter import TokenBucket
+from .ScreenshotScrapper import ScreenshotScrapper, Screenshot
+
+@dataclass
+class Profile:
+    """
+    Steam profile listed in the manifest.
+
+    Attributes:
+    ----------
+        name (str): Steam user name, also used to name the content store.
+        url (str): URL of the screenshots of the profile.
+        store (str): Path to the content store of the profile.
+    """
+    name: str
+    url: str
+    store: str
+
+def profilesFromManifest(manifest: dict, content_dir: str = "content") -> list[Profile]:
+    """
+    Reads profiles from the `content` section of the manifest, either a list of profiles:
+
+        content:
+          profiles:
+            - name: "radvvan"
+              steam_profile_url: "https://steamcommunity.com/id/radvvan/screenshots/"  # optional
+              store: "content/radvvan.jsonl"                                         # optional
+
+    or a single `steam_profile_url`.
+
+    Arguments:
+    ----------
+        manifest (dict): Loaded manifest.
+        content_dir (str): Directory of content stores of profiles without an explicit `store`.
+
+    Returns:
+    ----------
+        list[Profile]: Profiles in manifest order, empty if the manifest lists none.
+    """
+    content = manifest.get("content") or {}
+    entries = content.get("profiles")
+    if entries is None:
+        url = content.get("steam_profile_url")
+        if url is None:
+            return []
+        entries = [{"name": url.rstrip("/").split("/")[-2], "steam_profile_url": url}]
+
+    profiles = []
+    for entry in entries:
+        name = entry["name"]
+        profiles.append(Profile(
+            name = name,
+            url = entry.get("steam_profile_url", f"https://steamcommunity.com/id/{name}/screenshots/"),
+            store = entry.get("store", os.path.join(content_dir, f"{name}.jsonl")),
+        ))
+
+    names = [p.name for p in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Profile names in the manifest should be unique: {names}")
+    return profiles
+
+class ProfileScheduler:
+    """
+    Scrapes several profiles with a shared fetcher and worker pool.
+    Every profile is listed first, then the planned metadata requests of all profiles
+    are interleaved, so each profile with pending work gets an equal share of the rate limit.
+
+    Arguments:
+    ----------
+        delay (float): Average delay between requests of all profiles together, in seconds.
+        workers (int): Number of concurrent workers.
+        burst (int): Number of requests allowed back to back by the rate limiter.
+    """
+    logger = logging.getLogger("ProfileScheduler")
+
+    def __init__(self, delay: float = 5, workers: int = 1, burst: int = 1):
+        if workers < 1:
+            raise ValueError("Number of workers should be at least 1.")
+
+        self.workers = workers
+        self.fetcher = HttpFetcher(pool_size = workers, rate_limiter = TokenBucket.fromDelay(delay, burst))
+        self.profiles: list[tuple[ScreenshotScrapper, str]] = []
+        self.show_progress = False
+
+    def addProfile(self, scrapper: ScreenshotScrapper, output: str):
+        """
+        Adds a profile to the run. The scrapper is switched to the shared fetcher.
+
+        Arguments:
+        ----------
+            scrapper (ScreenshotScrapper): Configured scrapper of the profile.
+            output (str): Path to the content store of the profile.
+        """
+        scrapper.shareFetcher(self.fetcher)
+        self.profiles.append((scrapper, output))
+
+    def run(self, resume: bool = False) -> dict[str, list[Screenshot]]:
+        """
+        Scrapes all added profiles.
+
+        Arguments:
+        ----------
+            resume (bool): Resume the previous run of every profile from its checkpoint.
+
+        Returns:
+        ----------
+            dict[str, list[Screenshot]]: Content of every profile, keyed by the user name.
+        """
+        runs = []
+        for scrapper, output in self.profiles:
+            os.makedirs(os.path.dirname(output) or ".", exist_ok = True)
+            runs.append((scrapper, scrapper.prepareRun(output = output, resume = resume)))
+
+        # round-robin over profiles, a profile that runs out of jobs leaves its turn to the others
+        jobs = [
+            job for job in chain.from_iterable(zip_longest(*(
+                [(scrapper, run, job) for job in run.jobs] for scrapper, run in runs
+            )))
+            if job is not None
+        ]
+        self.logger.info(f"Scheduled {len(jobs)} requests of {len(runs)} profiles")
+
+        progress = ProgressLine(len(jobs), "Fetching metadata") if self.show_progress and jobs else None
+        with ThreadPoolExecutor(max_workers = self.workers) as executor:
+            results = executor.map(lambda job: job[0].runJob(job[1], job[2]), jobs)
+            for (scrapper, run, job), screenshot in zip(jobs, results):
+                if progress is not None:
+                    progress.update()
+                scrapper.recordResult(run, job, screenshot)
+
+        if progress is not None:
+            progress.close()
+
+        return {scrapper.steam_user_name: scrapper.finishRun(run) for scrapper, run in runs}
@@ -0,0 +1,71 @@
+"""
+Token bucket rate limiter shared by the workers fetching screenshot pages,
+so that concurrent scraping stays under Steam's request throttling.
+"""
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens are refilled continuously at `rate` per second,
+    up to `burst` tokens. Every request consumes one token and blocks until it is available.
+
+    Arguments:
+    ----------
+        rate (float): Number of requests allowed per second. None disables limiting.
+        burst (int): Maximum number of requests that can be made back to back. Defaults to 1.
+    """
+    def __init__(self, rate: float | None, burst: int = 1):
+        if rate is not None and rate <= 0:
+            raise ValueError("Rate should be a positive number of requests per second.")
+        if burst < 1:
+            raise ValueError("Burst size should be at least 1.")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def fromDelay(cls, delay: float, burst: int = 1) -> "TokenBucket":
+        """
+        Creates a limiter from a delay between requests, as used by the `-d/--delay` CLI option.
+
+        Arguments:
+        ----------
+            delay (float): Delay between requests in seconds. 0 disables limiting.
+            burst (int): Maximum number of requests that can be made back to back.
+
+        Returns:
+        ----------
+            TokenBucket: Limiter allowing one request per `delay` seconds.
+        """
+        return cls(1 / delay if delay > 0 else None, burst)
+
+    def acquire(self) -> float:
+        """
+        Takes a single token from the bucket, blocking until one is available.
+
+        Returns:
+        ----------
+            float: Time in seconds spent waiting for the token.
+        """
+        if self.rate is None:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
@@ -1,21 +1,55 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-import time
-import requests as rq
-import yaml
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 import logging
-import os
-from dataclasses import dataclass
-
-@dataclass
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields, replace
+from itertools import repeat
+from .RateLimiter import TokenBucket
+from .HttpFetcher import HttpFetcher
+from .ContentStore import ContentStore, ScrapeState
+from .DriverPool import DriverPool
+from .ProfileListing import ProfileLister, HttpProfileLister, SeleniumProfileLister
+from .HtmlParsing import findScreenshotLinks, parseScreenshotPage
+from .Metrics import metrics, ProgressLine
+from .SteamDates import normalizeSteamDate
+
+@dataclass(slots = True)
 class Screenshot:
     page_link: str
     game: str
     title: str
     link: str
     date: str
+    # ISO date and time the screenshot was taken, see SteamDates.normalizeSteamDate
+    timestamp: str | None = None
+    # validators of the screenshot page and the time it was last fetched or revalidated
+    etag: str | None = None
+    last_modified: str | None = None
+    checked: str | None = None
+
+    def toDict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def fromDict(cls, record: dict) -> "Screenshot":
+        """
+        Creates a Screenshot from a content store record, ignoring unknown keys.
+        """
+        return cls(**{f.name: record[f.name] for f in fields(cls) if f.name in record})
+
+@dataclass
+class ScrapeRun:
+    """
+    Plan and progress of a single scrape of a profile, see ScreenshotScrapper.prepareRun.
+    Jobs are ("fetch", link) for new screenshots and ("refresh", link) for revalidated ones.
+    """
+    store: ContentStore | None
+    state: ScrapeState | None
+    records: dict[str, dict]
+    cached: dict[str, Screenshot]
+    walked_links: list[str]
+    jobs: list[tuple[str, str]]
+    fetched: dict[str, Screenshot] = field(default_factory = dict)
 
 class ScreenshotScrapper:
     """
@@ -24,108 +58,276 @@ class ScreenshotScrapper:
     Arguments:
     ----------
         steam_user_name (str): Steam user name.
+        profile_url (str, optional): URL of the screenshots of the profile, for profiles
+                                     without a custom URL. Defaults to the URL of `steam_user_name`.
     """
     logger = logging.getLogger("ScreenshotScrapper")
-    _request_delay: int = 5
-
-    def __init__(self, steam_user_name: str):
+    _request_delay: float = 5
+    _workers: int = 1
+    _burst: int = 1
+    _stop_after_known: int | None = None
+    _show_progress: bool = False
+    _refresh_fraction: float = 0
+
+    def __init__(self, steam_user_name: str, profile_url: str = None):
         self.logger.info(f"Initializing ScreenshotScrapper for {steam_user_name}")
-        self.profile_url = f"https://steamcommunity.com/id/{steam_user_name}/screenshots/"
+        self.steam_user_name = steam_user_name
+        self.profile_url = profile_url or f"https://steamcommunity.com/id/{steam_user_name}/screenshots/"
 
         self.profile_page: str = None
         self.profile_links: list[str] = None
-        self.content_structure: list[dict[str, str, str, str]] = []
-
-    def generateContentStructure(self, output: str = None):
+        self.content_structure: list[Screenshot] = []
+        self.failed_links: list[str] = []
+        self.rate_limiter: TokenBucket = TokenBucket.fromDelay(self._request_delay, self._burst)
+        self.fetcher = HttpFetcher(pool_size = self._workers, rate_limiter = self.rate_limiter)
+        self.profile_lister: ProfileLister = HttpProfileLister(self.fetcher)
+        # browsers of Selenium listings, a browser is started and quit for every listing by default
+        self.driver_pool: DriverPool = None
+
+    def generateContentStructure(self, output: str = None, resume: bool = False):
         """
         Fetches screenshot links from profile page and
         constructs the structure of the content with metadata.
+        Screenshots already present in the output content store are not fetched again,
+        newly fetched ones are synced to the store as they arrive. The listed profile links
+        and failed links are checkpointed in a state file next to the store (see ScrapeState).
         Parameters:
-            output (str, optional): Output file to save the structure to in a YAML file.
+            output (str, optional): Path to the JSON Lines content store (see ContentStore).
+            resume (bool, optional): If True, the profile links are taken from the checkpoint
+                                     of the previous run instead of listing the profile again,
+                                     and only failed and missing screenshots are fetched.
         Returns:
-            list[dict] A list of dictionaries with the extracted metadata:
+            list[Screenshot] A list of screenshots with the extracted metadata, in profile order:
+            - page_link (str): The URL of the screenshot page.
             - game (str): The name of the game.
             - title (str): The title of the screenshot.
             - link (str): The URL of the screenshot image.
             - date (str): The date the screenshot was taken.
         """
+        run = self.prepareRun(output = output, resume = resume)
+        progress = ProgressLine(len(run.jobs), "Fetching metadata") if self._show_progress and run.jobs else None
 
-        self.logger.info("Fetching full steam screenshot profile")
-        self.fetchFullProfile()
+        with ThreadPoolExecutor(max_workers = self._workers) as executor:
+            # map yields results in submission order, so the content keeps profile order
+            for job, screenshot in zip(run.jobs, executor.map(self.runJob, repeat(run), run.jobs)):
+                if progress is not None:
+                    progress.update()
+                self.recordResult(run, job, screenshot)
 
-        self.logger.info("Extracting screenshot links from the page")
-        self.extractScreenshotLinks()
+        if progress is not None:
+            progress.close()
 
-        n_links = len(self.profile_links)
-        self.logger.info(f"Extracting metadata for {n_links} links")
+        return self.finishRun(run)
 
-        content_structure = []
-        cached_links = []
-        if os.path.exists(output):
-            with open(output, "r") as f:
-                content_structure = yaml.safe_load(f)
-                cached_links = (l["page_link"] for l in content_structure)
-
-        estimated_time = self._request_delay * n_links
+    def prepareRun(self, output: str = None, resume: bool = False) -> "ScrapeRun":
+        """
+        Lists the profile (or loads the checkpoint when resuming) and plans the metadata
+        requests of a run, see generateContentStructure. Together with runJob, recordResult
+        and finishRun, lets a scheduler interleave the requests of several profiles.
+        Parameters:
+            output (str, optional): Path to the JSON Lines content store.
+            resume (bool, optional): Resume the previous run from its checkpoint.
+        Returns:
+            ScrapeRun: The planned run.
+        """
+        store = ContentStore(output) if output is not None else None
+        state = ScrapeState.forStore(store) if store is not None else None
+
+        if resume and (state is None or not state.exists()):
+            raise ValueError("Nothing to resume - no checkpoint of a previous run found.")
+
+        if resume:
+            state.load()
+            self.profile_links = state.profile_links
+            self.logger.info(
+                f"Resuming previous run: {len(state.profile_links)} profile links, {len(state.failed_links)} failed"
+            )
+        else:
+            self.logger.info("Listing screenshots of the steam profile")
+            self.listProfileLinks()
+
+        # cache index keyed by page link, duplicates from older runs are dropped on load
+        records: dict[str, dict] = store.index() if store is not None else {}
+        cached = {link: Screenshot.fromDict(record) for link, record in records.items()}
+
+        # a resumed run fetches everything missing, including links past the incremental stop
+        walked_links = self.profile_links if resume else self.planIncrementalWalk(cached.keys())
+        pending_links = [link for link in walked_links if link not in cached]
+        refresh_links = [] if resume else self.planRefresh(cached.values())
+
+        n_links = len(pending_links)
+        metrics.count("scrape.cache_hits", len(walked_links) - n_links)
+        self.logger.info(f"Extracting metadata for {n_links} links, {len(cached)} already cached")
+        if refresh_links:
+            self.logger.info(f"Revalidating {len(refresh_links)} cached screenshots")
+
+        # the limiter allows `burst` requests right away, the rest at the configured rate
+        estimated_time = self._request_delay * max(0, n_links + len(refresh_links) - self._burst)
         finish_time = datetime.now() + timedelta(seconds = estimated_time)
-        self.logger.info(f"Estimated time: {estimated_time} seconds, finish at {finish_time.strftime('%H:%M:%S')}")
-
-        for link in self.profile_links:
-            if link in cached_links:
-                self.logger.info(f"\tSkipping {link}, already cached")
-                continue
-            time.sleep(self._request_delay)
-            try:
-                content_structure.append(self.extractScreenshotMetadata(url = link))
-            except Exception:
-                self.logger.error(f"Failed fetching metadata for {link}")
-                self.logger.error("Partial content is returned")
-                break
+        self.logger.info(f"Estimated time: {estimated_time:.0f} seconds, finish at {finish_time.strftime('%H:%M:%S')}")
+
+        self.failed_links = []
+        if state is not None:
+            state.profile_links = self.profile_links
+            state.failed_links = []
+            state.complete = False
+            state.save()
+
+        return ScrapeRun(
+            store = store,
+            state = state,
+            records = records,
+            cached = cached,
+            walked_links = walked_links,
+            jobs = [("fetch", link) for link in pending_links] + [("refresh", link) for link in refresh_links],
+        )
 
-        self.content_structure = content_structure
+    def runJob(self, run: "ScrapeRun", job: tuple[str, str]) -> Screenshot | None:
+        """
+        Runs a single planned request: fetches a new screenshot, or revalidates a cached one.
+        Worker function of the fetching pool.
+        Parameters:
+            run (ScrapeRun): Run the job belongs to.
+            job (tuple[str, str]): Kind of the request ("fetch" or "refresh") and the page link.
+        Returns:
+            Screenshot | None: Extracted metadata, or None if the request failed.
+        """
+        kind, link = job
+        if kind == "fetch":
+            return self._fetchMetadata(link)
+        return self._refreshMetadata(run.cached[link])
+
+    def recordResult(self, run: "ScrapeRun", job: tuple[str, str], screenshot: Screenshot | None):
+        """
+        Records the result of a job in the run and syncs it to the content store and checkpoint.
+        """
+        kind, link = job
+        if kind == "refresh":
+            if screenshot is None:
+                # the cached metadata is still valid, the page is retried in a later run
+                metrics.count("refresh.failed")
+                self.logger.warning(f"Failed revalidating {link}, keeping cached metadata")
+                return
+            run.cached[link] = screenshot
+            if run.store is not None:
+                run.store.append([self._mergeRecord(run.records[link], screenshot)], sync = True)
+            return
+
+        if screenshot is None:
+            metrics.count("scrape.failed")
+            self.logger.error(f"Failed fetching metadata for {link}, skipping")
+            self.failed_links.append(link)
+            if run.state is not None:
+                run.state.failed_links = self.failed_links
+                run.state.save()
+            return
+
+        metrics.count("scrape.fetched")
+        run.fetched[link] = screenshot
+        if run.store is not None:
+            run.store.append([screenshot], sync = True)
+
+    def finishRun(self, run: "ScrapeRun") -> list[Screenshot]:
+        """
+        Completes the checkpoint and merges fetched and cached screenshots into the content structure.
+        Returns:
+            list[Screenshot]: Screenshots in profile order, see generateContentStructure.
+        """
+        if run.state is not None:
+            run.state.complete = not self.failed_links
+            run.state.save()
+        if run.store is not None:
+            run.store.compactIfNeeded()
+
+        # merge in profile order, cached entries not reached by the walk keep their stored order
+        cached = dict(run.cached)
+        content_structure = []
+        for link in dict.fromkeys(run.walked_links):
+            if link in run.fetched:
+                content_structure.append(run.fetched[link])
+            elif link in cached:
+                content_structure.append(cached.pop(link))
+        content_structure.extend(cached.values())
 
-        if output is not None:
-            with open(output, "w") as f:
-                # TODO: this saves object names as names of entries in yaml, crashing the load
-                yaml.dump(self.content_structure, f, default_flow_style = False)
+        self.content_structure = content_structure
+        self.logger.info(f"Request statistics: {self.fetcher.stats.summary()}")
+        if self.failed_links:
+            self.logger.error(f"Failed fetching {len(self.failed_links)} screenshots, partial content is returned")
+            if run.state is not None:
+                self.logger.error("Run again with --resume to retry failed screenshots")
 
         return self.content_structure
     
-    def fetchFullProfile(self) -> str:
+    def planIncrementalWalk(self, known_links) -> list[str]:
         """
-        Fetches the full HTML content of a webpage by scrolling to the bottom.
-        This function uses Selenium to open a webpage in headless mode, scrolls to the bottom
-        to ensure all dynamic content is loaded, and then returns the full HTML source of the page.
+        Selects profile links that need to be walked. Steam lists screenshots newest first,
+        so in incremental mode the walk stops once a run of already known links is hit,
+        as everything older is already cached.
+        Parameters:
+            known_links (Container[str]): Page links already present in the content.
+                                          Should support constant time membership checks.
         Returns:
-            str: The full HTML content of the webpage.
+            list[str]: Profile links up to the end of the first run of known links.
         """
-        self.logger.debug("\tSetting up selenium")
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run in headless mode
-        chrome_options.add_argument("--disable-gpu")  # Disable GPU (recommended for headless)
-        chrome_options.add_argument("--no-sandbox")  # Required for some Linux environments
-        chrome_options.add_argument("--disable-dev-shm-usage") 
+        if self._stop_after_known is None:
+            return self.profile_links
+
+        known_run = 0
+        for i, link in enumerate(self.profile_links):
+            known_run = known_run + 1 if link in known_links else 0
+            if known_run >= self._stop_after_known:
+                self.logger.info(f"Found {known_run} already cached links in a row, stopping the walk")
+                return self.profile_links[:i + 1]
 
-        driver = webdriver.Chrome(options=chrome_options)
+        return self.profile_links
 
-        driver.get(self.profile_url)
+    def planRefresh(self, cached) -> list[str]:
+        """
+        Selects cached screenshots to revalidate in this run, see setRefresh.
+        Screenshots that were never revalidated come first, then the ones checked longest ago,
+        so running daily with a fraction of 0.05 revalidates every screenshot every 20 days.
+        Parameters:
+            cached (Iterable[Screenshot]): Screenshots in the content store.
+        Returns:
+            list[str]: Page links of the screenshots to revalidate.
+        """
+        if self._refresh_fraction <= 0:
+            return []
 
-        scroll_pause = 2
-        last_height = driver.execute_script("return document.body.scrollHeight")
+        cached = list(cached)
+        n_refresh = math.ceil(len(cached) * self._refresh_fraction)
+        # ISO timestamps sort chronologically, never checked screenshots sort first
+        oldest = sorted(cached, key = lambda s: s.checked or "")
+        return [s.page_link for s in oldest[:n_refresh]]
+
+    def listProfileLinks(self) -> list[str]:
+        """
+        Lists links to all screenshot pages of the profile with the selected listing engine
+        (see setListingEngine). If the HTTP engine finds no screenshots, e.g. because Steam
+        changed the grid markup, listing falls back to Selenium.
+        Returns:
+            list[str]: Screenshot page links, newest first.
+        """
+        with metrics.span("listing"):
+            links = self.profile_lister.listLinks(self.profile_url)
 
-        self.logger.debug("\tScrolling")
-        while True:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(scroll_pause)
+            if not links and isinstance(self.profile_lister, HttpProfileLister):
+                self.logger.warning("No screenshots found over HTTP, falling back to selenium")
+                links = SeleniumProfileLister(pool = self.driver_pool).listLinks(self.profile_url)
 
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
+        self.profile_links = links
+        self.logger.info(f"Found {len(links)} screenshots")
+        return links
 
-        self.logger.debug("\tFetching source")
-        page = driver.page_source
-        driver.quit()
+    def fetchFullProfile(self) -> str:
+        """
+        Fetches the full HTML content of the profile page by scrolling to the bottom in Selenium.
+        See SeleniumProfileLister.fetchPage.
+        Returns:
+            str: The full HTML content of the webpage.
+        """
+        with metrics.span("listing"):
+            page = SeleniumProfileLister(pool = self.driver_pool).fetchPage(self.profile_url)
 
         self.profile_page = page
         return page
@@ -143,15 +345,13 @@ class ScreenshotScrapper:
         if self.profile_page is None:
             raise ValueError("Page should not be empty - fetch profile page first.")
 
-        soup = BeautifulSoup(self.profile_page, "html.parser")
-        a_tags = soup.find_all("a")
-        hrefs = [a.get("href") for a in a_tags]
-        ss_links = [h for h in hrefs if "sharedfiles/filedetails" in h]
+        with metrics.span("listing.parse_links"):
+            ss_links = findScreenshotLinks(self.profile_page)
 
         self.profile_links = ss_links
         return ss_links
     
-    def extractScreenshotMetadata(self, url: str = None) -> dict[str, str, str, str]:
+    def extractScreenshotMetadata(self, url: str = None) -> Screenshot:
         """
         Extracts metadata from a screenshot page.
         This function retrieves and parses the HTML content of a screenshot page to extract
@@ -160,11 +360,14 @@ class ScreenshotScrapper:
         Parameters:
             url (str, optional): The URL of the screenshot page. Defaults to None.
         Returns:
-            dict: A dictionary with the extracted metadata:
+            Screenshot: A record with the extracted metadata:
+                - page_link (str): The URL of the screenshot page.
                 - game (str): The name of the game.
                 - title (str): The title of the screenshot.
                 - link (str): The URL of the screenshot image.
                 - date (str): The date the screenshot was taken.
+                - etag, last_modified (str | None): Validators of the page, used for refreshing.
+                - checked (str): ISO time the page was fetched.
         Raises:
             ValueError: If both `url` and `html_text` are None.
         """
@@ -173,27 +376,112 @@ class ScreenshotScrapper:
         
         self.logger.debug(f"\tFetching metadata for {url}")
 
-        html_text = rq.get(url).text
-        soup = BeautifulSoup(html_text, "html.parser")
-        img_link = soup.find("img", id="ActualMedia").get("src").split("?")[0]
-        game = soup.select_one("div.screenshotAppName a").text
-        title = soup.select_one("div.screenshotDescription")
-        date = soup.select("div.detailsStatRight")[1].text
+        with metrics.span("metadata.network"):
+            response = self.fetcher.get(url)
+        return self._parseMetadata(url, response)
+
+    def refreshScreenshotMetadata(self, cached: Screenshot) -> Screenshot:
+        """
+        Revalidates metadata of a cached screenshot with a conditional request.
+        The stored ETag and Last-Modified validators are sent as If-None-Match and
+        If-Modified-Since, and the page is only downloaded and parsed again if it changed.
+        Parameters:
+            cached (Screenshot): Cached screenshot to revalidate.
+        Returns:
+            Screenshot: The cached screenshot with an updated check time if the page
+                        is unchanged, otherwise newly extracted metadata.
+        """
+        headers = {}
+        if cached.etag is not None:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified is not None:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        self.logger.debug(f"\tRevalidating metadata for {cached.page_link}")
+
+        with metrics.span("metadata.network"):
+            response = self.fetcher.get(cached.page_link, headers = headers or None)
+
+        # servers ignoring the conditional headers still send the same ETag for an unchanged page
+        etag = response.headers.get("ETag")
+        if response.status_code == 304 or (etag is not None and etag == cached.etag):
+            metrics.count("refresh.not_modified")
+            return replace(cached, checked = self._now())
+
+        metrics.count("refresh.modified")
+        return self._parseMetadata(cached.page_link, response)
+
+    def _parseMetadata(self, url: str, response) -> Screenshot:
+        """
+        Parses a fetched screenshot page into a Screenshot, keeping the validators of the response.
+        """
+        with metrics.span("metadata.parse"):
+            metadata = parseScreenshotPage(response.text)
+        title = metadata["title"]
 
         if not title:
             title = ""
         else:
-            title = title.text.replace('"', '')
+            title = title.replace('"', '')
+
+        display_date, timestamp = normalizeSteamDate(metadata["date"])
 
         return Screenshot(
             page_link = url,
-            game = game,
+            game = metadata["game"],
             title = title,
-            link = img_link,
-            date = self.parseSteamDate(date)
+            link = metadata["link"],
+            date = display_date,
+            timestamp = timestamp,
+            etag = response.headers.get("ETag"),
+            last_modified = response.headers.get("Last-Modified"),
+            checked = self._now()
         )
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat(timespec = "seconds")
+
+    @staticmethod
+    def _mergeRecord(record: dict, screenshot: Screenshot) -> dict:
+        """
+        Updates a stored record with refreshed metadata. Image data added by the builder
+        (dimensions, thumbnails) is kept, unless the image itself changed.
+        """
+        if record.get("link") != screenshot.link:
+            return screenshot.toDict()
+        return {**record, **screenshot.toDict()}
     
-    def parseSteamDate(self, date_string):
+    def _fetchMetadata(self, url: str) -> Screenshot | None:
+        """
+        Fetches metadata of a single screenshot page. Rate limiting and retries
+        are handled by the shared fetcher. Used as the worker function of the fetching pool.
+        Parameters:
+            url (str): The URL of the screenshot page.
+        Returns:
+            Screenshot | None: Extracted metadata, or None if fetching failed.
+        """
+        try:
+            return self.extractScreenshotMetadata(url = url)
+        except Exception:
+            self.logger.debug(f"\tException while fetching {url}", exc_info = True)
+            return None
+
+    def _refreshMetadata(self, cached: Screenshot) -> Screenshot | None:
+        """
+        Revalidates a cached screenshot, the worker function of refreshing.
+        Parameters:
+            cached (Screenshot): Cached screenshot.
+        Returns:
+            Screenshot | None: Revalidated or refetched metadata, or None if the request failed.
+        """
+        try:
+            return self.refreshScreenshotMetadata(cached)
+        except Exception:
+            self.logger.debug(f"\tException while revalidating {cached.page_link}", exc_info = True)
+            return None
+
+    def parseSteamDate(self, date_string: str, reference: date | None = None) -> str:
         """
         Formats weird Steam date strings into a nicer format.
         
@@ -202,32 +490,117 @@ class ScreenshotScrapper:
         Parameters:
             date_string (str): The input date string, as fetched from steamcommunity
                             screenshot page.
+            reference (date, optional): Day the page was fetched, year-less dates are resolved
+                            against it (see SteamDates.parseSteamDate). Defaults to today.
         
         Returns:
             str: The formatted date string in the format "DD Month YYYY".
         """
-        if "@" in date_string:
-            date_string = date_string.split("@")[0]
-
-        date_string = date_string.strip()
-
-        input_date_format = "%b %d, %Y" if date_string[0].isalpha() else "%d %b, %Y"
-
-        # if the year is missing, assume current year
-        if "," not in date_string:
-            current_year = datetime.now().year
-            date_string = f"{date_string}, {current_year}"
-
-        parsed_date = datetime.strptime(date_string, input_date_format)
-        formatted_date = parsed_date.strftime("%d %B %Y")
-
-        return formatted_date
+        return normalizeSteamDate(date_string, reference)[0]
     
-    def setRequestDelay(self, delay: int):
+    def setRequestDelay(self, delay: float):
         """
         Sets request delay in seconds.
         Steam can block your IP of there are too many requests in short time.
         Having a delay between requests remedies that situation.
         Default delay is 5 seconds, but you can change it with this function.
+        The delay is translated into the rate of the shared token bucket limiter,
+        so with several workers the average delay between requests is still kept.
         """
         self._request_delay = delay
+        self.rate_limiter = TokenBucket.fromDelay(delay, self._burst)
+        self.fetcher.rate_limiter = self.rate_limiter
+
+    def setConcurrency(self, workers: int, burst: int = 1):
+        """
+        Sets the number of workers fetching screenshot metadata concurrently.
+        The connection pool of the fetcher is resized to the number of workers.
+        All workers share a single rate limiter, so concurrency only pipelines network
+        latency and does not increase the request rate above the configured delay.
+        Parameters:
+            workers (int): Number of concurrent workers. Default is 1 (sequential fetching).
+            burst (int): Number of requests that can be sent back to back before
+                         the limiter starts spacing them. Default is 1.
+        """
+        if workers < 1:
+            raise ValueError("Number of workers should be at least 1.")
+
+        self._workers = workers
+        self._burst = burst
+        self.rate_limiter = TokenBucket.fromDelay(self._request_delay, burst)
+        self.fetcher.rate_limiter = self.rate_limiter
+        self.fetcher.resizePool(workers)
+
+    def shareFetcher(self, fetcher: HttpFetcher):
+        """
+        Makes the scrapper send its requests through the given fetcher, e.g. one shared by
+        the scrappers of several profiles, so they stay under one rate limit and connection pool.
+        Parameters:
+            fetcher (HttpFetcher): Fetcher with the shared rate limiter.
+        """
+        self.fetcher = fetcher
+        self.rate_limiter = fetcher.rate_limiter
+        if isinstance(self.profile_lister, HttpProfileLister):
+            self.profile_lister = HttpProfileLister(fetcher)
+
+    def setIncremental(self, stop_after_known: int | None):
+        """
+        Enables incremental scraping. Walking the profile links stops after
+        `stop_after_known` consecutive links that are already cached.
+        Parameters:
+            stop_after_known (int | None): Length of the run of known links ending the walk.
+                                           None walks all links (default).
+        """
+        if stop_after_known is not None and stop_after_known < 1:
+            raise ValueError("Number of known links should be at least 1.")
+
+        self._stop_after_known = stop_after_known
+
+    def setListingEngine(self, engine: str):
+        """
+        Selects the engine listing screenshots of the profile.
+        Parameters:
+            engine (str): "http" (default) requests the paginated screenshot grid directly,
+                          "selenium" scrolls the profile in a headless Chrome.
+        """
+        if engine == "http":
+            self.profile_lister = HttpProfileLister(self.fetcher)
+        elif engine == "selenium":
+            self.profile_lister = SeleniumProfileLister(pool = self.driver_pool)
+        else:
+            raise ValueError(f"Unknown listing engine: {engine}")
+
+    def setDriverPool(self, pool: DriverPool):
+        """
+        Makes Selenium listings borrow browsers from the given pool, e.g. one shared by
+        the scrappers of several profiles, instead of starting a new browser every time.
+        The pool is not closed by the scrapper.
+        Parameters:
+            pool (DriverPool): Pool of headless Chrome drivers.
+        """
+        self.driver_pool = pool
+        if isinstance(self.profile_lister, SeleniumProfileLister):
+            self.profile_lister.pool = pool
+
+    def setProgress(self, enabled: bool):
+        """
+        Enables a live progress line with the ETA based on the observed throughput
+        while fetching screenshot metadata.
+        Parameters:
+            enabled (bool): Whether to show the progress line. Default is False.
+        """
+        self._show_progress = enabled
+
+    def setRefresh(self, fraction: float):
+        """
+        Enables rolling refresh of cached metadata. In every run the given fraction of cached
+        screenshots, those checked longest ago, is revalidated with conditional requests
+        (see refreshScreenshotMetadata), so changed titles are picked up over time.
+        Parameters:
+            fraction (float): Fraction of cached screenshots revalidated per run, between 0 and 1.
+                              Default is 0 (cached screenshots are never refetched).
+        """
+        if not 0 <= fraction <= 1:
+            raise ValueError("Refresh fraction should be between 0 and 1.")
+
+        self._refresh_fraction = fraction
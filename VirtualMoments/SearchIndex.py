@@ -0,0 +1,159 @@
+"""
+Static search index of the screenshots, written as small JSON shards to web/public/search,
+so the site can filter by game and month and search titles by fetching only the shards
+it needs instead of every album page.
+
+Layout:
+    index.json             - shard list: albums, games and months with counts, token prefixes
+    records/<k>.json       - screenshot records, newest first, RECORDS_PER_SHARD per file
+    games/<slug>.json      - ids of screenshots of a game
+    months/<yyyy-mm>.json  - ids of screenshots taken in a month
+    tokens/<prefix>.json   - title and game word -> ids, for words starting with the prefix
+
+Ids are positions in the newest-first order, so every list of ids is sorted by recency
+and record `id` is in records/<id // RECORDS_PER_SHARD>.json.
+"""
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from .AstroBuilder import makeSlug, writeIfChanged
+from .SteamDates import recordDate
+
+RECORDS_PER_SHARD = 500
+TOKEN_PREFIX_LENGTH = 2
+
+_token_pattern = re.compile(r"\w+")
+
+def sortByDate(screenshots: list[dict]) -> list[dict]:
+    """
+    Sorts screenshots newest first. Screenshots without a valid date go last,
+    ties keep the content order (which is newest first as listed by Steam).
+    """
+    return sorted(screenshots, key = lambda s: recordDate(s) or datetime.min, reverse = True)
+
+def tokenize(text: str) -> set[str]:
+    """
+    Returns:
+    ----------
+        set[str]: Lowercase words of the text, at least two characters long.
+    """
+    return {token for token in _token_pattern.findall(text.lower()) if len(token) >= 2}
+
+class SearchIndex:
+    """
+    Sharded search index of the screenshots of a build.
+
+    Arguments:
+    ----------
+        screenshots (list[dict]): Screenshots sorted newest first (see sortByDate).
+        albums (dict[int, tuple[str, str]]): Name and path of the album of every screenshot,
+                                             keyed by id() of the screenshot record.
+    """
+    logger = logging.getLogger("SearchIndex")
+
+    def __init__(self, screenshots: list[dict], albums: dict[int, tuple[str, str]]):
+        self.screenshots = screenshots
+        self.albums = albums
+
+    def shards(self) -> dict[str, object]:
+        """
+        Builds the index in one pass over the screenshots.
+
+        Returns:
+        ----------
+            dict[str, object]: JSON content of every shard, keyed by its path relative to the index directory.
+        """
+        album_ids: dict[tuple[str, str], int] = {}
+        games: dict[str, list[int]] = {}
+        months: dict[str, list[int]] = {}
+        tokens: dict[str, list[int]] = {}
+        records = []
+
+        for i, screenshot in enumerate(self.screenshots):
+            album = self.albums.get(id(screenshot))
+            album_id = album_ids.setdefault(album, len(album_ids)) if album is not None else None
+
+            date = recordDate(screenshot)
+            if date is not None:
+                months.setdefault(date.strftime("%Y-%m"), []).append(i)
+
+            games.setdefault(screenshot["game"], []).append(i)
+            for token in tokenize(f"{screenshot['title']} {screenshot['game']}"):
+                tokens.setdefault(token, []).append(i)
+
+            # compact positional records: image, title, game, ISO date, album, thumbnail
+            records.append([
+                screenshot["link"],
+                screenshot["title"],
+                screenshot["game"],
+                date.strftime("%Y-%m-%d") if date is not None else None,
+                album_id,
+                screenshot.get("thumbnail"),
+            ])
+
+        shards: dict[str, object] = {}
+        for start in range(0, len(records), RECORDS_PER_SHARD):
+            shards[f"records/{start // RECORDS_PER_SHARD}.json"] = records[start:start + RECORDS_PER_SHARD]
+
+        game_entries = []
+        game_slugs = set()
+        for game, ids in sorted(games.items()):
+            slug = makeSlug(game) or "game"
+            # different game names can share a slug, e.g. differing only in punctuation
+            while slug in game_slugs:
+                slug += "_"
+            game_slugs.add(slug)
+            game_entries.append([game, slug, len(ids)])
+            shards[f"games/{slug}.json"] = ids
+
+        for month, ids in months.items():
+            shards[f"months/{month}.json"] = ids
+
+        token_shards: dict[str, dict[str, list[int]]] = {}
+        for token, ids in tokens.items():
+            token_shards.setdefault(token[:TOKEN_PREFIX_LENGTH], {})[token] = ids
+        for prefix, shard in token_shards.items():
+            shards[f"tokens/{prefix}.json"] = dict(sorted(shard.items()))
+
+        shards["index.json"] = {
+            "count": len(records),
+            "records_per_shard": RECORDS_PER_SHARD,
+            "token_prefix_length": TOKEN_PREFIX_LENGTH,
+            "albums": [[name, path] for name, path in album_ids],
+            "games": game_entries,
+            "months": [[month, len(ids)] for month, ids in sorted(months.items(), reverse = True)],
+            "token_prefixes": sorted(token_shards),
+        }
+        return shards
+
+    def write(self, dir: str) -> tuple[int, int]:
+        """
+        Writes the index to the directory. Shards are only rewritten if their content changed,
+        and shards left over from previous builds are removed.
+
+        Arguments:
+        ----------
+            dir (str): Index directory, e.g. web/public/search.
+
+        Returns:
+        ----------
+            tuple[int, int]: Number of written and unchanged shards.
+        """
+        shards = self.shards()
+        written = 0
+        for path, content in shards.items():
+            full_path = os.path.join(dir, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok = True)
+            written += writeIfChanged(full_path, json.dumps(content, ensure_ascii = False, separators = (",", ":")))
+
+        expected = {os.path.normpath(os.path.join(dir, path)) for path in shards}
+        for root, _, files in os.walk(dir):
+            for file in files:
+                path = os.path.normpath(os.path.join(root, file))
+                if file.endswith(".json") and path not in expected:
+                    os.remove(path)
+
+        self.logger.info(f"Search index shards written: {written}, unchanged: {len(shards) - written}")
+        return written, len(shards) - written
@@ -0,0 +1,137 @@
+"""
+Normalization of screenshot dates. Steam shows dates like "25 Jan, 2021 @ 12:34pm",
+"Jan 25, 2021" or, for screenshots of the current year, "10 May @ 7:05am". Dates are
+normalized once, when the record is created, into a display string ("25 January 2021")
+and an ISO timestamp ("2021-01-25T12:34:00"), so the builder can sort and group
+screenshots without parsing display strings again.
+
+Screenshots share few distinct dates, so all parsing is memoized.
+"""
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable
+
+DISPLAY_FORMAT = "%d %B %Y"
+
+@lru_cache(maxsize = 4096)
+def parseSteamDate(date_string: str, reference: date) -> datetime:
+    """
+    Parses a date string of a Steam screenshot page.
+
+    Steam leaves out the year of dates in the year the page is viewed, so year-less dates
+    are resolved against the reference date (the day the page was fetched): they take
+    its year, or the year before if the date would otherwise be after the reference.
+    The result only depends on the arguments, never on when the function is called.
+
+    Arguments:
+    ----------
+        date_string (str): Date as shown on the screenshot page, e.g. "25 Jan, 2021 @ 12:34pm".
+        reference (date): Day the page was fetched.
+
+    Returns:
+    ----------
+        datetime: Parsed date and time (midnight if the page shows no time).
+
+    Raises:
+    ----------
+        ValueError: If the date string is not in a known format.
+    """
+    day, _, time_string = date_string.partition("@")
+    day = day.strip()
+    if not day:
+        raise ValueError(f"Empty Steam date: {date_string!r}")
+
+    day_format = "%b %d" if day[0].isalpha() else "%d %b"
+    if "," in day:
+        parsed = datetime.strptime(day, f"{day_format}, %Y")
+    else:
+        # parsed with an explicit year, strptime defaults to 1900 which has no 29 Feb
+        try:
+            parsed = datetime.strptime(f"{day}, {reference.year}", f"{day_format}, %Y")
+        except ValueError:
+            parsed = None
+        if parsed is None or parsed.date() > reference:
+            parsed = datetime.strptime(f"{day}, {reference.year - 1}", f"{day_format}, %Y")
+
+    time_string = time_string.strip().replace(" ", "")
+    if time_string:
+        parsed_time = datetime.strptime(time_string.upper(), "%I:%M%p")
+        parsed = parsed.replace(hour = parsed_time.hour, minute = parsed_time.minute)
+    return parsed
+
+def normalizeSteamDate(date_string: str, reference: date | None = None) -> tuple[str, str]:
+    """
+    Normalizes a date string of a Steam screenshot page.
+
+    Example: "25 Jan, 2021 @ 12:34pm" -> ("25 January 2021", "2021-01-25T12:34:00")
+
+    Arguments:
+    ----------
+        date_string (str): Date as shown on the screenshot page.
+        reference (date, optional): Day the page was fetched, see parseSteamDate. Defaults to today.
+
+    Returns:
+    ----------
+        tuple[str, str]: Display date and ISO timestamp.
+    """
+    parsed = parseSteamDate(date_string, reference or date.today())
+    return parsed.strftime(DISPLAY_FORMAT), parsed.isoformat()
+
+@lru_cache(maxsize = 4096)
+def parseDisplayDate(date_string: str) -> datetime | None:
+    """
+    Parses a display date of a content record ("21 January 2024").
+
+    Returns:
+    ----------
+        datetime | None: Parsed date, None if the date is missing or malformed.
+    """
+    try:
+        return datetime.strptime(date_string, DISPLAY_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+@lru_cache(maxsize = 4096)
+def _parseTimestamp(timestamp: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+
+def recordDate(record: dict) -> datetime | None:
+    """
+    Returns:
+    ----------
+        datetime | None: Date of a content record, from its ISO timestamp, or from the display
+                         date of records that were not migrated yet. None if the record has neither.
+    """
+    timestamp = record.get("timestamp")
+    if timestamp is not None:
+        parsed = _parseTimestamp(timestamp)
+        if parsed is not None:
+            return parsed
+    return parseDisplayDate(record.get("date"))
+
+def migrateRecords(records: Iterable[dict]) -> tuple[list[dict], int]:
+    """
+    Adds ISO timestamps to content records created before dates were normalized.
+    Their display dates have no time, so the timestamps are dates ("2021-01-25").
+
+    Arguments:
+    ----------
+        records (Iterable[dict]): Content records.
+
+    Returns:
+    ----------
+        tuple[list[dict], int]: All records and the number of migrated ones.
+    """
+    migrated = []
+    n = 0
+    for record in records:
+        if record.get("timestamp") is None:
+            parsed = parseDisplayDate(record.get("date"))
+            if parsed is not None:
+                record = {**record, "timestamp": parsed.date().isoformat()}
+                n += 1
+        migrated.append(record)
+    return migrated, n
@@ -1,2 +1,40 @@
-from .AstroBuilder import Album, IndexPage, AlbumPage, AstroBuilder
-from .ScreenshotScrapper import ScreenshotScrapper
+"""
+Public classes are imported lazily on first access, so importing the package (or running
+a single CLI subcommand) does not pull in selenium, bs4, requests or yaml unless needed.
+"""
+import importlib
+import sys
+import types
+
+_exports = {
+    "Album": "AstroBuilder",
+    "IndexPage": "AstroBuilder",
+    "AlbumPage": "AstroBuilder",
+    "AstroBuilder": "AstroBuilder",
+    "ScreenshotScrapper": "ScreenshotScrapper",
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name: str):
+    module_name = _exports.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # cache in the package namespace, later lookups do not go through __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
+
+class _LazyPackage(types.ModuleType):
+    def __setattr__(self, name: str, value):
+        # importing a submodule binds it on the package, but AstroBuilder and ScreenshotScrapper
+        # are modules named after their classes and the package exports the classes
+        if isinstance(value, types.ModuleType) and _exports.get(name) == name:
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = _LazyPackage
@@ -1,22 +1,201 @@
 import argparse
 import logging
-from .ScreenshotScrapper import ScreenshotScrapper
-from .AstroBuilder import AstroBuilder
-
-parser = argparse.ArgumentParser(description="Scrape Steam screenshots for a given user.")
-parser.add_argument("username", help="Steam username to scrape screenshots from")
-parser.add_argument("-o", "--output", default="content.yaml", help="Output YAML file (default: content.yaml)")
-parser.add_argument("-d", "--delay", type=int, default=5, help="Delay between requests in seconds (default: 5)")
-parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose (debug) logging")
+import os
+import sys
+from .Metrics import metrics
+
+# exit status of `build --exit-if-unchanged` when the pages are the same as in the previous build
+NOTHING_TO_DEPLOY = 100
+
+# subcommands import what they need, so e.g. building does not load selenium or bs4
+
+# store of a user name scraped without -o that is not listed in the manifest
+DEFAULT_STORE = "content.jsonl"
+
+def contentStores(args: argparse.Namespace) -> list[str]:
+    """
+    Content stores the command works with: the -o store if given, the store of the scraped
+    user name (the one of its manifest profile, if it is listed), otherwise the stores
+    of the profiles listed in the manifest.
+    """
+    if args.output is not None:
+        return [args.output]
+
+    import yaml
+    from .ProfileScheduler import profilesFromManifest
+
+    username = getattr(args, "username", None)
+    if username is not None and not os.path.exists(args.manifest):
+        return [DEFAULT_STORE]
+    with open(args.manifest, "r") as f:
+        profiles = profilesFromManifest(yaml.safe_load(f) or {})
+
+    if username is not None:
+        return [profile.store for profile in profiles if profile.name == username] or [DEFAULT_STORE]
+
+    stores = [profile.store for profile in profiles] or [DEFAULT_STORE]
+    if DEFAULT_STORE not in stores and os.path.exists(DEFAULT_STORE):
+        logging.getLogger("ContentStore").warning(
+            f"{DEFAULT_STORE} is not read, the manifest lists the stores {stores}; pass -o {DEFAULT_STORE} to use it"
+        )
+    return stores
+
+def scrape(args: argparse.Namespace):
+    from .DriverPool import DriverPool
+
+    # browsers are started only if a listing needs one and are shared by all profiles
+    with DriverPool(size = 1, max_uses = args.browser_uses, block = args.block) as driver_pool:
+        scrapeProfiles(args, driver_pool)
+
+def scrapeProfiles(args: argparse.Namespace, driver_pool):
+    from .ScreenshotScrapper import ScreenshotScrapper
+    from .HtmlParsing import setParserBackend
+
+    if args.parser is not None:
+        setParserBackend(args.parser)
+
+    def configure(scrapper: ScreenshotScrapper) -> ScreenshotScrapper:
+        scrapper.setDriverPool(driver_pool)
+        scrapper.setIncremental(args.incremental)
+        scrapper.setListingEngine(args.engine)
+        scrapper.setRefresh(args.refresh)
+        scrapper.setProgress(args.progress)
+        return scrapper
+
+    if args.username is not None:
+        scrapper = configure(ScreenshotScrapper(args.username))
+        scrapper.setRequestDelay(args.delay)
+        scrapper.setConcurrency(args.workers, args.burst)
+        output = contentStores(args)[0]
+        os.makedirs(os.path.dirname(output) or ".", exist_ok = True)
+        with metrics.span("scrape"):
+            scrapper.generateContentStructure(output = output, resume = args.resume)
+        return
+
+    import yaml
+    from .ProfileScheduler import ProfileScheduler, profilesFromManifest
+
+    with open(args.manifest, "r") as f:
+        profiles = profilesFromManifest(yaml.safe_load(f) or {})
+    if not profiles:
+        raise SystemExit(f"No username given and no profiles listed in {args.manifest}")
+
+    scheduler = ProfileScheduler(delay = args.delay, workers = args.workers, burst = args.burst)
+    scheduler.show_progress = args.progress
+    for profile in profiles:
+        scheduler.addProfile(configure(ScreenshotScrapper(profile.name, profile_url = profile.url)), profile.store)
+    with metrics.span("scrape"):
+        scheduler.run(resume = args.resume)
+
+def build(args: argparse.Namespace) -> int:
+    from .AstroBuilder import AstroBuilder
+    from .BuildWatcher import BuildWatcher
+
+    stores = contentStores(args)
+    if getattr(args, "watch", False):
+        BuildWatcher(args.web_dir, args.manifest, stores, workers = args.jobs, interval = args.interval).run()
+        return 0
+
+    astro_builder = AstroBuilder(args.web_dir, args.manifest, stores)
+    with metrics.span("build"):
+        if args.sharded:
+            astro_builder.buildSharded(workers = args.jobs)
+        else:
+            astro_builder.build(workers = args.jobs)
+
+    if args.exit_if_unchanged and not astro_builder.changed:
+        return NOTHING_TO_DEPLOY
+    return 0
+
+def migrate(args: argparse.Namespace):
+    from .ContentStore import ContentStore
+
+    for path in contentStores(args):
+        path, legacy_path = legacyContentPaths(path)
+        if legacy_path is not None:
+            if os.path.exists(path):
+                logging.getLogger("ContentStore").warning(f"Not converting {legacy_path}, {path} already exists")
+            else:
+                ContentStore.fromLegacyYaml(legacy_path, path)
+        ContentStore(path).migrateDates()
+
+def legacyContentPaths(path: str) -> tuple[str, str | None]:
+    """
+    Path of a JSON Lines store and of the legacy YAML content file it is converted from.
+    A .yaml path is converted into the .jsonl file next to it. A .jsonl path is converted
+    from the .yaml file of the same name, if only that one exists.
+    """
+    root, ext = os.path.splitext(path)
+    if ext in (".yaml", ".yml"):
+        return root + ".jsonl", path
+    if not os.path.exists(path):
+        for legacy_ext in (".yaml", ".yml"):
+            if os.path.exists(root + legacy_ext):
+                return path, root + legacy_ext
+    return path, None
+
+def scrapeAndBuild(args: argparse.Namespace) -> int:
+    scrape(args)
+    return build(args)
+
+common_parser = argparse.ArgumentParser(add_help=False)
+common_parser.add_argument("-o", "--output", default=None, help="JSON Lines content store (default: content.jsonl, or the stores of the manifest profiles)")
+common_parser.add_argument("--manifest", default="manifest.yaml", help="Manifest with profiles and albums (default: manifest.yaml)")
+common_parser.add_argument("-m", "--metrics", default=None, metavar="PATH", help="Save timings and counters of the run as a JSON report")
+common_parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose (debug) logging")
+
+scrape_parser = argparse.ArgumentParser(add_help=False)
+scrape_parser.add_argument("username", nargs="?", default=None, help="Steam username to scrape screenshots from (default: all profiles listed in the manifest)")
+scrape_parser.add_argument("-d", "--delay", type=float, default=5, help="Average delay between requests in seconds (default: 5)")
+scrape_parser.add_argument("-w", "--workers", type=int, default=1, help="Number of concurrent metadata fetching workers (default: 1)")
+scrape_parser.add_argument("-b", "--burst", type=int, default=1, help="Number of requests allowed back to back by the rate limiter (default: 1)")
+scrape_parser.add_argument("-i", "--incremental", type=int, default=None, metavar="N", help="Stop walking the profile after N consecutive already cached screenshots")
+scrape_parser.add_argument("-e", "--engine", choices=["http", "selenium"], default="http", help="Profile listing engine (default: http)")
+scrape_parser.add_argument("--browser-uses", type=int, default=20, metavar="N", help="Replace the selenium browser after N profile listings (default: 20)")
+scrape_parser.add_argument("--block", nargs="+", choices=["images", "fonts", "css"], default=[], help="Resources the selenium browser does not load, only links matter for listing")
+scrape_parser.add_argument("-p", "--parser", choices=["lxml", "html.parser", "regex"], default=None, help="HTML parser backend (default: lxml if installed, html.parser otherwise)")
+scrape_parser.add_argument("-f", "--refresh", type=float, default=0, metavar="FRACTION", help="Revalidate this fraction of cached screenshots, checked longest ago, with conditional requests (e.g. 0.05)")
+scrape_parser.add_argument("-r", "--resume", action="store_true", help="Resume the previous run, fetching only failed and missing screenshots")
+scrape_parser.add_argument("--progress", action="store_true", help="Show a live progress line with ETA while fetching metadata")
+
+build_parser = argparse.ArgumentParser(add_help=False)
+build_parser.add_argument("--web-dir", default="web", help="Astro project directory (default: web)")
+build_parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of processes rendering album pages (default: 1)")
+build_parser.add_argument("--exit-if-unchanged", action="store_true", help=f"Exit with status {NOTHING_TO_DEPLOY} if no album changed since the previous build, so there is nothing to deploy")
+build_parser.add_argument("-s", "--sharded", action="store_true", help="Stream the content stores into per-album partitions and render albums one by one, for archives too large to build in memory (skips image caching and the search index)")
+
+parser = argparse.ArgumentParser(prog="python -m VirtualMoments", description="Scrape Steam screenshots and build the Astro page.")
+subparsers = parser.add_subparsers(dest="command", required=True)
+
+subparsers.add_parser(
+    "scrape", parents=[common_parser, scrape_parser], help="Scrape screenshots of a Steam user into the content store"
+).set_defaults(run=scrape)
+
+build_command_parser = subparsers.add_parser(
+    "build", parents=[common_parser, build_parser], help="Build Astro pages from the content store and manifest"
+)
+build_command_parser.add_argument("--watch", action="store_true", help="Rebuild whenever the manifest, content store, templates or covers change")
+build_command_parser.add_argument("--interval", type=float, default=0.5, help="Polling interval of --watch in seconds (default: 0.5)")
+build_command_parser.set_defaults(run=build)
+
+subparsers.add_parser(
+    "all", parents=[common_parser, scrape_parser, build_parser], help="Scrape screenshots, then build the pages"
+).set_defaults(run=scrapeAndBuild)
+
+subparsers.add_parser(
+    "migrate", parents=[common_parser], help="Convert legacy YAML content files and add ISO timestamps to records of content stores written by older versions"
+).set_defaults(run=migrate)
+
 args = parser.parse_args()
 
 logging.basicConfig(level=logging.INFO)
 if args.verbose:
-    logging.getLogger("ScreenshotScrapper").setLevel(logging.DEBUG)
+    for logger_name in ("ScreenshotScrapper", "ProfileLister", "HttpFetcher", "AstroBuilder", "BuildWatcher", "ProfileScheduler", "ContentStore", "BuildManifest", "DriverPool"):
+        logging.getLogger(logger_name).setLevel(logging.DEBUG)
+
+status = args.run(args)
 
-scrapper = ScreenshotScrapper(args.username)
-scrapper.setRequestDelay(args.delay)
-content = scrapper.generateContentStructure(output = args.output)
+if args.metrics is not None:
+    metrics.writeReport(args.metrics)
 
-astro_builder = AstroBuilder("web", "manifest.yaml", content)
-astro_builder.build()
\ No newline at end of file
+sys.exit(status or 0)
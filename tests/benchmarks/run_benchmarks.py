@@ -0,0 +1,222 @@
+"""
+Offline benchmarks of the scrape-and-build pipeline. Screenshot pages are served by a local
+Steam stand-in and content sets are synthetic, so results only depend on the code and the machine.
+
+Phases:
+    scrape.listing/N   listing N screenshots from the paginated profile grid
+    scrape.metadata/N  fetching and parsing N screenshot pages into the content store
+    scrape.refresh/N   revalidating all N cached screenshots with conditional requests
+    load/N             loading a content store of N screenshots
+    build/N            AstroBuilder.build of N screenshots into an empty pages directory
+    rebuild/N          the same build again, with all pages unchanged
+    build.sharded/N    AstroBuilder.buildSharded of N screenshots into an empty pages directory
+
+Results are saved as JSON and compared with a baseline. Timings are normalized by a fixed
+calibration workload, so a baseline recorded on one machine is comparable on another.
+
+Usage:
+    python tests/benchmarks/run_benchmarks.py --sizes 1000 10000 --baseline tests/benchmarks/baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+import yaml
+from VirtualMoments.AstroBuilder import AstroBuilder
+from VirtualMoments.ContentStore import ContentStore, loadContent
+from VirtualMoments.Metrics import metrics
+from VirtualMoments.ScreenshotScrapper import ScreenshotScrapper
+from synthetic_content import albumCount, generateManifest, generateScreenshots
+from steam_stand_in import SteamStandInProcess, profileUrl
+
+def calibrate() -> float:
+    """
+    Times a fixed CPU-bound workload, used to normalize timings between machines.
+    """
+    records = generateScreenshots(2000, seed = 1)
+    start = time.perf_counter()
+    for _ in range(5):
+        text = "\n".join(json.dumps(record) for record in records)
+        sorted(json.loads(line)["title"] for line in text.splitlines())
+    return time.perf_counter() - start
+
+def benchScrape(n: int, workers: int, tmp_dir: str) -> dict[str, float]:
+    records = generateScreenshots(n, seed = n)
+    output = os.path.join(tmp_dir, f"scraped_{n}.jsonl")
+
+    with SteamStandInProcess(records) as base_url:
+        scrapper = ScreenshotScrapper("bench")
+        scrapper.profile_url = profileUrl(base_url)
+        scrapper.setRequestDelay(0)
+        scrapper.setConcurrency(workers)
+
+        metrics.reset()
+        start = time.perf_counter()
+        content = scrapper.generateContentStructure(output = output)
+        total = time.perf_counter() - start
+        listing = metrics.report()["spans"]["listing"]["total"]
+
+        if len(content) != n:
+            raise RuntimeError(f"Scraped {len(content)} of {n} screenshots")
+
+        scrapper.setRefresh(1)
+        metrics.reset()
+        start = time.perf_counter()
+        scrapper.generateContentStructure(output = output)
+        refresh = time.perf_counter() - start - metrics.report()["spans"]["listing"]["total"]
+
+    os.remove(output)
+    os.remove(f"{output}.state.json")
+    return {f"scrape.listing/{n}": listing, f"scrape.metadata/{n}": total - listing, f"scrape.refresh/{n}": refresh}
+
+def prepareWebDir(path: str):
+    pages_dir = os.path.join(path, "src", "pages")
+    os.makedirs(pages_dir)
+    os.makedirs(os.path.join(path, "public", "cover"))
+    for template in ("album_template.astro", "index_template.astro"):
+        shutil.copy(REPO_DIR / "web" / "src" / "pages" / template, pages_dir)
+
+def benchBuild(n: int, jobs: int, tmp_dir: str) -> dict[str, float]:
+    content_path = os.path.join(tmp_dir, f"content_{n}.jsonl")
+    manifest_path = os.path.join(tmp_dir, f"manifest_{n}.yaml")
+    ContentStore(content_path).write(generateScreenshots(n))
+    with open(manifest_path, "w") as f:
+        yaml.safe_dump(generateManifest(albumCount(n)), f)
+
+    start = time.perf_counter()
+    loadContent(content_path)
+    results = {f"load/{n}": time.perf_counter() - start}
+
+    web_dir = os.path.join(tmp_dir, f"web_{n}")
+    prepareWebDir(web_dir)
+    builder = AstroBuilder(web_dir, manifest_path, content_path)
+    # content is loaded on first access, it is timed by the load phase
+    builder.content
+
+    start = time.perf_counter()
+    builder.build(workers = jobs)
+    results[f"build/{n}"] = time.perf_counter() - start
+
+    builder = AstroBuilder(web_dir, manifest_path, content_path)
+    builder.content
+    start = time.perf_counter()
+    builder.build(workers = jobs)
+    results[f"rebuild/{n}"] = time.perf_counter() - start
+    shutil.rmtree(web_dir)
+
+    prepareWebDir(web_dir)
+    builder = AstroBuilder(web_dir, manifest_path, content_path)
+    start = time.perf_counter()
+    builder.buildSharded(workers = jobs)
+    results[f"build.sharded/{n}"] = time.perf_counter() - start
+
+    shutil.rmtree(web_dir)
+    return results
+
+def runBenchmarks(sizes: list[int], scrape_sizes: list[int], repeat: int = 3, workers: int = 4, jobs: int = 1) -> dict:
+    """
+    Runs all benchmarks, keeping the best time of `repeat` runs of every phase.
+
+    Returns:
+    ----------
+        dict: Report with the environment, calibration time and results in seconds.
+    """
+    best: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for _ in range(repeat):
+            runs = {}
+            for n in scrape_sizes:
+                runs.update(benchScrape(n, workers, tmp_dir))
+            for n in sizes:
+                runs.update(benchBuild(n, jobs, tmp_dir))
+            for name, seconds in runs.items():
+                best[name] = min(seconds, best.get(name, seconds))
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "calibration": min(calibrate() for _ in range(5)),
+        "options": {"repeat": repeat, "workers": workers, "jobs": jobs},
+        "results": best,
+    }
+
+def compare(report: dict, baseline: dict) -> list[tuple[str, float, float | None, float | None]]:
+    """
+    Compares results with a baseline report.
+
+    Returns:
+    ----------
+        list[tuple]: Name, seconds, baseline seconds and ratio normalized by calibration
+                     (None if the phase is not in the baseline).
+    """
+    speed = report["calibration"] / baseline["calibration"]
+    rows = []
+    for name, seconds in report["results"].items():
+        base_seconds = baseline["results"].get(name)
+        ratio = seconds / base_seconds / speed if base_seconds else None
+        rows.append((name, seconds, base_seconds, ratio))
+    return rows
+
+def formatTable(rows: list[tuple]) -> str:
+    lines = ["| Benchmark | Seconds | Baseline | Ratio |", "| --- | ---: | ---: | ---: |"]
+    for name, seconds, base_seconds, ratio in rows:
+        base = f"{base_seconds:.3f}" if base_seconds is not None else "-"
+        lines.append(f"| {name} | {seconds:.3f} | {base} | {f'{ratio:.2f}' if ratio is not None else '-'} |")
+    return "\n".join(lines)
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description = "Run offline benchmarks of VirtualMoments.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [1000, 10000, 100000], help = "Content sizes of load and build benchmarks")
+    parser.add_argument("--scrape-sizes", type = int, nargs = "*", default = [1000], help = "Profile sizes of scrape benchmarks")
+    parser.add_argument("--repeat", type = int, default = 3, help = "Number of runs, the best one is reported (default: 3)")
+    parser.add_argument("--workers", type = int, default = 4, help = "Scrapper workers (default: 4)")
+    parser.add_argument("--jobs", type = int, default = 1, help = "Processes rendering album pages (default: 1)")
+    parser.add_argument("-o", "--output", default = "bench_output.json", help = "Path of the JSON results (default: bench_output.json)")
+    parser.add_argument("--baseline", default = None, help = "JSON results to compare with")
+    parser.add_argument("--fail-over", type = float, default = None, metavar = "RATIO", help = "Exit with an error if a normalized ratio to the baseline exceeds RATIO")
+    parser.add_argument("--min-seconds", type = float, default = 0.05, help = "Phases faster than this in the baseline are too noisy to fail on (default: 0.05)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level = logging.WARNING)
+
+    report = runBenchmarks(args.sizes, args.scrape_sizes, args.repeat, args.workers, args.jobs)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent = 2)
+
+    baseline = {"calibration": report["calibration"], "results": {}}
+    if args.baseline is not None:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+
+    rows = compare(report, baseline)
+    table = formatTable(rows)
+    print(table)
+
+    # shows the table on the summary page of the workflow run
+    summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
+    if summary_path:
+        with open(summary_path, "a") as f:
+            f.write(f"## Benchmarks\n\n{table}\n")
+
+    if args.fail_over is not None:
+        regressions = [
+            name for name, _, base_seconds, ratio in rows
+            if ratio is not None and ratio > args.fail_over and base_seconds >= args.min_seconds
+        ]
+        if regressions:
+            print(f"Slower than {args.fail_over}x the baseline: {', '.join(regressions)}", file = sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
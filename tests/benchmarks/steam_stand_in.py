@@ -0,0 +1,157 @@
+"""
+Local HTTP stand-in for the Steam community pages the scrapper reads. Serves the paginated
+screenshot grid of a profile and the screenshot detail pages of a synthetic content set,
+rendered from the fixture pages, so scraping can be benchmarked without the network.
+
+    /id/<user>/screenshots/?p=N      grid page N, PAGE_SIZE screenshots per page
+    /sharedfiles/filedetails/?id=N   screenshot page
+
+Pages carry an ETag and unchanged pages are answered with 304 to conditional requests.
+"""
+import html
+import multiprocessing
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from synthetic_content import fillTemplate, loadFixture, steamDate
+
+PAGE_SIZE = 50
+
+def appId(game: str) -> int:
+    return 1000 + zlib.crc32(game.encode("utf-8")) % 100000
+
+class SteamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are sent separately, Nagle would hold the body back for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+
+        if url.path.startswith("/id/") and url.path.endswith("/screenshots/"):
+            body = self.server.renderProfilePage(int(query.get("p", ["1"])[0]))
+        elif url.path == "/sharedfiles/filedetails/" and query.get("id", [""])[0] in self.server.records:
+            body = self.server.renderScreenshotPage(query["id"][0])
+        else:
+            self.send_error(404)
+            return
+
+        data = body.encode("utf-8")
+        etag = f'"{zlib.crc32(data):08x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class SteamStandIn(ThreadingHTTPServer):
+    """
+    HTTP server serving a synthetic Steam profile.
+
+    Arguments:
+    ----------
+        records (list[dict]): Screenshot records of the profile, newest first (see synthetic_content).
+        port (int): Port to listen on, 0 picks a free one.
+    """
+    daemon_threads = True
+
+    def __init__(self, records: list[dict], port: int = 0):
+        super().__init__(("127.0.0.1", port), SteamHandler)
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.records = {record["page_link"].rsplit("=", 1)[1]: record for record in records}
+        self.order = list(self.records)
+        self.profile_template = loadFixture("profile_page.html")
+        self.item_template = loadFixture("profile_item.html")
+        self.screenshot_template = loadFixture("screenshot_page.html")
+
+    @property
+    def profile_url(self) -> str:
+        return profileUrl(self.base_url)
+
+    def renderProfilePage(self, page: int) -> str:
+        # like Steam, pages past the end have an empty grid
+        ids = self.order[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        items = "".join(
+            fillTemplate(
+                self.item_template,
+                page_link = html.escape(f"{self.base_url}/sharedfiles/filedetails/?id={screenshot_id}"),
+                app_id = appId(self.records[screenshot_id]["game"]),
+                id = screenshot_id,
+                image_link = self.records[screenshot_id]["link"],
+                title = html.escape(self.records[screenshot_id]["title"]),
+            )
+            for screenshot_id in ids
+        )
+        return fillTemplate(self.profile_template, screenshots = items)
+
+    def renderScreenshotPage(self, screenshot_id: str) -> str:
+        record = self.records[screenshot_id]
+        return fillTemplate(
+            self.screenshot_template,
+            id = screenshot_id,
+            app_id = appId(record["game"]),
+            game = html.escape(record["game"]),
+            title = html.escape(record["title"]),
+            image_link = record["link"],
+            date = steamDate(record["date"]),
+        )
+
+    def pageLinks(self) -> list[str]:
+        """
+        Returns:
+        ----------
+            list[str]: Screenshot page links as the scrapper lists them from this server.
+        """
+        return [f"{self.base_url}/sharedfiles/filedetails/?id={screenshot_id}" for screenshot_id in self.order]
+
+def profileUrl(base_url: str) -> str:
+    return f"{base_url}/id/bench/screenshots/"
+
+def _serve(records: list[dict], port_queue: multiprocessing.Queue):
+    server = SteamStandIn(records)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+class SteamStandInProcess:
+    """
+    Runs the stand-in in a separate process, so serving pages does not compete with
+    the benchmarked scrapper for the GIL. Used as a context manager returning the base URL.
+
+    Arguments:
+    ----------
+        records (list[dict]): Screenshot records of the profile.
+    """
+    def __init__(self, records: list[dict]):
+        self.records = records
+        self.process = None
+
+    def __enter__(self) -> str:
+        port_queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target = _serve, args = (self.records, port_queue), daemon = True)
+        self.process.start()
+        return f"http://127.0.0.1:{port_queue.get(timeout = 30)}"
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.join()
+
+def serveInThread(records: list[dict]) -> SteamStandIn:
+    """
+    Starts the stand-in in a daemon thread of this process. Stop it with `shutdown()`.
+    """
+    server = SteamStandIn(records)
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    return server
@@ -0,0 +1,102 @@
+"""
+Deterministic synthetic content for benchmarks: screenshot records spread over many
+games and albums, a matching manifest and the fixture pages of a Steam profile.
+"""
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+GAMES_PER_ALBUM = 3
+WORDS = [
+    "sunset", "city", "neon", "rain", "forest", "mountain", "race", "finish", "night",
+    "harbour", "desert", "storm", "photo", "mode", "lap", "ship", "planet", "ruins",
+]
+
+def fillTemplate(template: str, **values) -> str:
+    """
+    Fills `{name}` placeholders of a fixture page. The pages contain JavaScript,
+    so str.format can not be used.
+    """
+    for name, value in values.items():
+        template = template.replace(f"{{{name}}}", str(value))
+    return template
+
+def albumCount(n_screenshots: int) -> int:
+    """
+    Number of albums of a synthetic content set, growing with its size
+    (10 albums for 1k screenshots, 100 for 100k).
+    """
+    return max(5, round(n_screenshots ** 0.5 / 3))
+
+def generateGames(n_albums: int) -> list[str]:
+    """
+    Returns game names, GAMES_PER_ALBUM per album, plus a few games that are in no album
+    and end up in "Other".
+    """
+    games = [f"Series {i:04d} Part {k}" for i in range(n_albums) for k in range(1, GAMES_PER_ALBUM + 1)]
+    games += [f"Indie Game {i:04d}" for i in range(max(1, n_albums // 5))]
+    return games
+
+def generateManifest(n_albums: int, page_size: int = 100) -> dict:
+    """
+    Returns a manifest with `n_albums` albums. Every other album lists its games
+    with a glob pattern, so routing covers both exact names and patterns.
+    """
+    albums = []
+    for i in range(n_albums):
+        if i % 2:
+            album_games = [f"glob:Series {i:04d} *"]
+        else:
+            album_games = [f"Series {i:04d} Part {k}" for k in range(1, GAMES_PER_ALBUM + 1)]
+        albums.append({"name": f"Album {i:04d}", "games": album_games})
+
+    return {
+        "routing": {"multi_album": False},
+        "pagination": {"page_size": page_size},
+        "albums": albums,
+    }
+
+def generateScreenshots(n: int, n_albums: int = None, seed: int = 0) -> list[dict]:
+    """
+    Returns `n` content store records, newest first. Games are drawn with a skewed
+    distribution, as real profiles have a few games with most of the screenshots.
+
+    Arguments:
+    ----------
+        n (int): Number of screenshots.
+        n_albums (int, optional): Number of albums the games are spread over. Defaults to albumCount(n).
+        seed (int): Seed of the generator, the same seed always gives the same content.
+
+    Returns:
+    ----------
+        list[dict]: Screenshot records.
+    """
+    rng = random.Random(seed)
+    games = generateGames(n_albums if n_albums is not None else albumCount(n))
+    weights = [1 / (i + 1) for i in range(len(games))]
+    start = datetime(2024, 12, 31)
+
+    records = []
+    for i, game in enumerate(rng.choices(games, weights = weights, k = n)):
+        screenshot_id = 3000000000 + n - i
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 5))).capitalize()
+        taken = start - timedelta(minutes = 37 * i)
+        records.append({
+            "page_link": f"https://steamcommunity.com/sharedfiles/filedetails/?id={screenshot_id}",
+            "game": game,
+            "title": title,
+            "link": f"https://images.steamusercontent.com/ugc/{screenshot_id:x}/{rng.getrandbits(64):016X}/",
+            "date": taken.strftime("%d %B %Y"),
+        })
+    return records
+
+def steamDate(date: str) -> str:
+    """
+    Formats a record date ("21 January 2024") the way Steam displays it ("21 Jan, 2024 @ 10:10pm").
+    """
+    return datetime.strptime(date, "%d %B %Y").strftime("%d %b, %Y @ 10:10pm").lstrip("0")
+
+def loadFixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding = "utf-8")
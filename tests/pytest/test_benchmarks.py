@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+# Add the benchmarks directory to the path, the harness is run as a script
+# and its modules are not part of the package.
+benchmarks_path = Path(__file__).resolve().parent.parent / "benchmarks"
+sys.path.insert(0, str(benchmarks_path))
+
+import json
+import pytest
+from VirtualMoments.ScreenshotScrapper import ScreenshotScrapper
+from run_benchmarks import compare, main
+from steam_stand_in import serveInThread
+from synthetic_content import albumCount, generateManifest, generateScreenshots
+
+@pytest.fixture
+def records():
+    return generateScreenshots(120)
+
+@pytest.fixture
+def stand_in(records):
+    server = serveInThread(records)
+    yield server
+    server.shutdown()
+
+class TestSteamStandIn:
+    def test_scrapeSyntheticProfile(self, stand_in, records):
+        scrapper = ScreenshotScrapper("bench")
+        scrapper.profile_url = stand_in.profile_url
+        scrapper.setRequestDelay(0)
+
+        content = scrapper.generateContentStructure()
+
+        assert [s.page_link for s in content] == stand_in.pageLinks()
+        assert [(s.game, s.title, s.link, s.date) for s in content] == [
+            (r["game"], r["title"], r["link"], r["date"]) for r in records
+        ]
+
+class TestSyntheticContent:
+    def test_deterministic(self):
+        assert generateScreenshots(50, seed = 3) == generateScreenshots(50, seed = 3)
+        assert generateScreenshots(50, seed = 3) != generateScreenshots(50, seed = 4)
+
+    def test_manifestCoversGames(self, records):
+        manifest = generateManifest(albumCount(len(records)))
+        assert len(manifest["albums"]) == albumCount(len(records))
+        assert any(game.startswith("glob:") for album in manifest["albums"] for game in album["games"])
+
+class TestRunBenchmarks:
+    def test_compareNormalizesByCalibration(self):
+        baseline = {"calibration": 1.0, "results": {"build/1000": 1.0}}
+        report = {"calibration": 2.0, "results": {"build/1000": 4.0, "load/1000": 1.0}}
+
+        assert compare(report, baseline) == [("build/1000", 4.0, 1.0, 2.0), ("load/1000", 1.0, None, None)]
+
+    def test_failOverBaseline(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("GITHUB_STEP_SUMMARY", raising = False)
+        output = tmp_path / "bench.json"
+        assert main(["--sizes", "200", "--scrape-sizes", "--repeat", "1", "-o", str(output)]) == 0
+
+        report = json.loads(output.read_text())
+        assert set(report["results"]) == {"load/200", "build/200", "rebuild/200", "build.sharded/200"}
+
+        baseline = tmp_path / "baseline.json"
+        report["results"] = {name: seconds / 100 for name, seconds in report["results"].items()}
+        baseline.write_text(json.dumps(report))
+        assert main(["--sizes", "200", "--scrape-sizes", "--repeat", "1", "-o", str(output),
+                     "--baseline", str(baseline), "--fail-over", "3", "--min-seconds", "0"]) == 1
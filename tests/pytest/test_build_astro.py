@@ -1,13 +1,11 @@
-import sys
-from pathlib import Path
-# Add the run directory to the path, othwerwise pytests
-# fails to find the tested file.
-script_path = Path(__file__).resolve().parent.parent.parent / "scripts"
-sys.path.insert(0, str(script_path))
-
 import pytest
 from datetime import datetime
-from build_astro import Album, IndexPage, AlbumPage
+import os
+from VirtualMoments.AstroBuilder import (
+    AstroBuilder, Album, IndexPage, AlbumPage, GameRouter, PageTemplate, SlugRegistry, escapeAttribute, writeIfChanged
+)
+from VirtualMoments.BuildManifest import BuildManifest
+from VirtualMoments.ContentStore import ContentStore
 
 @pytest.fixture
 def album():
@@ -88,6 +86,12 @@ class TestIndexPage:
         assert '<AlbumCover' in index_html
         assert f'<Footer date="{datetime.now().strftime("%d %B %Y")}" />' in index_html
 
+    def test_searchOnlyIfEnabled(self, album):
+        template = "<!-- SEARCH --><!-- ALBUMS -->"
+        assert "<Search />" not in IndexPage(template, [album]).buildIndexPage()
+        assert "<!-- SEARCH -->" not in IndexPage(template, [album]).buildIndexPage()
+        assert "<Search />" in IndexPage(template, [album], search = True).buildIndexPage()
+
     def test_buildIndexPage_save(self, index_page, tmp_path):
         index_page.buildIndexPage(save=True, dir=tmp_path)
 
@@ -136,4 +140,352 @@ class TestAlbumPage:
             album_html = f.read()
 
         assert '<Screenshot src="https://test-link1.com" alt="Test title 1" date="21 January 2024" />' in album_html
-        assert '<Screenshot src="https://test-link2.com" alt="Test title 2" date="25 January 2025" />' in album_html
\ No newline at end of file
+        assert '<Screenshot src="https://test-link2.com" alt="Test title 2" date="25 January 2025" />' in album_html
+class TestAstroBuilder:
+    @pytest.fixture
+    def web_dir(self, tmp_path):
+        pages_dir = tmp_path / "src" / "pages"
+        pages_dir.mkdir(parents = True)
+        (pages_dir / "album_template.astro").write_text("<Album><!-- SCREENSHOTS --></Album>")
+        (pages_dir / "index_template.astro").write_text("<Index><!-- ALBUMS --><!-- FOOTER --></Index>")
+        return tmp_path
+
+    @pytest.fixture
+    def manifest(self):
+        return {"albums": [{"name": "Album 1", "games": ["Game 1"]}, {"name": "Album 2", "games": ["Game 2"]}]}
+
+    @pytest.fixture
+    def content(self):
+        return [
+            {"page_link": f"https://page{i}", "game": f"Game {i % 3}", "title": f"Title {i}", "link": f"https://link{i}", "date": "21 January 2024"}
+            for i in range(9)
+        ]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_build(self, web_dir, manifest, content, workers):
+        albums = AstroBuilder(str(web_dir), manifest, content).build(workers = workers)
+
+        assert [(a.name, len(a.screenshots)) for a in albums] == [("Album 1", 3), ("Album 2", 3), ("Other", 3)]
+        pages_dir = web_dir / "src" / "pages"
+        for page in ["album_1.astro", "album_2.astro", "other.astro", "index.astro"]:
+            assert (pages_dir / page).exists()
+        assert 'alt="Title 4"' in (pages_dir / "album_1.astro").read_text()
+
+    def test_buildFromSeveralStores(self, web_dir, manifest, content, tmp_path):
+        stores = [str(tmp_path / "user1.jsonl"), str(tmp_path / "user2.jsonl")]
+        ContentStore(stores[0]).append(content[:4])
+        ContentStore(stores[1]).append(content[4:])
+
+        albums = AstroBuilder(str(web_dir), manifest, stores).build()
+
+        assert sum(len(a.screenshots) for a in albums) == len(content)
+        assert 'alt="Title 4"' in (web_dir / "src" / "pages" / "album_1.astro").read_text()
+
+    def test_skipUnchangedPages(self, web_dir, manifest, content):
+        pages_dir = web_dir / "src" / "pages"
+        AstroBuilder(str(web_dir), manifest, content).build()
+        for page in pages_dir.iterdir():
+            os.utime(page, ns = (0, 0))
+
+        content.append({"page_link": "https://new", "game": "Game 2", "title": "New", "link": "https://new", "date": "22 January 2024"})
+        AstroBuilder(str(web_dir), manifest, content).build()
+
+        assert (pages_dir / "album_1.astro").stat().st_mtime_ns == 0
+        assert (pages_dir / "other.astro").stat().st_mtime_ns == 0
+        assert (pages_dir / "album_2.astro").stat().st_mtime_ns != 0
+
+class TestWriteIfChanged:
+    def test_writeIfChanged(self, tmp_path):
+        path = str(tmp_path / "page.astro")
+
+        assert writeIfChanged(path, "Zażółć")
+        assert not writeIfChanged(path, "Zażółć")
+        assert writeIfChanged(path, "Zażółć gęślą")
+        assert open(path, encoding = "utf-8").read() == "Zażółć gęślą"
+
+class TestGameRouter:
+    @pytest.fixture
+    def albums(self):
+        return [
+            Album("Formula", ["glob:F1 *"]),
+            Album("Motorsports", ["art of rally", "F1 2019", "re:^Assetto Corsa"]),
+            Album("Forza", ["Forza Horizon 5"]),
+        ]
+
+    def test_routeExactGame(self, albums):
+        router = GameRouter(albums)
+        assert router.route("Forza Horizon 5") == [albums[2]]
+        assert router.route("Forza Horizon 4") == []
+
+    def test_routePatterns(self, albums):
+        router = GameRouter(albums)
+        assert router.route("F1 2021") == [albums[0]]
+        assert router.route("Assetto Corsa Competizione") == [albums[1]]
+
+    def test_exactNameWithGlobCharacters(self):
+        albums = [Album("Prototype", ["[PROTOTYPE]"]), Album("Formula", ["F1 *"])]
+        router = GameRouter(albums)
+        assert router.route("[PROTOTYPE]") == [albums[0]]
+        assert router.route("P") == []
+        assert router.route("F1 *") == [albums[1]]
+        assert router.route("F1 2021") == []
+
+    def test_firstAlbumWins(self, albums):
+        assert GameRouter(albums).route("F1 2019") == [albums[0]]
+
+    def test_multiAlbum(self, albums):
+        assert GameRouter(albums, multi_album = True).route("F1 2019") == [albums[0], albums[1]]
+
+    def test_multiAlbumManifest(self, tmp_path):
+        pages_dir = tmp_path / "src" / "pages"
+        pages_dir.mkdir(parents = True)
+        (pages_dir / "album_template.astro").write_text("<!-- SCREENSHOTS -->")
+        (pages_dir / "index_template.astro").write_text("<!-- ALBUMS --><!-- FOOTER -->")
+        manifest = {
+            "routing": {"multi_album": True},
+            "albums": [{"name": "Formula", "games": ["glob:F1 *"]}, {"name": "Motorsports", "games": ["F1 2019"]}],
+        }
+        content = [{"page_link": "p", "game": "F1 2019", "title": "", "link": "l", "date": "21 January 2024"}]
+
+        albums = AstroBuilder(str(tmp_path), manifest, content).build()
+        assert [len(a.screenshots) for a in albums] == [1, 1, 0]
+
+class TestAlbumPagination:
+    @pytest.fixture
+    def album(self):
+        return Album("Big album", ["Game"], [
+            {"game": "Game", "title": f"Title {i}", "link": f"https://link{i}", "date": "21 January 2024"}
+            for i in range(5)
+        ])
+
+    @pytest.fixture
+    def template(self):
+        return "---\nimport Album from '../layouts/Album.astro';\n---\n<!-- SCREENSHOTS --><!-- PAGINATION -->"
+
+    def test_singlePageByDefault(self, album, template):
+        page = AlbumPage(template, album)
+
+        assert page.n_pages == 1
+        album_html = page.buildAlbumPage()
+        assert album_html.count("<Screenshot") == 5
+        assert "<Pagination" not in album_html
+
+    def test_splitPages(self, album, template):
+        page = AlbumPage(template, album, page_size = 2)
+        assert page.n_pages == 3
+
+        first = page.buildAlbumPage(page = 1)
+        assert first.count("<Screenshot") == 2
+        assert "'../layouts/Album.astro'" in first
+        assert '<Pagination page={1} pages={3}  next="/VirtualMoments/big_album/2/" />' in first
+
+        last = page.buildAlbumPage(page = 3)
+        assert 'alt="Title 4"' in last
+        assert "'../../layouts/Album.astro'" in last
+        assert 'prev="/VirtualMoments/big_album/2/"' in last
+        assert "next=" not in last
+
+        with pytest.raises(ValueError):
+            page.buildAlbumPage(page = 4)
+
+    def test_savePages(self, album, template, tmp_path):
+        AlbumPage(template, album, page_size = 2).buildAlbumPages(dir = tmp_path)
+
+        assert (tmp_path / "big_album.astro").exists()
+        assert (tmp_path / "big_album" / "2.astro").exists()
+        assert (tmp_path / "big_album" / "3.astro").exists()
+
+        assert AlbumPage(template, album, page_size = 3).buildAlbumPages(dir = tmp_path)
+        assert (tmp_path / "big_album" / "2.astro").exists()
+        assert not (tmp_path / "big_album" / "3.astro").exists()
+        assert not AlbumPage(template, album, page_size = 3).buildAlbumPages(dir = tmp_path)
+
+    def test_indexLinksFirstPage(self, album):
+        index_html = IndexPage("<!-- ALBUMS -->", [album]).buildIndexPage()
+        assert 'path="/VirtualMoments/big_album/"' in index_html
+
+class TestCachedImages:
+    def test_buildAlbumContentWithThumbnail(self):
+        album = Album("Album", ["Game"], [{
+            "game": "Game", "title": "Title", "link": "https://link", "date": "21 January 2024",
+            "width": 1920, "height": 1080, "thumbnail": "/VirtualMoments/thumbs/abc_480.jpg",
+            "srcset": "/VirtualMoments/thumbs/abc_480.jpg 480w, https://link 1920w"
+        }])
+
+        assert album.buildAlbumContent() == (
+            '<Screenshot src="https://link" alt="Title" date="21 January 2024" width={1920} height={1080}'
+            ' thumbnail="/VirtualMoments/thumbs/abc_480.jpg" srcset="/VirtualMoments/thumbs/abc_480.jpg 480w, https://link 1920w" />'
+        )
+
+    def test_cacheImages(self, tmp_path):
+        pages_dir = tmp_path / "src" / "pages"
+        pages_dir.mkdir(parents = True)
+        (pages_dir / "album_template.astro").write_text("<!-- SCREENSHOTS -->")
+        (pages_dir / "index_template.astro").write_text("<!-- ALBUMS --><!-- FOOTER -->")
+        store = ContentStore(str(tmp_path / "content.jsonl"))
+        store.append([{"page_link": "p", "game": "Game", "title": "", "link": "https://link", "date": "21 January 2024"}])
+
+        class FakeImageCache:
+            def process(self, url):
+                return {"width": 1920, "height": 1080, "thumbnail": "/thumb.jpg", "srcset": "/thumb.jpg 480w"}
+            def save(self):
+                pass
+
+        builder = AstroBuilder(str(tmp_path), {"albums": []}, store.path)
+        assert builder.cacheImages(FakeImageCache()) == 1
+        assert builder.cacheImages(FakeImageCache()) == 0
+        assert store.load()[0]["width"] == 1920
+
+class TestSlugRegistry:
+    def test_memoizedSlug(self):
+        registry = SlugRegistry()
+        assert registry.slug("ThiS is A'n: Album") == "this_is_an_album"
+        assert registry.slug("ThiS is A'n: Album") == "this_is_an_album"
+
+    def test_throwErrorOnCollision(self):
+        registry = SlugRegistry()
+        registry.slug("Witcher: 3")
+        with pytest.raises(ValueError):
+            registry.slug("Witcher 3")
+
+    def test_buildFailsOnDuplicateSlugs(self, tmp_path):
+        pages_dir = tmp_path / "src" / "pages"
+        pages_dir.mkdir(parents = True)
+        (pages_dir / "album_template.astro").write_text("<!-- SCREENSHOTS -->")
+        (pages_dir / "index_template.astro").write_text("<!-- ALBUMS --><!-- FOOTER -->")
+        manifest = {"albums": [{"name": "No Man's Sky", "games": []}, {"name": "No Mans Sky", "games": []}]}
+
+        with pytest.raises(ValueError):
+            AstroBuilder(str(tmp_path), manifest, []).build()
+        assert not (pages_dir / "no_mans_sky.astro").exists()
+
+    @pytest.mark.parametrize("name, search", [("Other", None), ("Recent", {"recent": 10})])
+    def test_buildFailsOnBuiltInAlbumNames(self, tmp_path, name, search):
+        pages_dir = tmp_path / "src" / "pages"
+        pages_dir.mkdir(parents = True)
+        (pages_dir / "album_template.astro").write_text("<!-- SCREENSHOTS -->")
+        (pages_dir / "index_template.astro").write_text("<!-- ALBUMS --><!-- FOOTER -->")
+        manifest = {"albums": [{"name": name, "games": ["Game"]}], "search": search}
+
+        with pytest.raises(ValueError):
+            AstroBuilder(str(tmp_path), manifest, []).build()
+
+    def test_registerSameNameTwice(self):
+        registry = SlugRegistry()
+        registry.register(Album("Other", []))
+        with pytest.raises(ValueError):
+            registry.register(Album("Other", []))
+
+class TestCoverIndex:
+    def test_coverFromIndex(self, tmp_path):
+        album = Album("Test album", [])
+        album.default_covers_path = str(tmp_path)
+        assert "cover=" not in album.buildAlbumCover()
+
+        album.covers = {"test_album"}
+        assert 'cover="test_album"' in album.buildAlbumCover()
+
+    def test_buildUsesCoversDirectory(self, tmp_path):
+        pages_dir = tmp_path / "src" / "pages"
+        pages_dir.mkdir(parents = True)
+        (tmp_path / "public" / "cover").mkdir(parents = True)
+        (tmp_path / "public" / "cover" / "album_1.svg").write_text("<svg />")
+        (pages_dir / "album_template.astro").write_text("<!-- SCREENSHOTS -->")
+        (pages_dir / "index_template.astro").write_text("<!-- ALBUMS --><!-- FOOTER -->")
+
+        AstroBuilder(str(tmp_path), {"albums": [{"name": "Album 1", "games": []}]}, []).build()
+        index_html = (pages_dir / "index.astro").read_text()
+        assert 'cover="album_1"' in index_html
+        assert 'cover="other"' not in index_html
+
+class TestPageTemplate:
+    def test_render(self):
+        template = PageTemplate("<A><!-- SCREENSHOTS --></A><!-- UNKNOWN --><!-- PAGINATION -->")
+
+        chunks = list(template.render(SCREENSHOTS = (f"<S{i} />" for i in range(3)), PAGINATION = "<P />"))
+        assert chunks == ["<A>", "<S0 />", "<S1 />", "<S2 />", "</A>", "<!-- UNKNOWN -->", "<P />"]
+
+    def test_nested(self):
+        template = PageTemplate("import Album from '../layouts/Album.astro';<!-- SCREENSHOTS -->")
+        assert template.nested() is template.nested()
+        assert "".join(template.nested().render()) == "import Album from '../../layouts/Album.astro';<!-- SCREENSHOTS -->"
+
+    def test_writeChunks(self, tmp_path):
+        path = str(tmp_path / "page.astro")
+
+        assert writeIfChanged(path, (f"<S{i} />" for i in range(1000)))
+        assert not writeIfChanged(path, (f"<S{i} />" for i in range(1000)))
+        assert not (tmp_path / "page.astro.tmp").exists()
+        assert open(path).read() == "".join(f"<S{i} />" for i in range(1000))
+
+class TestEscapeAttribute:
+    def test_escapeQuotes(self):
+        assert escapeAttribute("alt", "Title") == 'alt="Title"'
+        assert escapeAttribute("alt", 'Say "hi"') == 'alt={"Say \\"hi\\""}'
+
+    def test_escapeScreenshotFields(self):
+        album = Album("Album", [], [{"game": "Game", "title": 'The "best" view', "link": "https://link", "date": "21 January 2024"}])
+        assert 'alt={"The \\"best\\" view"}' in album.buildAlbumContent()
+
+class TestShardedBuild:
+    @pytest.fixture
+    def web_dir(self, tmp_path):
+        pages_dir = tmp_path / "web" / "src" / "pages"
+        pages_dir.mkdir(parents = True)
+        (pages_dir / "album_template.astro").write_text("<!-- SCREENSHOTS --><!-- PAGINATION -->")
+        (pages_dir / "index_template.astro").write_text("<!-- ALBUMS --><!-- FOOTER -->")
+        return tmp_path / "web"
+
+    @pytest.fixture
+    def stores(self, tmp_path):
+        store1 = ContentStore(str(tmp_path / "user1.jsonl"))
+        store1.append(
+            {"page_link": f"p{i}", "game": f"Game {i % 3}", "title": f"Title {i}", "link": f"https://link{i}", "date": "21 January 2024"}
+            for i in range(20)
+        )
+        # p1 moves from Album 1 to Album 2, p0 from Other to Album 2, p3 is updated in place
+        store1.append([
+            {"page_link": "p1", "game": "Game 2", "title": "Moved", "link": "https://link1", "date": "21 January 2024"},
+            {"page_link": "p0", "game": "Game 2", "title": "Moved in", "link": "https://link0", "date": "21 January 2024"},
+            {"page_link": "p3", "game": "Game 0", "title": "Updated", "link": "https://link3", "date": "21 January 2024"},
+        ])
+        store2 = ContentStore(str(tmp_path / "user2.jsonl"))
+        store2.append([{"page_link": "q1", "game": "Game 1", "title": "Other user", "link": "https://q1", "date": "21 January 2024"}])
+        return [store1.path, store2.path]
+
+    manifest = {
+        "albums": [{"name": "Album 1", "games": ["Game 1"]}, {"name": "Album 2", "games": ["Game 2", "Game 1"]}],
+        "routing": {"multi_album": True},
+        "pagination": {"page_size": 4},
+    }
+
+    def pages(self, web_dir):
+        pages_dir = web_dir / "src" / "pages"
+        return {str(p.relative_to(pages_dir)): p.read_text() for p in pages_dir.rglob("*.astro") if "template" not in p.name}
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_samePagesAsBuild(self, web_dir, stores, workers):
+        AstroBuilder(str(web_dir), self.manifest, stores).build()
+        expected = self.pages(web_dir)
+        expected_albums = BuildManifest.load(str(web_dir / "build_manifest.json")).albums
+
+        for page in (web_dir / "src" / "pages").rglob("*.astro"):
+            if "template" not in page.name:
+                page.unlink()
+        builder = AstroBuilder(str(web_dir), self.manifest, stores)
+        builder.buildSharded(workers = workers)
+
+        assert self.pages(web_dir) == expected
+        assert BuildManifest.load(str(web_dir / "build_manifest.json")).albums == expected_albums
+        assert not builder.changed
+        assert "Moved" in expected["album_2.astro"] + expected["album_2/2.astro"]
+        assert "Moved" not in "".join(v for k, v in expected.items() if k.startswith("album_1"))
+
+    def test_contentNotLoaded(self, web_dir, stores):
+        builder = AstroBuilder(str(web_dir), self.manifest, stores)
+        builder.buildSharded()
+        assert builder._content is None
+
+    def test_throwErrorOnRecordList(self, web_dir):
+        with pytest.raises(ValueError):
+            AstroBuilder(str(web_dir), self.manifest, []).buildSharded()
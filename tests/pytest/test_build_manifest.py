@@ -0,0 +1,165 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+import yaml
+from VirtualMoments.AstroBuilder import AlbumPage, AstroBuilder
+from VirtualMoments.BuildManifest import BuildManifest
+from VirtualMoments.ContentStore import ContentStore
+
+REPO_DIR = Path(__file__).resolve().parent.parent.parent
+
+def record(i, game = "Game 1"):
+    return {"page_link": f"p{i}", "game": game, "title": f"Title {i}", "link": f"https://link{i}", "date": "21 January 2024"}
+
+@pytest.fixture
+def web_dir(tmp_path):
+    pages_dir = tmp_path / "web" / "src" / "pages"
+    pages_dir.mkdir(parents = True)
+    (pages_dir / "album_template.astro").write_text("<!-- SCREENSHOTS -->")
+    (pages_dir / "index_template.astro").write_text("<!-- ALBUMS --><!-- FOOTER -->")
+    return tmp_path / "web"
+
+manifest = {"albums": [{"name": "Album 1", "games": ["Game 1"]}, {"name": "Album 2", "games": ["Game 2"]}]}
+
+class TestBuildManifest:
+    def test_changeFeed(self, tmp_path):
+        previous = BuildManifest(str(tmp_path / "build_manifest.json"))
+        previous.albums = {"Album 1": {"ids": ["a", "b"], "hash": "1"}, "Old": {"ids": ["c"], "hash": "2"}}
+
+        assert previous.changeFeed({"Album 1": ["d", "a"], "New": ["c"]}) == {
+            "Album 1": {"added": ["d"], "removed": ["b"]},
+            "New": {"added": ["c"], "removed": []},
+            "Old": {"added": [], "removed": ["c"]},
+        }
+        assert previous.changeFeed({"Album 1": ["b", "a"], "Old": ["c"]}) == {}
+
+    def test_saveAndLoad(self, tmp_path):
+        manifest = BuildManifest(str(tmp_path / "web" / "build_manifest.json"))
+        manifest.updated = "21 January 2024"
+        manifest.albums = {"Album 1": {"ids": ["a"], "hash": "1"}}
+        manifest.save()
+
+        loaded = BuildManifest.load(manifest.path)
+        assert (loaded.updated, loaded.albums, loaded.albumHash("Album 1"), loaded.albumHash("Album 2")) == (
+            "21 January 2024", {"Album 1": {"ids": ["a"], "hash": "1"}}, "1", None
+        )
+
+    def test_loadMissingOrBroken(self, tmp_path):
+        assert BuildManifest.load(str(tmp_path / "missing.json")).albums == {}
+        (tmp_path / "broken.json").write_text("{")
+        assert BuildManifest.load(str(tmp_path / "broken.json")).albums == {}
+
+class TestIncrementalBuild:
+    def test_unchangedBuild(self, web_dir, monkeypatch):
+        builder = AstroBuilder(str(web_dir), manifest, [record(1), record(2, "Game 2")])
+        builder.build()
+        assert builder.changed
+        assert builder.change_feed == {"Album 1": {"added": ["p1"], "removed": []}, "Album 2": {"added": ["p2"], "removed": []}}
+
+        index = web_dir / "src" / "pages" / "index.astro"
+        build_manifest = json.loads((web_dir / "build_manifest.json").read_text())
+        build_manifest["updated"] = "1 January 2020"
+        (web_dir / "build_manifest.json").write_text(json.dumps(build_manifest))
+
+        # unchanged albums are not rendered again
+        monkeypatch.setattr(AlbumPage, "buildAlbumPages", lambda self, dir = None: pytest.fail(f"{self.album.name} rendered"))
+        builder = AstroBuilder(str(web_dir), manifest, [record(1), record(2, "Game 2")])
+        builder.build()
+
+        # the footer keeps the date of the last change
+        assert builder.change_feed == {}
+        assert 'date="1 January 2020"' in index.read_text()
+
+        stat = index.stat()
+        builder = AstroBuilder(str(web_dir), manifest, [record(1), record(2, "Game 2")])
+        builder.build()
+
+        assert not builder.changed
+        assert index.stat().st_mtime_ns == stat.st_mtime_ns
+
+    def test_changedBuild(self, web_dir):
+        AstroBuilder(str(web_dir), manifest, [record(1), record(2, "Game 2")]).build()
+
+        builder = AstroBuilder(str(web_dir), manifest, [record(3), record(1), record(2, "Game 1")])
+        builder.build()
+
+        assert builder.changed
+        assert builder.change_feed == {"Album 1": {"added": ["p3", "p2"], "removed": []}, "Album 2": {"added": [], "removed": ["p2"]}}
+        assert "https://link3" in (web_dir / "src" / "pages" / "album_1.astro").read_text()
+
+    def test_changedRecordWithSameIds(self, web_dir):
+        AstroBuilder(str(web_dir), manifest, [record(1)]).build()
+
+        builder = AstroBuilder(str(web_dir), manifest, [{**record(1), "title": "New title"}])
+        builder.build()
+
+        assert builder.changed
+        assert builder.change_feed == {}
+        assert "New title" in (web_dir / "src" / "pages" / "album_1.astro").read_text()
+
+    def test_unrenderedFieldsChanged(self, web_dir):
+        AstroBuilder(str(web_dir), manifest, [{**record(1), "checked": "2024-01-21T10:00:00+00:00", "etag": '"v1"'}]).build()
+
+        builder = AstroBuilder(str(web_dir), manifest, [{**record(1), "checked": "2024-02-21T10:00:00+00:00", "etag": '"v2"'}])
+        builder.build()
+
+        assert not builder.changed
+
+    def test_renderMissingPages(self, web_dir):
+        AstroBuilder(str(web_dir), manifest, [record(1)]).build()
+        (web_dir / "src" / "pages" / "album_1.astro").unlink()
+
+        builder = AstroBuilder(str(web_dir), manifest, [record(1)])
+        builder.build()
+
+        assert not builder.changed
+        assert (web_dir / "src" / "pages" / "album_1.astro").exists()
+
+    def test_shardedBuildKeepsRecent(self, web_dir, tmp_path):
+        store = ContentStore(str(tmp_path / "content.jsonl"))
+        store.append([record(1), record(2, "Game 2")])
+        search_manifest = {**manifest, "search": {"recent": 10}}
+        AstroBuilder(str(web_dir), search_manifest, store.path).build()
+
+        builder = AstroBuilder(str(web_dir), search_manifest, store.path)
+        builder.buildSharded()
+        assert not builder.changed
+        assert builder.change_feed == {}
+
+        builder = AstroBuilder(str(web_dir), search_manifest, store.path)
+        builder.build()
+        assert not builder.changed
+
+class TestNothingToDeploy:
+    def test_exitStatus(self, web_dir, tmp_path):
+        (tmp_path / "manifest.yaml").write_text(yaml.safe_dump(manifest))
+        ContentStore(str(tmp_path / "content.jsonl")).append([record(1)])
+        command = [
+            sys.executable, "-m", "VirtualMoments", "build", "--exit-if-unchanged",
+            "--web-dir", str(web_dir), "--manifest", str(tmp_path / "manifest.yaml"), "-o", str(tmp_path / "content.jsonl")
+        ]
+        env = {**os.environ, "PYTHONPATH": str(REPO_DIR)}
+
+        assert subprocess.run(command, env = env, capture_output = True).returncode == 0
+        assert subprocess.run(command, env = env, capture_output = True).returncode == 100
+
+class TestContentStores:
+    def test_warnUnreadDefaultStore(self, web_dir, tmp_path):
+        profiles = {"content": {"profiles": [{"name": "user1"}]}}
+        (tmp_path / "manifest.yaml").write_text(yaml.safe_dump({**manifest, **profiles}))
+        (tmp_path / "content").mkdir()
+        ContentStore(str(tmp_path / "content" / "user1.jsonl")).append([record(1)])
+        command = [sys.executable, "-m", "VirtualMoments", "build", "--web-dir", str(web_dir)]
+        env = {**os.environ, "PYTHONPATH": str(REPO_DIR)}
+
+        result = subprocess.run(command, env = env, cwd = tmp_path, capture_output = True, text = True)
+        assert result.returncode == 0
+        assert "content.jsonl is not read" not in result.stderr
+
+        ContentStore(str(tmp_path / "content.jsonl")).append([record(2)])
+        result = subprocess.run(command, env = env, cwd = tmp_path, capture_output = True, text = True)
+        assert result.returncode == 0
+        assert "content.jsonl is not read" in result.stderr
@@ -0,0 +1,63 @@
+import os
+import pytest
+import yaml
+from VirtualMoments.BuildWatcher import BuildWatcher
+from VirtualMoments.ContentStore import ContentStore
+
+@pytest.fixture
+def watcher(tmp_path):
+    pages_dir = tmp_path / "web" / "src" / "pages"
+    pages_dir.mkdir(parents = True)
+    (pages_dir / "album_template.astro").write_text("<Album><!-- SCREENSHOTS --></Album>")
+    (pages_dir / "index_template.astro").write_text("<Index><!-- ALBUMS --><!-- FOOTER --></Index>")
+
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text(yaml.safe_dump({"albums": [{"name": "Album 1", "games": ["Game 1"]}]}))
+
+    content = tmp_path / "content.jsonl"
+    ContentStore(str(content)).append([
+        {"page_link": "https://page1", "game": "Game 1", "title": "Title 1", "link": "https://link1", "date": "21 January 2024"}
+    ])
+
+    return BuildWatcher(str(tmp_path / "web"), str(manifest), str(content), interval = 0)
+
+def touch(path, text):
+    # bump the modification time, so changes within the file system timestamp resolution are seen
+    stat = os.stat(path)
+    with open(path, "w") as f:
+        f.write(text)
+    os.utime(path, ns = (stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+class TestBuildWatcher:
+    def test_buildOnlyOnChange(self, watcher):
+        pages_dir = os.path.join(watcher.web_dir, "src", "pages")
+
+        assert watcher.poll()
+        assert os.path.exists(os.path.join(pages_dir, "album_1.astro"))
+        assert not watcher.poll()
+
+        touch(watcher.manifest, yaml.safe_dump({"albums": [{"name": "Album 2", "games": ["Game 1"]}]}))
+        assert watcher.poll()
+        assert os.path.exists(os.path.join(pages_dir, "album_2.astro"))
+        assert not watcher.poll()
+
+    def test_rebuildOnTemplateChange(self, watcher):
+        watcher.poll()
+
+        template = os.path.join(watcher.web_dir, "src", "pages", "album_template.astro")
+        touch(template, "<NewAlbum><!-- SCREENSHOTS --></NewAlbum>")
+        assert watcher.poll()
+
+        with open(os.path.join(watcher.web_dir, "src", "pages", "album_1.astro")) as f:
+            assert f.read().startswith("<NewAlbum>")
+
+    def test_keepWatchingAfterFailedBuild(self, watcher):
+        watcher.poll()
+
+        touch(watcher.manifest, "albums: [")
+        assert watcher.poll()
+        assert not watcher.poll()
+
+        touch(watcher.manifest, yaml.safe_dump({"albums": [{"name": "Album 3", "games": ["Game 1"]}]}))
+        assert watcher.poll()
+        assert os.path.exists(os.path.join(watcher.web_dir, "src", "pages", "album_3.astro"))
@@ -0,0 +1,115 @@
+import os
+import pytest
+import subprocess
+import sys
+import yaml
+from pathlib import Path
+from VirtualMoments.ContentStore import ContentStore, ScrapeState, loadContent, loadLegacyYaml
+from VirtualMoments.ScreenshotScrapper import Screenshot
+
+REPO_DIR = Path(__file__).resolve().parent.parent.parent
+
+@pytest.fixture
+def screenshots():
+    return [
+        Screenshot(page_link = "https://page1", game = "Game 1", title = "Title \"1\"", link = "https://link1", date = "21 January 2024"),
+        Screenshot(page_link = "https://page2", game = "Game 2", title = "Zażółć", link = "https://link2", date = "25 January 2025"),
+    ]
+
+@pytest.fixture
+def store(tmp_path):
+    return ContentStore(str(tmp_path / "content.jsonl"))
+
+class TestContentStore:
+    def test_loadMissingStore(self, store):
+        assert store.load() == []
+
+    def test_appendAndLoad(self, store, screenshots):
+        assert store.append(screenshots) == 2
+
+        records = store.load()
+        assert records == [s.toDict() for s in screenshots]
+        assert [Screenshot.fromDict(r) for r in records] == screenshots
+
+    def test_latestDuplicateWins(self, store, screenshots):
+        store.append(screenshots)
+        store.append([{**screenshots[0].toDict(), "title": "New title"}])
+
+        records = store.load()
+        assert len(records) == 2
+        assert records[0]["title"] == "New title"
+
+        store.compact()
+        assert len(list(store.iterRecords())) == 2
+
+    def test_compactIfNeeded(self, store, screenshots):
+        store.append(screenshots)
+        store.append([{**screenshots[0].toDict(), "title": "New title"}])
+        assert not store.compactIfNeeded(max_superseded = 0.5)
+        assert len(list(store.iterRecords())) == 3
+
+        assert store.compactIfNeeded(max_superseded = 0.25)
+        assert [r["title"] for r in store.iterRecords()] == ["New title", "Zażółć"]
+
+    def test_skipTruncatedLastLine(self, store, screenshots):
+        store.append(screenshots)
+        with open(store.path, "a") as f:
+            f.write('{"page_link": "https://pa')
+
+        assert len(store.load()) == 2
+
+    def test_rejectYamlPath(self, tmp_path):
+        with pytest.raises(ValueError):
+            ContentStore(str(tmp_path / "content.yaml"))
+
+    def test_appendAfterTornRecord(self, store, screenshots):
+        store.append(screenshots[:1])
+        with open(store.path, "a") as f:
+            f.write('{"page_link": "https://pa')
+
+        store.append(screenshots[1:], sync = True)
+
+        assert store.load() == [s.toDict() for s in screenshots]
+
+class TestLegacyYaml:
+    def test_loadObjectTags(self, tmp_path, screenshots):
+        legacy = tmp_path / "content.yaml"
+        legacy.write_text(
+            "- !!python/object:VirtualMoments.ScreenshotScrapper.Screenshot\n"
+            "  date: 21 January 2024\n  game: Game 1\n  link: https://link1\n"
+            "  page_link: https://page1\n  title: Title\n"
+            + yaml.dump([screenshots[1].toDict()])
+        )
+
+        records = loadLegacyYaml(str(legacy))
+        assert records[0]["game"] == "Game 1"
+        assert records[1] == screenshots[1].toDict()
+
+        store = ContentStore.fromLegacyYaml(str(legacy), str(tmp_path / "content.jsonl"))
+        assert loadContent(store.path) == loadContent(str(legacy))
+
+    @pytest.mark.parametrize("output", ["content.yaml", "content.jsonl"])
+    def test_migrateCommand(self, tmp_path, screenshots, output):
+        legacy = tmp_path / "content.yaml"
+        legacy.write_text(yaml.dump([screenshot.toDict() for screenshot in screenshots]))
+        command = [sys.executable, "-m", "VirtualMoments", "migrate", "-o", str(tmp_path / output)]
+        env = {**os.environ, "PYTHONPATH": str(REPO_DIR)}
+
+        assert subprocess.run(command, env = env, capture_output = True).returncode == 0
+        records = ContentStore(str(tmp_path / "content.jsonl")).load()
+        assert [record["page_link"] for record in records] == ["https://page1", "https://page2"]
+        assert records[0]["timestamp"] == "2024-01-21"
+
+class TestScrapeState:
+    def test_saveAndLoad(self, store):
+        state = ScrapeState.forStore(store)
+        assert not state.exists()
+
+        state.profile_links = ["link2", "link1"]
+        state.failed_links = ["link1"]
+        state.save()
+
+        loaded = ScrapeState.forStore(store).load()
+        assert loaded.profile_links == ["link2", "link1"]
+        assert loaded.failed_links == ["link1"]
+        assert not loaded.complete
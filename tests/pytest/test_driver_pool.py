@@ -0,0 +1,151 @@
+import threading
+import time
+import pytest
+from VirtualMoments.DriverPool import DriverPool
+from VirtualMoments.ProfileListing import SeleniumProfileLister
+from VirtualMoments.ScreenshotScrapper import ScreenshotScrapper
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_calls = 0
+        self.cdp = []
+
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise ConnectionError("browser is gone")
+        return 1
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+
+    def quit(self):
+        self.quit_calls += 1
+
+class FakeDriverPool(DriverPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.started: list[FakeDriver] = []
+
+    def _createDriver(self):
+        driver = FakeDriver()
+        self.started.append(driver)
+        return driver
+
+class TestDriverPool:
+    def test_reuseDriver(self):
+        with FakeDriverPool() as pool:
+            with pool.driver() as driver1:
+                pass
+            with pool.driver() as driver2:
+                pass
+
+            assert driver1 is driver2
+            assert driver1.quit_calls == 0
+        assert driver1.quit_calls == 1
+
+    def test_quitDriverReturnedAfterClose(self):
+        pool = FakeDriverPool()
+        with pool.driver() as driver:
+            pool.close()
+
+        assert driver.quit_calls == 1
+        assert pool._idle == []
+
+    def test_recycleAfterMaxUses(self):
+        pool = FakeDriverPool(max_uses = 2)
+        drivers = []
+        for _ in range(5):
+            with pool.driver() as driver:
+                drivers.append(driver)
+        pool.close()
+
+        assert len(pool.started) == 3
+        assert drivers[0] is drivers[1] and drivers[1] is not drivers[2]
+        assert all(driver.quit_calls == 1 for driver in pool.started)
+
+    def test_replaceUnhealthyDriver(self):
+        pool = FakeDriverPool()
+        with pool.driver() as driver1:
+            pass
+        driver1.alive = False
+
+        with pool.driver() as driver2:
+            pass
+
+        assert driver2 is not driver1
+        assert driver1.quit_calls == 1
+
+    def test_quitDriverAfterException(self):
+        pool = FakeDriverPool()
+        with pytest.raises(RuntimeError):
+            with pool.driver() as driver1:
+                raise RuntimeError("listing failed")
+
+        with pool.driver() as driver2:
+            pass
+
+        assert driver2 is not driver1
+        assert driver1.quit_calls == 1
+
+    def test_sizeLimit(self):
+        pool = FakeDriverPool(size = 2)
+        in_use = []
+        peak = []
+        lock = threading.Lock()
+
+        def borrow():
+            with pool.driver():
+                with lock:
+                    in_use.append(1)
+                    peak.append(len(in_use))
+                time.sleep(0.02)
+                with lock:
+                    in_use.pop()
+
+        threads = [threading.Thread(target = borrow) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) == 2
+        assert len(pool.started) == 2
+
+    def test_throwErrorOnInvalidArguments(self):
+        with pytest.raises(ValueError):
+            DriverPool(size = 0)
+        with pytest.raises(ValueError):
+            DriverPool(max_uses = 0)
+        with pytest.raises(ValueError):
+            DriverPool(block = ["videos"])
+
+    def test_blockImages(self):
+        options = DriverPool(block = ["images"]).chromeOptions()
+        assert options.experimental_options["prefs"] == {"profile.managed_default_content_settings.images": 2}
+        assert "prefs" not in DriverPool().chromeOptions().experimental_options
+
+class TestSeleniumListingWithPool:
+    def test_listingsShareBrowser(self, monkeypatch):
+        pool = FakeDriverPool()
+        lister = SeleniumProfileLister(pool = pool)
+        monkeypatch.setattr(FakeDriver, "get", lambda self, url: None, raising = False)
+        monkeypatch.setattr(lister, "_scrollToEnd", lambda driver: ["link1"])
+
+        assert lister.listLinks("https://profile1") == ["link1"]
+        assert lister.listLinks("https://profile2") == ["link1"]
+        assert len(pool.started) == 1
+
+    def test_browserPerListingByDefault(self):
+        pool = SeleniumProfileLister().pool
+        assert (pool.size, pool.max_uses) == (1, 1)
+
+    def test_scrapperSharesPool(self):
+        pool = FakeDriverPool()
+        scrapper = ScreenshotScrapper("test_user")
+        scrapper.setListingEngine("selenium")
+        scrapper.setDriverPool(pool)
+        assert scrapper.profile_lister.pool is pool
+
+        scrapper.setListingEngine("selenium")
+        assert scrapper.profile_lister.pool is pool
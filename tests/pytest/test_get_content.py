@@ -1,17 +1,16 @@
-import sys
-from pathlib import Path
-# Add the run directory to the path, othwerwise pytests
-# fails to find the tested file.
-script_path = Path(__file__).resolve().parent.parent.parent / "scripts"
-sys.path.insert(0, str(script_path))
-
 import pytest
-from datetime import datetime
-from get_content import extractScreenshotLinks, extractScreenshotMetadata, parseSteamDate
+from datetime import date
+from types import SimpleNamespace
+from VirtualMoments.ScreenshotScrapper import ScreenshotScrapper, Screenshot
+from VirtualMoments.ContentStore import ContentStore, ScrapeState
+
+@pytest.fixture
+def scrapper():
+    return ScreenshotScrapper("test_user")
 
 class TestExtractScreenshotLinks:
-    def test_parseSimplePage(self):
-        page_html = """
+    def test_parseSimplePage(self, scrapper):
+        scrapper.profile_page = """
             <html>
                 <body>
                     <a href="https://testlink1.com/sharedfiles/filedetails">Test link 1</a>
@@ -23,18 +22,19 @@ class TestExtractScreenshotLinks:
             </html>
         """
 
-        links = extractScreenshotLinks(html_text = page_html)
+        links = scrapper.extractScreenshotLinks()
         assert type(links) == list
         assert len(links) == 2
         assert links[0] == "https://testlink1.com/sharedfiles/filedetails"
         assert links[1] == "https://testlink2.com/sharedfiles/filedetails"
+        assert scrapper.profile_links == links
 
-    def test_throwErrorIfNoArgumentss(self):
+    def test_throwErrorIfNoProfilePage(self, scrapper):
         with pytest.raises(ValueError):
-            extractScreenshotLinks()
+            scrapper.extractScreenshotLinks()
 
 class TestExtractScreenshotMetadata:
-    def test_parseSimplePage(self):
+    def test_parseSimplePage(self, scrapper, monkeypatch):
         page_html = """
             <html>
                 <body>
@@ -42,31 +42,190 @@ class TestExtractScreenshotMetadata:
                     <div class = "screenshotAppName">
                         <a>Test game</a>
                     </div>
-                    <div class = "screenshotDescription">Test title</div>
+                    <div class = "screenshotDescription">"Test title"</div>
                     <div class = "detailsStatRight">Some other stat</div>
                     <div class = "detailsStatRight">21 Jan, 2024 @ 10:10pm</div>
                     <div class = "detailsStatRight">Some next stat</div>
                 </body>
             </html>
         """
-        metadata = extractScreenshotMetadata(html_text = page_html)
-        assert type(metadata) == dict
-        assert metadata["game"] == "Test game"
-        assert metadata["title"] == "Test title"
-        assert metadata["link"] == "https://fake-link-to-test.com/someimage"
-        assert metadata["date"] == "21 January 2024"
-
-    def test_throwErrorIfNoArguments(self):
+        monkeypatch.setattr(scrapper.fetcher, "get", lambda url: SimpleNamespace(text = page_html, headers = {"ETag": '"v1"'}))
+
+        metadata = scrapper.extractScreenshotMetadata(url = "https://test-page.com")
+        assert type(metadata) == Screenshot
+        assert metadata.page_link == "https://test-page.com"
+        assert metadata.game == "Test game"
+        assert metadata.title == "Test title"
+        assert metadata.link == "https://fake-link-to-test.com/someimage"
+        assert metadata.date == "21 January 2024"
+        assert metadata.timestamp == "2024-01-21T22:10:00"
+        assert metadata.etag == '"v1"'
+        assert metadata.checked is not None
+
+    def test_throwErrorIfNoArguments(self, scrapper):
         with pytest.raises(ValueError):
-            extractScreenshotMetadata()
+            scrapper.extractScreenshotMetadata()
 
 class TestParseSteamDate:
-    def test_standardFormat(self):
-        assert parseSteamDate("25 Jan, 2021 @ 12:34pm") == "25 January 2021"
-        assert parseSteamDate("15 Sep, 2023") == "15 September 2023"
-        assert parseSteamDate("10 May @ 7:05am") == f"10 May {datetime.now().strftime('%Y')}"
-
-    def test_reverseFormat(self):
-        assert parseSteamDate("Jan 25, 2021 @ 12:34pm") == "25 January 2021"
-        assert parseSteamDate("Sep 15, 2023") == "15 September 2023"
-        assert parseSteamDate("May 10 @ 7:05am") == f"10 May {datetime.now().strftime('%Y')}"
\ No newline at end of file
+    def test_standardFormat(self, scrapper):
+        assert scrapper.parseSteamDate("25 Jan, 2021 @ 12:34pm") == "25 January 2021"
+        assert scrapper.parseSteamDate("15 Sep, 2023") == "15 September 2023"
+        assert scrapper.parseSteamDate("10 May @ 7:05am", date(2024, 6, 1)) == "10 May 2024"
+
+    def test_reverseFormat(self, scrapper):
+        assert scrapper.parseSteamDate("Jan 25, 2021 @ 12:34pm") == "25 January 2021"
+        assert scrapper.parseSteamDate("Sep 15, 2023") == "15 September 2023"
+        assert scrapper.parseSteamDate("May 10 @ 7:05am", date(2024, 6, 1)) == "10 May 2024"
+
+    def test_yearlessDateBeforeReference(self, scrapper):
+        # a year-less date after the day the page was fetched is from the previous year
+        assert scrapper.parseSteamDate("30 Dec @ 11:00pm", date(2025, 1, 2)) == "30 December 2024"
+        assert scrapper.parseSteamDate("29 Feb", date(2025, 1, 2)) == "29 February 2024"
+
+class TestIncrementalScraping:
+    @pytest.fixture
+    def scrapper(self, monkeypatch):
+        scrapper = ScreenshotScrapper("test_user")
+        scrapper.setRequestDelay(0)
+        scrapper.profile_links = ["link5", "link4", "link3", "link2", "link1"]
+        monkeypatch.setattr(scrapper, "listProfileLinks", lambda: scrapper.profile_links)
+        monkeypatch.setattr(
+            scrapper, "extractScreenshotMetadata",
+            lambda url: Screenshot(page_link = url, game = "Game", title = "", link = url, date = "21 January 2024")
+        )
+        return scrapper
+
+    def test_walkAllLinksByDefault(self, scrapper):
+        assert scrapper.planIncrementalWalk({"link3", "link2"}) == scrapper.profile_links
+
+    def test_stopWalkAfterKnownRun(self, scrapper):
+        scrapper.setIncremental(2)
+        assert scrapper.planIncrementalWalk({"link4", "link2", "link1"}) == ["link5", "link4", "link3", "link2", "link1"]
+        assert scrapper.planIncrementalWalk({"link4", "link3", "link1"}) == ["link5", "link4", "link3"]
+
+    def test_mergeWithoutDuplicates(self, scrapper, tmp_path):
+        output = tmp_path / "content.jsonl"
+        ContentStore(str(output)).append(
+            {"page_link": link, "game": "Game", "title": "cached", "link": link, "date": "21 January 2024"}
+            for link in ["link3", "link2", "link2", "link1"]
+        )
+        scrapper.setIncremental(1)
+
+        content = scrapper.generateContentStructure(output = str(output))
+
+        assert [c.page_link for c in content] == ["link5", "link4", "link3", "link2", "link1"]
+        assert [c.title for c in content] == ["", "", "cached", "cached", "cached"]
+        assert len(ContentStore(str(output)).load()) == 5
+
+class TestCheckpointing:
+    def test_resumeFailedLinks(self, monkeypatch, tmp_path):
+        output = str(tmp_path / "content.jsonl")
+        scrapper = ScreenshotScrapper("test_user")
+        scrapper.setRequestDelay(0)
+        monkeypatch.setattr(scrapper, "listProfileLinks", lambda: setattr(scrapper, "profile_links", ["link3", "link2", "link1"]))
+
+        fetched_urls = []
+        def fetch(url):
+            fetched_urls.append(url)
+            if url == "link2" and len(fetched_urls) <= 3:
+                raise ConnectionError()
+            return Screenshot(page_link = url, game = "Game", title = "", link = url, date = "21 January 2024")
+        monkeypatch.setattr(scrapper, "extractScreenshotMetadata", fetch)
+
+        content = scrapper.generateContentStructure(output = output)
+        assert [c.page_link for c in content] == ["link3", "link1"]
+        assert scrapper.failed_links == ["link2"]
+
+        state = ScrapeState(output + ".state.json").load()
+        assert state.profile_links == ["link3", "link2", "link1"]
+        assert state.failed_links == ["link2"]
+        assert not state.complete
+
+        monkeypatch.setattr(scrapper, "listProfileLinks", lambda: pytest.fail("Profile should not be listed on resume"))
+        content = scrapper.generateContentStructure(output = output, resume = True)
+
+        assert fetched_urls[3:] == ["link2"]
+        assert [c.page_link for c in content] == ["link3", "link2", "link1"]
+        assert ScrapeState(output + ".state.json").load().complete
+
+    def test_throwErrorIfNothingToResume(self, tmp_path):
+        with pytest.raises(ValueError):
+            ScreenshotScrapper("test_user").generateContentStructure(output = str(tmp_path / "content.jsonl"), resume = True)
+
+SCREENSHOT_HTML = """
+    <img id="ActualMedia" src="https://image-link.com/image?query" />
+    <div class="screenshotAppName"><a>Game</a></div>
+    <div class="screenshotDescription">{title}</div>
+    <div class="detailsStatRight">1 MB</div>
+    <div class="detailsStatRight">21 Jan, 2024 @ 10:10pm</div>
+"""
+
+class TestRefresh:
+    @pytest.fixture
+    def pages(self):
+        # page link -> (ETag, title) currently served
+        return {f"link{i}": ('"v1"', "Title") for i in range(1, 5)}
+
+    @pytest.fixture
+    def scrapper(self, monkeypatch, pages):
+        scrapper = ScreenshotScrapper("test_user")
+        scrapper.setRequestDelay(0)
+        monkeypatch.setattr(scrapper, "listProfileLinks", lambda: setattr(scrapper, "profile_links", list(pages)))
+
+        scrapper.requests = []
+        def get(url, headers = None):
+            scrapper.requests.append((url, headers))
+            etag, title = pages[url]
+            if headers and headers.get("If-None-Match") == etag:
+                return SimpleNamespace(status_code = 304, headers = {"ETag": etag}, text = "")
+            return SimpleNamespace(status_code = 200, headers = {"ETag": etag}, text = SCREENSHOT_HTML.format(title = title))
+        monkeypatch.setattr(scrapper.fetcher, "get", get)
+        return scrapper
+
+    def test_planRefreshOldestFirst(self, scrapper):
+        cached = [
+            Screenshot("link1", "Game", "", "link", "21 January 2024", checked = "2024-03-01T00:00:00+00:00"),
+            Screenshot("link2", "Game", "", "link", "21 January 2024", checked = "2024-01-01T00:00:00+00:00"),
+            Screenshot("link3", "Game", "", "link", "21 January 2024"),
+        ]
+        assert scrapper.planRefresh(cached) == []
+
+        scrapper.setRefresh(0.5)
+        assert scrapper.planRefresh(cached) == ["link3", "link2"]
+
+    def test_revalidateWithConditionalRequests(self, scrapper, pages, tmp_path):
+        output = str(tmp_path / "content.jsonl")
+        scrapper.generateContentStructure(output = output)
+        ContentStore(output).append([{**ContentStore(output).index()["link1"], "width": 1920}])
+
+        pages["link2"] = ('"v2"', "New title")
+        scrapper.setRefresh(1)
+        scrapper.requests.clear()
+        content = scrapper.generateContentStructure(output = output)
+
+        assert scrapper.requests == [(link, {"If-None-Match": '"v1"'}) for link in pages]
+        assert [s.title for s in content] == ["Title", "New title", "Title", "Title"]
+        assert content[1].etag == '"v2"'
+
+        records = ContentStore(output).index()
+        assert records["link2"]["title"] == "New title"
+        assert records["link1"]["width"] == 1920
+        # revalidated records superseded the whole store, so it was compacted
+        assert len(list(ContentStore(output).iterRecords())) == 4
+
+    def test_keepCachedOnFailure(self, scrapper, monkeypatch, tmp_path):
+        output = str(tmp_path / "content.jsonl")
+        scrapper.generateContentStructure(output = output)
+
+        def fail(url, headers = None):
+            raise ConnectionError()
+        monkeypatch.setattr(scrapper.fetcher, "get", fail)
+        scrapper.setRefresh(1)
+        content = scrapper.generateContentStructure(output = output)
+
+        assert [s.title for s in content] == ["Title"] * 4
+        assert scrapper.failed_links == []
+
+    def test_throwErrorOnInvalidFraction(self, scrapper):
+        with pytest.raises(ValueError):
+            scrapper.setRefresh(1.5)
@@ -0,0 +1,68 @@
+import pytest
+from VirtualMoments import HtmlParsing
+from VirtualMoments.HtmlParsing import findScreenshotLinks, parseScreenshotPage, setParserBackend
+
+PROFILE_HTML = """
+    <html>
+        <body>
+            <div class="frame">
+                <a href="https://steamcommunity.com/sharedfiles/filedetails/?id=2&amp;x=1"><img /></a>
+                <a href="https://steamcommunity.com/id/test/">Profile</a>
+                <a>No href</a>
+                <A class="link" HREF='https://steamcommunity.com/sharedfiles/filedetails/?id=1'>Link</A>
+            </div>
+        </body>
+    </html>
+"""
+
+SCREENSHOT_HTML = """
+    <html>
+        <body>
+            <div class="frame">
+                <img src="https://fake-link-to-test.com/someimage?somequery=stripthis" class="media" id="ActualMedia" />
+                <div class="screenshotAppName"><a>Test game</a></div>
+                <div class="description screenshotDescription">Test title</div>
+                <div class="detailsStatRight">Some other stat</div>
+                <div class="detailsStatRight">21 Jan, 2024 @ 10:10pm</div>
+            </div>
+        </body>
+    </html>
+"""
+
+@pytest.fixture(params = ["lxml", "html.parser", "regex"])
+def backend(request, monkeypatch):
+    if request.param == "lxml":
+        pytest.importorskip("lxml")
+    monkeypatch.setattr(HtmlParsing, "parser_features", HtmlParsing.parser_features)
+    monkeypatch.setattr(HtmlParsing, "link_backend", HtmlParsing.link_backend)
+    setParserBackend(request.param)
+    return request.param
+
+class TestFindScreenshotLinks:
+    def test_parseProfilePage(self, backend):
+        assert findScreenshotLinks(PROFILE_HTML) == [
+            "https://steamcommunity.com/sharedfiles/filedetails/?id=2&x=1",
+            "https://steamcommunity.com/sharedfiles/filedetails/?id=1",
+        ]
+
+class TestParseScreenshotPage:
+    def test_parseScreenshotPage(self, backend):
+        assert parseScreenshotPage(SCREENSHOT_HTML) == {
+            "game": "Test game",
+            "title": "Test title",
+            "link": "https://fake-link-to-test.com/someimage",
+            "date": "21 Jan, 2024 @ 10:10pm",
+        }
+
+    def test_missingDescription(self, backend):
+        html = SCREENSHOT_HTML.replace('<div class="description screenshotDescription">Test title</div>', "")
+        assert parseScreenshotPage(html)["title"] is None
+
+    def test_throwErrorOnMissingImage(self, backend):
+        with pytest.raises(ValueError):
+            parseScreenshotPage("<html><body><div class='screenshotAppName'><a>Game</a></div></body></html>")
+
+class TestSetParserBackend:
+    def test_throwErrorOnUnknownBackend(self):
+        with pytest.raises(ValueError):
+            setParserBackend("html5")
@@ -0,0 +1,80 @@
+import pytest
+import threading
+import time
+import requests as rq
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from VirtualMoments.HttpFetcher import HttpFetcher
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Responds with the next status from the server's script, 200 once it is exhausted."""
+    def do_GET(self):
+        status, headers = self.server.script.pop(0) if self.server.script else (200, {})
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(b"<html>ok</html>")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ScriptedHandler)
+    server.script = []
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/page"
+
+class TestHttpFetcher:
+    def test_fetchPage(self, url):
+        fetcher = HttpFetcher()
+        response = fetcher.get(url)
+
+        assert response.text == "<html>ok</html>"
+        assert fetcher.stats.requests == 1
+        assert fetcher.stats.statuses[200] == 1
+
+    def test_retryTransientStatus(self, server, url):
+        server.script = [(503, {}), (429, {"Retry-After": "0"})]
+        fetcher = HttpFetcher(backoff = 0.01)
+
+        response = fetcher.get(url)
+
+        assert response.status_code == 200
+        assert fetcher.stats.requests == 3
+        assert fetcher.stats.retries == 2
+        assert fetcher.stats.statuses[503] == 1
+        assert fetcher.stats.statuses[429] == 1
+
+    def test_giveUpAfterMaxRetries(self, server, url):
+        server.script = [(500, {})] * 3
+        fetcher = HttpFetcher(max_retries = 2, backoff = 0.01)
+
+        with pytest.raises(rq.HTTPError):
+            fetcher.get(url)
+        assert fetcher.stats.failures == 1
+
+    def test_doNotRetryClientError(self, server, url):
+        server.script = [(404, {})]
+        fetcher = HttpFetcher(backoff = 0.01)
+
+        with pytest.raises(rq.HTTPError):
+            fetcher.get(url)
+        assert fetcher.stats.requests == 1
+        assert fetcher.stats.retries == 0
+
+    def test_retryAfterHeader(self, server, url):
+        server.script = [(429, {"Retry-After": "0.2"})]
+        fetcher = HttpFetcher(backoff = 0.01)
+
+        start = time.monotonic()
+        fetcher.get(url)
+
+        assert fetcher.stats.retries == 1
+        assert time.monotonic() - start >= 0.2
@@ -0,0 +1,74 @@
+import pytest
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+Image = pytest.importorskip("PIL.Image")
+from VirtualMoments.ImageCache import ImageCache
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """Serves a 1920x1080 PNG image and counts the requests."""
+    def do_GET(self):
+        self.server.requests += 1
+        buffer = io.BytesIO()
+        Image.new("RGB", (1920, 1080), (120, 30, 200)).save(buffer, "PNG")
+
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(buffer.getvalue())
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    server.requests = 0
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/ugc/image.png"
+
+class TestImageCache:
+    def test_processImage(self, tmp_path, url):
+        cache = ImageCache(str(tmp_path / "cache"), str(tmp_path / "thumbs"), widths = [480, 960, 4096])
+        image = cache.process(url)
+
+        assert image["width"] == 1920
+        assert image["height"] == 1080
+        assert image["thumbnail"].startswith("/VirtualMoments/thumbs/")
+        assert image["thumbnail"].endswith("_480.jpg")
+        assert image["srcset"].count(",") == 2
+        assert image["srcset"].endswith(f"{url} 1920w")
+
+        thumbs = sorted((tmp_path / "thumbs").iterdir())
+        assert len(thumbs) == 2
+        with Image.open(thumbs[0]) as thumb:
+            assert thumb.size == (480, 270)
+
+    def test_downloadOnce(self, tmp_path, server, url):
+        cache = ImageCache(str(tmp_path / "cache"), str(tmp_path / "thumbs"))
+        first = cache.process(url)
+        cache.save()
+
+        cache = ImageCache(str(tmp_path / "cache"), str(tmp_path / "thumbs"))
+        assert cache.process(url) == first
+        assert server.requests == 1
+
+    def test_regenerateMissingThumbnails(self, tmp_path, server, url):
+        cache = ImageCache(str(tmp_path / "cache"), str(tmp_path / "thumbs"))
+        cache.process(url)
+        for thumb in (tmp_path / "thumbs").iterdir():
+            thumb.unlink()
+
+        cache.process(url)
+        assert len(list((tmp_path / "thumbs").iterdir())) == 2
+        assert server.requests == 1
+
+    def test_fetcherSizedForWorkers(self, tmp_path):
+        cache = ImageCache(str(tmp_path / "cache"), str(tmp_path / "thumbs"), workers = 4)
+        assert cache.fetcher.session.get_adapter("https://").poolmanager.connection_pool_kw["maxsize"] == 4
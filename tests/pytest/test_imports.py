@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent.parent.parent
+
+def importedModules(*args: str) -> set[str]:
+    """
+    Runs python with -X importtime and returns the names of all imported modules.
+    """
+    env = {**os.environ, "PYTHONPATH": str(REPO_DIR)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output = True, text = True, cwd = REPO_DIR, env = env
+    )
+    assert result.returncode == 0, result.stderr
+    # lines look like "import time:  self [us] | cumulative | module", indented by nesting
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and line.count("|") == 2
+    }
+
+def topLevel(modules: set[str]) -> set[str]:
+    return {module.split(".")[0] for module in modules}
+
+class TestLazyImports:
+    def test_importPackage(self):
+        modules = topLevel(importedModules("-c", "import VirtualMoments"))
+        assert not modules & {"selenium", "bs4", "requests", "yaml"}
+
+    def test_importBuilder(self):
+        modules = topLevel(importedModules("-c", "import VirtualMoments.AstroBuilder"))
+        assert not modules & {"selenium", "bs4", "requests"}
+
+    def test_importScrapper(self):
+        modules = topLevel(importedModules("-c", "import VirtualMoments.ScreenshotScrapper"))
+        assert "selenium" not in modules
+
+    @pytest.mark.parametrize("command", ["build", "scrape"])
+    def test_cliHelp(self, command):
+        modules = topLevel(importedModules("-m", "VirtualMoments", command, "--help"))
+        assert not modules & {"selenium", "bs4", "requests", "yaml"}
+
+    def test_lazyExports(self):
+        import VirtualMoments
+
+        assert VirtualMoments.AstroBuilder.__name__ == "AstroBuilder"
+        assert "ScreenshotScrapper" in dir(VirtualMoments)
+        with pytest.raises(AttributeError):
+            VirtualMoments.Missing
+
+    def test_exportsShadowSubmodules(self):
+        import VirtualMoments
+        import VirtualMoments.ScreenshotScrapper
+        from VirtualMoments.ScreenshotScrapper import ScreenshotScrapper
+
+        assert VirtualMoments.ScreenshotScrapper is ScreenshotScrapper
@@ -0,0 +1,76 @@
+import io
+import json
+import pytest
+import time
+from VirtualMoments.Metrics import Metrics, ProgressLine
+
+class TestMetrics:
+    def test_spanRecordsWallTime(self):
+        metrics = Metrics()
+
+        with metrics.span("phase"):
+            time.sleep(0.02)
+        with metrics.span("phase"):
+            pass
+
+        report = metrics.report()["spans"]["phase"]
+        assert report["count"] == 2
+        assert report["max"] >= 0.02
+        assert report["total"] == pytest.approx(report["mean"] * 2)
+
+    def test_spanIsRecordedOnError(self):
+        metrics = Metrics()
+
+        with pytest.raises(RuntimeError):
+            with metrics.span("failing"):
+                raise RuntimeError()
+
+        assert metrics.report()["spans"]["failing"]["count"] == 1
+
+    def test_counters(self):
+        metrics = Metrics()
+        metrics.count("requests")
+        metrics.count("requests")
+        metrics.count("bytes", 512)
+
+        assert metrics.report()["counters"] == {"bytes": 512, "requests": 2}
+
+        metrics.reset()
+        assert metrics.report()["counters"] == {}
+        assert metrics.report()["spans"] == {}
+
+    def test_writeReport(self, tmp_path):
+        metrics = Metrics()
+        metrics.record("build.album", 0.5)
+        metrics.count("build.albums_written")
+
+        path = tmp_path / "metrics.json"
+        metrics.writeReport(str(path))
+
+        report = json.loads(path.read_text())
+        assert report["spans"]["build.album"]["total"] == 0.5
+        assert report["counters"]["build.albums_written"] == 1
+        assert report["wall_time"] >= 0
+
+class TestProgressLine:
+    def test_etaFromObservedThroughput(self):
+        progress = ProgressLine(10, stream = io.StringIO())
+        assert progress.eta() is None
+
+        progress.started -= 2
+        progress.update(5)
+
+        assert progress.eta().total_seconds() == pytest.approx(2, abs = 1)
+
+    def test_redrawsInPlace(self):
+        stream = io.StringIO()
+        progress = ProgressLine(2, "Fetching", stream = stream, interval = 0)
+
+        progress.update()
+        progress.update()
+        progress.close()
+
+        output = stream.getvalue()
+        assert output.count("\r") == 2
+        assert "Fetching: 2/2 (100.0%)" in output
+        assert output.endswith("\n")
@@ -0,0 +1,121 @@
+import pytest
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from VirtualMoments.HttpFetcher import HttpFetcher
+from VirtualMoments.ProfileListing import HttpProfileLister, ProfileLister, SeleniumProfileLister, findScreenshotLinks
+
+PAGES = {
+    1: ["https://steamcommunity.com/sharedfiles/filedetails/?id=3", "https://steamcommunity.com/sharedfiles/filedetails/?id=2"],
+    2: ["https://steamcommunity.com/sharedfiles/filedetails/?id=2", "https://steamcommunity.com/sharedfiles/filedetails/?id=1"],
+}
+
+class GridHandler(BaseHTTPRequestHandler):
+    """Serves a paginated screenshot grid, repeating the last page like Steam does past the end."""
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query)["p"][0])
+        self.server.requested_pages.append(page)
+        links = PAGES.get(page, PAGES[max(PAGES)])
+        body = "".join(f'<a href="{link}"><img /></a><a href="/profile">Profile</a>' for link in links)
+
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(f"<html><body>{body}<a>No href</a></body></html>".encode())
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GridHandler)
+    server.requested_pages = []
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+class TestFindScreenshotLinks:
+    def test_skipAnchorsWithoutHref(self):
+        html = '<a>No href</a><a href="https://test/sharedfiles/filedetails/?id=1">Link</a><a href="https://test/">Other</a>'
+        assert findScreenshotLinks(html) == ["https://test/sharedfiles/filedetails/?id=1"]
+
+class TestProfileLister:
+    def test_engineMustListLinks(self):
+        class NoListing(ProfileLister):
+            pass
+
+        with pytest.raises(TypeError):
+            NoListing()
+
+class TestHttpProfileLister:
+    def test_listAllPages(self, server):
+        lister = HttpProfileLister(HttpFetcher())
+        links = lister.listLinks(f"http://127.0.0.1:{server.server_address[1]}/id/test/screenshots/")
+
+        assert links == [
+            "https://steamcommunity.com/sharedfiles/filedetails/?id=3",
+            "https://steamcommunity.com/sharedfiles/filedetails/?id=2",
+            "https://steamcommunity.com/sharedfiles/filedetails/?id=1",
+        ]
+        assert server.requested_pages == [1, 2, 3]
+
+    def test_maxPages(self, server):
+        lister = HttpProfileLister(HttpFetcher(), max_pages = 1)
+        links = lister.listLinks(f"http://127.0.0.1:{server.server_address[1]}/id/test/screenshots/")
+
+        assert len(links) == 2
+        assert server.requested_pages == [1]
+
+class FakeDriver:
+    """
+    Loads one batch of anchors per scroll, requesting a resource on every poll before each batch.
+    Like Chrome, the resource timing buffer stops recording after 250 entries until it is cleared.
+    """
+    buffer_size = 250
+
+    def __init__(self, batches: list[list[str]], polls_per_batch: int = 3, resources: int = 0):
+        self.batches = batches
+        self.polls_per_batch = polls_per_batch
+        self.anchors: list[str] = []
+        self.polls = 0
+        self.resources = resources
+
+    def execute_script(self, script, *args):
+        if "scrollTo" in script:
+            self.polls = 0
+            return None
+
+        self.polls += 1
+        if self.polls < self.polls_per_batch:
+            self.resources = min(self.resources + 1, self.buffer_size)
+        elif self.batches:
+            self.anchors.extend(self.batches.pop(0))
+        n_resources = self.resources
+        if "clearResourceTimings" in script:
+            self.resources = 0
+        return [self.anchors[args[0]:], n_resources]
+
+class TestSeleniumProfileLister:
+    def test_scrollUntilNoNewContent(self):
+        driver = FakeDriver([["link3", "link2"], ["link1"]])
+        lister = SeleniumProfileLister(poll_interval = 0.01, idle_time = 0.05, max_wait = 1)
+
+        start = time.monotonic()
+        assert lister._scrollToEnd(driver) == ["link3", "link2", "link1"]
+        assert time.monotonic() - start < 0.5
+
+    def test_waitCeiling(self):
+        driver = FakeDriver([], polls_per_batch = 10 ** 6)
+        lister = SeleniumProfileLister(poll_interval = 0.01, idle_time = 10, max_wait = 0.1)
+
+        start = time.monotonic()
+        assert lister._scrollToEnd(driver) == []
+        assert time.monotonic() - start < 0.5
+
+    def test_resourceBufferFull(self):
+        # anchors keep loading for longer than idle_time after the resource timing buffer filled up
+        driver = FakeDriver([["link2"], ["link1"]], polls_per_batch = 20, resources = FakeDriver.buffer_size)
+        lister = SeleniumProfileLister(poll_interval = 0.01, idle_time = 0.05, max_wait = 1)
+
+        assert lister._scrollToEnd(driver) == ["link2", "link1"]
@@ -0,0 +1,69 @@
+import pytest
+from VirtualMoments.ContentStore import ContentStore
+from VirtualMoments.ProfileScheduler import Profile, ProfileScheduler, profilesFromManifest
+from VirtualMoments.ScreenshotScrapper import ScreenshotScrapper, Screenshot
+
+class TestProfilesFromManifest:
+    def test_profileList(self):
+        manifest = {"content": {"profiles": [
+            {"name": "user1"},
+            {"name": "user2", "steam_profile_url": "https://steamcommunity.com/profiles/765/screenshots/", "store": "u2.jsonl"},
+        ]}}
+
+        assert profilesFromManifest(manifest) == [
+            Profile("user1", "https://steamcommunity.com/id/user1/screenshots/", "content/user1.jsonl"),
+            Profile("user2", "https://steamcommunity.com/profiles/765/screenshots/", "u2.jsonl"),
+        ]
+
+    def test_singleProfileUrl(self):
+        manifest = {"content": {"steam_profile_url": "https://steamcommunity.com/id/user1/screenshots/"}}
+        assert [p.name for p in profilesFromManifest(manifest)] == ["user1"]
+        assert profilesFromManifest({}) == []
+
+    def test_throwErrorOnDuplicateNames(self):
+        with pytest.raises(ValueError):
+            profilesFromManifest({"content": {"profiles": [{"name": "user1"}, {"name": "user1"}]}})
+
+class TestProfileScheduler:
+    @pytest.fixture
+    def requests(self):
+        return []
+
+    def scrapper(self, monkeypatch, requests, name, links):
+        scrapper = ScreenshotScrapper(name)
+        monkeypatch.setattr(scrapper, "listProfileLinks", lambda: setattr(scrapper, "profile_links", links))
+
+        def fetch(url):
+            requests.append(url)
+            return Screenshot(page_link = url, game = "Game", title = name, link = url, date = "21 January 2024")
+        monkeypatch.setattr(scrapper, "extractScreenshotMetadata", fetch)
+        return scrapper
+
+    def test_interleaveProfiles(self, monkeypatch, requests, tmp_path):
+        scheduler = ProfileScheduler(delay = 0)
+        scrapper1 = self.scrapper(monkeypatch, requests, "user1", ["a1", "a2", "a3", "a4"])
+        scrapper2 = self.scrapper(monkeypatch, requests, "user2", ["b1", "b2"])
+        scheduler.addProfile(scrapper1, str(tmp_path / "content" / "user1.jsonl"))
+        scheduler.addProfile(scrapper2, str(tmp_path / "content" / "user2.jsonl"))
+
+        content = scheduler.run()
+
+        assert requests == ["a1", "b1", "a2", "b2", "a3", "a4"]
+        assert scrapper1.fetcher is scrapper2.fetcher is scheduler.fetcher
+        assert [s.page_link for s in content["user1"]] == ["a1", "a2", "a3", "a4"]
+        assert [s.page_link for s in content["user2"]] == ["b1", "b2"]
+        assert [r["title"] for r in ContentStore(str(tmp_path / "content" / "user2.jsonl")).load()] == ["user2", "user2"]
+
+    def test_skipCachedPerProfile(self, monkeypatch, requests, tmp_path):
+        store1 = str(tmp_path / "user1.jsonl")
+        ContentStore(store1).append([{"page_link": "a1", "game": "Game", "title": "cached", "link": "a1", "date": "21 January 2024"}])
+
+        scheduler = ProfileScheduler(delay = 0, workers = 2)
+        scheduler.addProfile(self.scrapper(monkeypatch, requests, "user1", ["a2", "a1"]), store1)
+        scheduler.addProfile(self.scrapper(monkeypatch, requests, "user2", ["a1"]), str(tmp_path / "user2.jsonl"))
+
+        content = scheduler.run()
+
+        assert sorted(requests) == ["a1", "a2"]
+        assert [s.title for s in content["user1"]] == ["user1", "cached"]
+        assert [s.title for s in content["user2"]] == ["user2"]
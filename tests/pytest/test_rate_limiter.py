@@ -0,0 +1,31 @@
+import pytest
+import time
+from VirtualMoments.RateLimiter import TokenBucket
+
+class TestTokenBucket:
+    def test_burstIsNotDelayed(self):
+        bucket = TokenBucket(rate = 1, burst = 3)
+
+        waited = [bucket.acquire() for _ in range(3)]
+        assert waited == [0.0, 0.0, 0.0]
+
+    def test_rateIsEnforced(self):
+        bucket = TokenBucket(rate = 20, burst = 1)
+
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        assert elapsed >= 0.14
+
+    def test_fromDelay(self):
+        assert TokenBucket.fromDelay(5).rate == pytest.approx(0.2)
+        assert TokenBucket.fromDelay(0).rate is None
+        assert TokenBucket.fromDelay(0).acquire() == 0.0
+
+    def test_throwErrorOnInvalidArguments(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate = 0)
+        with pytest.raises(ValueError):
+            TokenBucket(rate = 1, burst = 0)
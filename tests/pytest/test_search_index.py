@@ -0,0 +1,97 @@
+import json
+import pytest
+from VirtualMoments.AstroBuilder import AstroBuilder
+from VirtualMoments.SearchIndex import SearchIndex, sortByDate, tokenize
+import VirtualMoments.SearchIndex as search_index
+
+@pytest.fixture
+def screenshots():
+    return [
+        {"page_link": "https://page1", "game": "Game 1", "title": "Old ship", "link": "https://link1", "date": "21 January 2024"},
+        {"page_link": "https://page2", "game": "Game 2", "title": "New ship", "link": "https://link2", "date": "25 March 2025"},
+        {"page_link": "https://page3", "game": "Game 1", "title": "Sunset", "link": "https://link3", "date": "2 January 2024"},
+        {"page_link": "https://page4", "game": "Game 2", "title": "Undated", "link": "https://link4", "date": ""},
+    ]
+
+def readJson(path):
+    with open(path, encoding = "utf-8") as f:
+        return json.load(f)
+
+class TestSortByDate:
+    def test_newestFirst(self, screenshots):
+        assert [s["link"] for s in sortByDate(screenshots)] == ["https://link2", "https://link1", "https://link3", "https://link4"]
+
+    def test_timestampBeforeDisplayDate(self, screenshots):
+        screenshots[2]["timestamp"] = "2024-01-02T10:00:00"
+        screenshots[0]["timestamp"] = "2024-01-02T09:00:00"
+        assert [s["link"] for s in sortByDate(screenshots)][1:3] == ["https://link3", "https://link1"]
+
+    def test_tokenize(self):
+        assert tokenize("The Witcher 3: Wild Hunt") == {"the", "witcher", "wild", "hunt"}
+
+class TestSearchIndex:
+    def test_shards(self, screenshots):
+        ordered = sortByDate(screenshots)
+        shards = SearchIndex(ordered, {id(ordered[0]): ("Album 2", "/VirtualMoments/album_2/")}).shards()
+
+        index = shards["index.json"]
+        assert index["count"] == 4
+        assert index["albums"] == [["Album 2", "/VirtualMoments/album_2/"]]
+        assert index["games"] == [["Game 1", "game_1", 2], ["Game 2", "game_2", 2]]
+        assert index["months"] == [["2025-03", 1], ["2024-01", 2]]
+
+        assert shards["records/0.json"][0] == ["https://link2", "New ship", "Game 2", "2025-03-25", 0, None]
+        assert shards["records/0.json"][3][3:5] == [None, None]
+        assert shards["games/game_1.json"] == [1, 2]
+        assert shards["months/2024-01.json"] == [1, 2]
+        assert shards["tokens/sh.json"] == {"ship": [0, 1]}
+        assert "sh" in index["token_prefixes"]
+
+    def test_recordShards(self, monkeypatch, screenshots):
+        monkeypatch.setattr(search_index, "RECORDS_PER_SHARD", 3)
+        shards = SearchIndex(sortByDate(screenshots), {}).shards()
+
+        assert len(shards["records/0.json"]) == 3
+        assert len(shards["records/1.json"]) == 1
+
+    def test_writeRemovesStaleShards(self, screenshots, tmp_path):
+        written, unchanged = SearchIndex(sortByDate(screenshots), {}).write(str(tmp_path))
+        assert unchanged == 0
+        assert (tmp_path / "tokens" / "su.json").exists()
+
+        written, unchanged = SearchIndex(sortByDate(screenshots[:2]), {}).write(str(tmp_path))
+        assert not (tmp_path / "tokens" / "su.json").exists()
+        assert (tmp_path / "months" / "2024-01.json").exists()
+        assert readJson(tmp_path / "index.json")["count"] == 2
+
+        written, unchanged = SearchIndex(sortByDate(screenshots[:2]), {}).write(str(tmp_path))
+        assert written == 0
+
+class TestBuildSearch:
+    def test_buildWritesIndexAndRecentPage(self, screenshots, tmp_path):
+        pages_dir = tmp_path / "src" / "pages"
+        pages_dir.mkdir(parents = True)
+        (pages_dir / "album_template.astro").write_text("<!-- SCREENSHOTS -->")
+        (pages_dir / "index_template.astro").write_text("<!-- ALBUMS --><!-- FOOTER -->")
+        manifest = {"albums": [{"name": "Album 1", "games": ["Game 1"]}], "search": {"recent": 2}}
+
+        AstroBuilder(str(tmp_path), manifest, screenshots).build()
+
+        index = readJson(tmp_path / "public" / "search" / "index.json")
+        assert index["albums"] == [["Other", "/VirtualMoments/other/"], ["Album 1", "/VirtualMoments/album_1/"]]
+
+        recent = (pages_dir / "recent.astro").read_text()
+        assert "https://link2" in recent and "https://link1" in recent
+        assert "https://link3" not in recent
+        assert "Recent" not in (pages_dir / "index.astro").read_text()
+
+    def test_noSearchSection(self, screenshots, tmp_path):
+        pages_dir = tmp_path / "src" / "pages"
+        pages_dir.mkdir(parents = True)
+        (pages_dir / "album_template.astro").write_text("<!-- SCREENSHOTS -->")
+        (pages_dir / "index_template.astro").write_text("<!-- ALBUMS --><!-- FOOTER -->")
+
+        AstroBuilder(str(tmp_path), {"albums": []}, screenshots).build()
+
+        assert not (tmp_path / "public" / "search").exists()
+        assert not (pages_dir / "recent.astro").exists()
@@ -0,0 +1,58 @@
+import pytest
+from datetime import date, datetime
+from VirtualMoments.ContentStore import ContentStore
+from VirtualMoments.SteamDates import migrateRecords, normalizeSteamDate, parseDisplayDate, parseSteamDate, recordDate
+
+class TestNormalizeSteamDate:
+    def test_displayAndTimestamp(self):
+        assert normalizeSteamDate("25 Jan, 2021 @ 12:34pm") == ("25 January 2021", "2021-01-25T12:34:00")
+        assert normalizeSteamDate("Jan 25, 2021 @ 7:05am") == ("25 January 2021", "2021-01-25T07:05:00")
+        assert normalizeSteamDate("15 Sep, 2023") == ("15 September 2023", "2023-09-15T00:00:00")
+
+    def test_yearlessDateIsDeterministic(self):
+        assert normalizeSteamDate("10 May @ 7:05am", date(2024, 6, 1)) == ("10 May 2024", "2024-05-10T07:05:00")
+        assert normalizeSteamDate("10 May @ 7:05am", date(2025, 5, 9)) == ("10 May 2024", "2024-05-10T07:05:00")
+
+    def test_memoized(self):
+        parseSteamDate.cache_clear()
+        for _ in range(3):
+            normalizeSteamDate("25 Jan, 2021 @ 12:34pm")
+        assert parseSteamDate.cache_info().hits == 2
+
+    def test_throwErrorOnUnknownFormat(self):
+        with pytest.raises(ValueError):
+            normalizeSteamDate("")
+        with pytest.raises(ValueError):
+            normalizeSteamDate("yesterday")
+
+class TestRecordDate:
+    def test_timestampOrDisplayDate(self):
+        assert recordDate({"date": "25 January 2021", "timestamp": "2021-01-25T12:34:00"}) == datetime(2021, 1, 25, 12, 34)
+        assert recordDate({"date": "25 January 2021"}) == datetime(2021, 1, 25)
+        assert recordDate({"date": "25 January 2021", "timestamp": None}) == datetime(2021, 1, 25)
+        assert recordDate({"date": ""}) is None
+        assert parseDisplayDate(None) is None
+
+class TestMigration:
+    def test_migrateRecords(self):
+        records, n = migrateRecords([
+            {"page_link": "a", "date": "25 January 2021"},
+            {"page_link": "b", "date": "25 January 2021", "timestamp": "2021-01-25T12:34:00"},
+            {"page_link": "c", "date": ""},
+        ])
+
+        assert n == 1
+        assert [r.get("timestamp") for r in records] == ["2021-01-25", "2021-01-25T12:34:00", None]
+
+    def test_migrateStore(self, tmp_path):
+        store = ContentStore(str(tmp_path / "content.jsonl"))
+        store.append([
+            {"page_link": "a", "game": "Game", "title": "", "link": "a", "date": "21 January 2024"},
+            {"page_link": "a", "game": "Game", "title": "new", "link": "a", "date": "22 January 2024"},
+        ])
+
+        assert store.migrateDates() == 1
+        assert list(store.iterRecords()) == [
+            {"page_link": "a", "game": "Game", "title": "new", "link": "a", "date": "22 January 2024", "timestamp": "2024-01-22"}
+        ]
+        assert store.migrateDates() == 0